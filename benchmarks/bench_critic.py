@@ -0,0 +1,85 @@
+"""Critic call benchmark: one critic call per idea versus batched scoring.
+
+Runs the daydreaming loop against a mock generator and a deterministic mock
+critic that understands both prompt shapes, then reports critic calls and
+input tokens per accepted idea. Run from the repository root with
+``python -m benchmarks.bench_critic --batch-size 16 --iterations 20``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import math
+import random
+import re
+
+from daydreamer import DaydreamConfig, DaydreamingLoop, IdeaCritic, IdeaGenerator, MemoryStore, MockLLM
+from daydreamer.llm import LLMClient, LLMRequest, LLMResponse, TokenUsage
+
+
+def _scores(idea: str) -> dict[str, float]:
+    digest = hashlib.sha1(idea.encode("utf-8")).digest()
+    return {name: 3 + digest[index] % 70 / 10 for index, name in enumerate(("novelty", "coherence", "usefulness"))}
+
+
+class RubricLLM(LLMClient):
+    """Scores hypotheses from a hash of their text, one at a time or as a batch."""
+
+    def generate(self, request: LLMRequest) -> LLMResponse:
+        hypotheses = re.findall(r'<hypothesis id="(H\d+)">\n(.*?)\n</hypothesis>', request.prompt, re.S)
+        if hypotheses:
+            text = json.dumps([{"id": hid, **_scores(idea), "justification": "ok"} for hid, idea in hypotheses])
+        else:
+            idea = request.prompt.split("Hypothesis:\n", 1)[1].split("\n\nRespond in compact JSON", 1)[0]
+            text = json.dumps({**_scores(idea), "justification": "ok"})
+        usage = TokenUsage(input_tokens=math.ceil(len(request.prompt) / 4), output_tokens=math.ceil(len(text) / 4))
+        return LLMResponse(text=text, usage=usage, model="mock")
+
+
+class PerIdeaCritic(IdeaCritic):
+    """The pre-batching behaviour: every idea is a separate call."""
+
+    def score_batch(self, ideas, *, escalate=None):
+        return [self.score(idea, escalate=escalate) for idea in ideas]
+
+
+def _run(critic: IdeaCritic, batch_size: int, iterations: int) -> tuple[int, int, int]:
+    random.seed(0)  # both runs sample the same pairs
+    memory = MemoryStore()
+    for idx in range(200):
+        memory.add_entry(f"concept {idx}", kind="concept")
+    config = DaydreamConfig(batch_size=batch_size, max_history=None)
+    loop = DaydreamingLoop(config=config, memory=memory, generator=IdeaGenerator(MockLLM()), critic=critic)
+    for _ in range(iterations):
+        loop.run_iteration()
+    stage = loop.ledger.stages["critic"]
+    return stage.calls, stage.input_tokens, loop.ledger.accepted
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--batch-size", type=int, default=16)
+    parser.add_argument("--iterations", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{args.iterations} iterations of {args.batch_size} ideas")
+    results = {}
+    for label, critic in (("per idea", PerIdeaCritic(RubricLLM())), ("batched", IdeaCritic(RubricLLM()))):
+        calls, tokens, accepted = _run(critic, args.batch_size, args.iterations)
+        results[label] = (calls, tokens, accepted)
+        print(
+            f"  {label:<9} {calls:5d} critic calls {tokens:9d} input tokens {accepted:4d} accepted"
+            f"  -> {calls / max(accepted, 1):6.2f} calls, {tokens / max(accepted, 1):9.1f} input tokens per idea"
+        )
+    (calls, tokens, accepted), (batched_calls, batched_tokens, _) = results["per idea"], results["batched"]
+    accepted = max(accepted, 1)
+    print(
+        f"  saved per accepted idea: {(calls - batched_calls) / accepted:.2f} calls,"
+        f" {(tokens - batched_tokens) / accepted:.1f} input tokens ({1 - batched_tokens / tokens:.0%})"
+    )
+
+
+if __name__ == "__main__":
+    main()
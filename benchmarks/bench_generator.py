@@ -0,0 +1,64 @@
+"""Generator request overhead: one call per concept pair versus multi-pair prompts.
+
+Run from the repository root with ``python -m benchmarks.bench_generator --pairs 16``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import math
+import re
+
+from daydreamer import IdeaGenerator, MemoryEntry
+from daydreamer.llm import LLMClient, LLMRequest, LLMResponse, TokenUsage
+
+
+class SynthesisLLM(LLMClient):
+    """Answers with a fixed-size synthesis per pair and estimates usage at four characters per token."""
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.input_tokens = 0
+
+    def generate(self, request: LLMRequest) -> LLMResponse:
+        self.calls += 1
+        body = "A speculative synthesis of both concepts. " * 8
+        ids = re.findall(r'<pair id="(P\d+)">', request.prompt)
+        text = "\n".join(f'<synthesis id="{pid}">{body}</synthesis>' for pid in ids) if ids else body
+        usage = TokenUsage(input_tokens=math.ceil(len(request.prompt) / 4), output_tokens=math.ceil(len(text) / 4))
+        self.input_tokens += usage.input_tokens
+        return LLMResponse(text=text, usage=usage)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pairs", type=int, default=16)
+    parser.add_argument("--budget", type=int, default=4096, help="Estimated tokens per multi-pair call")
+    args = parser.parse_args()
+
+    pairs = [
+        (
+            MemoryEntry(id=f"a{idx}", content=f"Concept {idx} from field A"),
+            MemoryEntry(id=f"b{idx}", content=f"Concept {idx} from field B"),
+        )
+        for idx in range(args.pairs)
+    ]
+    print(f"{args.pairs} concept pairs, {args.budget}-token call budget")
+    results = {}
+    for label in ("per pair", "multi-pair"):
+        llm = SynthesisLLM()
+        generator = IdeaGenerator(llm, call_token_budget=args.budget)
+        if label == "per pair":
+            proposals = [generator.propose(*pair) for pair in pairs]
+        else:
+            proposals = generator.propose_many(pairs)
+        assert len(proposals) == len(pairs)
+        results[label] = (llm.calls, llm.input_tokens)
+        per_idea = llm.input_tokens / len(pairs)
+        print(f"  {label:<10} {llm.calls:4d} calls {llm.input_tokens:7d} input tokens ({per_idea:6.1f} per idea)")
+    (calls, tokens), (multi_calls, multi_tokens) = results["per pair"], results["multi-pair"]
+    print(f"  calls -{1 - multi_calls / calls:.0%}, input tokens -{1 - multi_tokens / tokens:.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+"""Batch latency benchmark: sequential generate calls versus batched_generate.
+
+Run from the repository root with ``python -m benchmarks.bench_llm --batch-size 32 --latency 1``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+from daydreamer import MockLLM, batched_generate
+from daydreamer.llm import DEFAULT_CONCURRENCY, LLMRequest
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--latency", type=float, default=1.0, help="Simulated seconds per request")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY)
+    parser.add_argument("--skip-sequential", action="store_true")
+    args = parser.parse_args()
+
+    client = MockLLM(latency=args.latency)
+    requests = [LLMRequest(prompt=f"prompt {idx}") for idx in range(args.batch_size)]
+    print(f"batch of {args.batch_size} @ {args.latency:.2f}s simulated latency")
+    if not args.skip_sequential:
+        start = time.perf_counter()
+        for request in requests:
+            client.generate(request)
+        print(f"  sequential generate      {time.perf_counter() - start:8.2f} s")
+    start = time.perf_counter()
+    batched_generate(client, requests, concurrency=args.concurrency)
+    print(f"  batched_generate (<= {args.concurrency:>3}) {time.perf_counter() - start:8.2f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""Micro-benchmarks for MemoryStore recency queries, pruning and footprint.
+
+Run from the repository root with ``python -m benchmarks.bench_memory --entries 1000000``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import collections
+import random
+import time
+import tracemalloc
+import uuid
+from typing import Callable, Iterator
+
+from daydreamer import MemoryEntry, MemoryStore
+
+
+def _timed(fn: Callable[[], object], repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def _entries(count: int) -> list[MemoryEntry]:
+    base = time.time()
+    # Mostly in order with a little jitter, like entries merged from add_entries.
+    return [
+        MemoryEntry(id=str(idx), content=f"entry {idx}", created_at=base + idx + random.random() * 4)
+        for idx in range(count)
+    ]
+
+
+def bench_recency(count: int, repeat: int) -> None:
+    entries = _entries(count)
+    store = MemoryStore()
+    store.add_entries(entries)
+
+    def sorted_recent() -> list[MemoryEntry]:
+        return sorted(entries, key=lambda e: e.created_at, reverse=True)[:10]
+
+    def sorted_prune() -> None:
+        ordered = sorted(entries, key=lambda e: e.created_at, reverse=True)
+        del ordered[count - 1 :]
+
+    print(f"get_recent(10) @ {count:,}: full sort {_timed(sorted_recent, repeat):9.3f} ms | "
+          f"timeline {_timed(lambda: store.get_recent(10), repeat):9.3f} ms")
+    live = [count]
+
+    def timeline_prune() -> None:
+        live[0] -= 1
+        store.prune(live[0])
+
+    print(f"prune(n-1)    @ {count:,}: full sort {_timed(sorted_prune, repeat):9.3f} ms | "
+          f"timeline {_timed(timeline_prune, repeat):9.3f} ms")
+
+
+def _ideas(count: int) -> Iterator[list[MemoryEntry]]:
+    """Yield accepted ideas shaped like the loop's output, in chunks."""
+
+    base = time.time()
+    # Sources come from a window of recent ideas so the generator itself holds little memory.
+    ids = collections.deque((str(uuid.uuid4()) for _ in range(64)), maxlen=1024)
+    for start in range(0, count, 10_000):
+        chunk = []
+        for idx in range(start, min(count, start + 10_000)):
+            entry_id = str(uuid.uuid4())
+            chunk.append(
+                MemoryEntry(
+                    id=entry_id,
+                    content=f"Idea {idx}: treat hippocampal replay as a market for gradient updates ({entry_id[:8]})",
+                    kind="idea",
+                    created_at=base + idx,
+                    metadata={
+                        "sources": (random.choice(ids), random.choice(ids)),
+                        "scores": {"novelty": 7.5, "coherence": 6.5, "usefulness": 5.5},
+                        "justification": f"Connects consolidation to credit assignment (variant {idx}).",
+                    },
+                )
+            )
+            ids.append(entry_id)
+        yield chunk
+
+
+def bench_footprint(count: int) -> None:
+    text_bytes = sum(
+        len(entry.content.encode("utf-8")) + len(entry.metadata["justification"].encode("utf-8"))
+        for chunk in _ideas(count)
+        for entry in chunk
+    )
+    for storage in ("objects", "columnar"):
+        tracemalloc.start()
+        store = MemoryStore(storage=storage)
+        for chunk in _ideas(count):
+            store.add_entries(chunk)
+        del chunk
+        current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(
+            f"{storage:>8} storage @ {count:,} ideas: {current / count:8.1f} bytes/entry"
+            f" ({(current - text_bytes) / count:6.1f} beyond the UTF-8 text)"
+        )
+        del store
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--entries", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--footprint-entries", type=int, default=200_000)
+    args = parser.parse_args()
+    bench_recency(args.entries, args.repeat)
+    bench_footprint(args.footprint_entries)
+
+
+if __name__ == "__main__":
+    main()
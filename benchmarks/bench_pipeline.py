@@ -0,0 +1,50 @@
+"""Pipeline throughput benchmark: serial iterations versus ``DaydreamingLoop.run_pipelined``.
+
+Both runs use a mock LLM that sleeps ``--latency`` seconds per call, so the
+serial loop spends its time waiting on the generator and then the critic.
+Run from the repository root with ``python -m benchmarks.bench_pipeline --workers 8 --latency 0.5``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+from daydreamer import DaydreamConfig, DaydreamingLoop, IdeaCritic, IdeaGenerator, MemoryStore, MockLLM
+
+
+def _loop(latency: float) -> DaydreamingLoop:
+    memory = MemoryStore()
+    for idx in range(200):
+        memory.add_entry(f"concept {idx}", kind="concept")
+    llm = MockLLM(latency=latency)
+    config = DaydreamConfig(max_history=None)
+    return DaydreamingLoop(config=config, memory=memory, generator=IdeaGenerator(llm), critic=IdeaCritic(llm))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--latency", type=float, default=0.5, help="Simulated seconds per request")
+    parser.add_argument("--workers", type=int, default=8, help="Workers per stage (generator and critic)")
+    parser.add_argument("--iterations", type=int, default=8, help="Serial iterations; the pipeline runs 8x as many")
+    args = parser.parse_args()
+
+    print(f"one pair per iteration @ {args.latency:.2f}s simulated latency")
+    loop = _loop(args.latency)
+    start = time.perf_counter()
+    for _ in range(args.iterations):
+        loop.run_iteration()
+    serial = args.iterations / (time.perf_counter() - start)
+    print(f"  serial                    {serial:6.2f} ideas/s")
+
+    loop = _loop(args.latency)
+    start = time.perf_counter()
+    loop.run_pipelined(
+        max_iterations=8 * args.iterations, generator_workers=args.workers, critic_workers=args.workers
+    )
+    pipelined = 8 * args.iterations / (time.perf_counter() - start)
+    print(f"  pipelined ({args.workers:>2} workers)    {pipelined:6.2f} ideas/s  ({pipelined / serial:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
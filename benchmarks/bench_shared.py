@@ -0,0 +1,67 @@
+"""Throughput of several processes sharing one journaled memory file.
+
+Each worker alternates a simulated LLM call (``--latency`` seconds) with an
+``add_entry`` on a ``MemoryStore(shared=True)``. Run from the repository root
+with ``python -m benchmarks.bench_shared --workers 1 2 4 8``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import multiprocessing
+import tempfile
+import time
+from pathlib import Path
+
+from daydreamer import MemoryStore
+
+
+def _worker(path: str, worker: int, iterations: int, latency: float, ready) -> None:
+    store = MemoryStore(persistence_path=path, journal=True, shared=True)
+    ready.wait()  # exclude interpreter start-up from the measurement
+    for idx in range(iterations):
+        time.sleep(latency)
+        store.sample_pairs(1)
+        store.add_entry(f"worker {worker} idea {idx}", kind="idea")
+
+
+def bench(workers: int, iterations: int, latency: float) -> float:
+    with tempfile.TemporaryDirectory() as tmp:
+        path = str(Path(tmp) / "memory.json")
+        seed = MemoryStore(persistence_path=path, journal=True, shared=True)
+        for idx in range(16):
+            seed.add_entry(f"seed {idx}")
+        context = multiprocessing.get_context("spawn")
+        ready = context.Barrier(workers + 1)
+        processes = [
+            context.Process(target=_worker, args=(path, worker, iterations, latency, ready))
+            for worker in range(workers)
+        ]
+        for process in processes:
+            process.start()
+        ready.wait()
+        start = time.perf_counter()
+        for process in processes:
+            process.join()
+        elapsed = time.perf_counter() - start
+        total = len(MemoryStore(persistence_path=path, journal=True))
+        if total != 16 + workers * iterations:
+            raise RuntimeError(f"expected {16 + workers * iterations} entries, found {total}")
+        return workers * iterations / elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.01)
+    args = parser.parse_args()
+    baseline = None
+    for workers in args.workers:
+        rate = bench(workers, args.iterations, args.latency)
+        baseline = baseline or rate / workers
+        print(f"{workers:>2} workers: {rate:8.1f} entries/s ({rate / baseline:4.1f}x one worker)")
+
+
+if __name__ == "__main__":
+    main()
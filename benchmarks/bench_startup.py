@@ -0,0 +1,56 @@
+"""Startup-time benchmark: JSON memory files versus memory-mapped binary snapshots.
+
+Run from the repository root with ``python -m benchmarks.bench_startup --entries 200000``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import tempfile
+import time
+from pathlib import Path
+
+from daydreamer import MemoryStore
+from daydreamer.snapshot import json_to_snapshot
+
+from .bench_memory import _ideas
+
+
+def _time_open(repeat: int, **kwargs: object) -> float:
+    """Best-of-``repeat`` milliseconds to open a store and read its newest entries."""
+
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        store = MemoryStore(**kwargs)
+        store.get_recent(10)
+        best = min(best, time.perf_counter() - start)
+        del store
+    return best * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--entries", type=int, default=200_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        json_path = Path(tmp) / "memory.json"
+        binary_path = Path(tmp) / "memory.bin"
+        payload = [entry.to_json() for chunk in _ideas(args.entries) for entry in chunk]
+        json_path.write_text(json.dumps(payload, indent=2, sort_keys=True), encoding="utf-8")
+        del payload
+        json_to_snapshot(json_path, binary_path)
+
+        print(f"startup @ {args.entries:,} entries (open + get_recent(10), best of {args.repeat})")
+        print(f"  json    objects  {_time_open(args.repeat, persistence_path=json_path):10.1f} ms"
+              f"  ({json_path.stat().st_size / 2**20:.1f} MiB)")
+        print(f"  json    columnar {_time_open(args.repeat, persistence_path=json_path, storage='columnar'):10.1f} ms")
+        binary = _time_open(args.repeat, persistence_path=binary_path, storage="columnar", snapshot_format="binary")
+        print(f"  binary  columnar {binary:10.1f} ms  ({binary_path.stat().st_size / 2**20:.1f} MiB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""Critic cost benchmark: complete responses versus streaming with early termination.
+
+The mock critic answers with the score JSON followed by the kind of
+commentary models often add after it, decoding at ``--token-latency``
+seconds per token. Run from the repository root with
+``python -m benchmarks.bench_stream --ideas 20 --token-latency 0.01``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import time
+
+from daydreamer import IdeaCritic, MockLLM
+
+
+def _scripted(ideas: list[str], chatter_sentences: int) -> dict[str, str]:
+    critic = IdeaCritic(MockLLM())
+    chatter = " This hypothesis is interesting because it connects two distant fields." * chatter_sentences
+    return {
+        critic.build_request(idea).prompt: (
+            f'{{"novelty": {5 + idx % 5}, "coherence": 7, "usefulness": 6, '
+            f'"justification": "Connects the concepts in a testable way."}}\n\nAdditional notes:{chatter}'
+        )
+        for idx, idea in enumerate(ideas)
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--ideas", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.05, help="Simulated seconds before the first token")
+    parser.add_argument("--token-latency", type=float, default=0.01, help="Simulated seconds per output token")
+    parser.add_argument("--chatter", type=int, default=6, help="Sentences of commentary after the JSON")
+    args = parser.parse_args()
+
+    ideas = [f"idea {idx}" for idx in range(args.ideas)]
+    client = MockLLM(_scripted(ideas, args.chatter), latency=args.latency, token_latency=args.token_latency)
+    print(f"{args.ideas} critic calls @ {args.latency:.3f}s + {args.token_latency:.3f}s/token")
+    results = {}
+    for label, stream in (("complete", False), ("streamed", True)):
+        critic = IdeaCritic(client, stream=stream)
+        start = time.perf_counter()
+        scores = [critic.score(idea) for idea in ideas]
+        elapsed = time.perf_counter() - start
+        tokens = sum(score.response.usage.output_tokens for score in scores)
+        latency = statistics.mean(score.response.latency for score in scores)
+        results[label] = (tokens, latency, [score.average for score in scores])
+        print(f"  {label:<9} {tokens:6d} output tokens  {latency * 1000:7.1f} ms mean latency  {elapsed:6.2f} s total")
+    assert results["complete"][2] == results["streamed"][2], "streaming changed the scores"
+    (full_tokens, full_latency, _), (tokens, latency, _) = results["complete"], results["streamed"]
+    print(f"  output tokens -{1 - tokens / full_tokens:.0%}, latency -{1 - latency / full_latency:.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,26 +3,120 @@
 from __future__ import annotations
 
 import argparse
+import itertools
 import logging
 import sys
 from pathlib import Path
 
 from daydreamer import (
+    AcceptancePredictor,
     AnthropicLLM,
+    BudgetScheduler,
+    CachingLLM,
+    CostLedger,
     DaydreamConfig,
     DaydreamingLoop,
+    EmbeddingIndex,
+    EvictionPolicy,
+    ExploredPairRegistry,
     IdeaCritic,
     IdeaGenerator,
+    LeastRecentlySampled,
+    LLMClient,
+    LineageIndex,
+    LowestScoreFirst,
     MemoryStore,
     MockLLM,
+    NearDuplicateIndex,
+    OldestFirst,
+    PinSeeds,
+    SQLiteMemoryStore,
+    WeightedEviction,
 )
 
+from daydreamer.batch import BatchCheckpoint, MessageBatchRunner
+from daydreamer.costs import load_prices
+from daydreamer.llm import default_throttle
+from daydreamer.ratelimit import RateLimiter, Throttle
+from daydreamer.scheduler import ScheduledIteration
+
 logger = logging.getLogger("daydream.cli")
 
+_EVICTION_POLICIES = {
+    "oldest": OldestFirst,
+    "score": LowestScoreFirst,
+    "lru": LeastRecentlySampled,
+    "blend": WeightedEviction,
+}
+
 
 def _parse_args(argv: list[str]) -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Run the LLM daydreaming loop")
     parser.add_argument("--memory", type=Path, default=Path("memory.json"), help="Path to persistent memory store")
+    parser.add_argument(
+        "--backend",
+        choices=("json", "sqlite"),
+        default="json",
+        help="Storage backend for the memory file (sqlite keeps entries on disk and indexes them)",
+    )
+    parser.add_argument(
+        "--journal",
+        action="store_true",
+        help="Append mutations to a write-ahead journal instead of rewriting the memory file on every change",
+    )
+    parser.add_argument(
+        "--shared",
+        action="store_true",
+        help="Let several daydream processes share the memory file (implies --journal)",
+    )
+    parser.add_argument(
+        "--storage",
+        choices=("objects", "columnar"),
+        default="objects",
+        help="In-memory layout of JSON-backed stores (columnar packs entries into arrays for very large memories)",
+    )
+    parser.add_argument(
+        "--snapshot-format",
+        choices=("json", "binary"),
+        default="json",
+        help="On-disk format of the memory file (binary is memory-mapped on startup; implies --storage columnar)",
+    )
+    parser.add_argument(
+        "--track-pairs",
+        action="store_true",
+        help="Remember explored concept pairs (in <memory>.pairs) so they are never sent to the LLM twice",
+    )
+    parser.add_argument(
+        "--dedup",
+        action="store_true",
+        help="Skip the critic for near-duplicates of stored ideas (MinHash/LSH index kept in <memory>.lsh)",
+    )
+    parser.add_argument(
+        "--similarity-band",
+        type=float,
+        nargs=2,
+        metavar=("LOW", "HIGH"),
+        default=None,
+        help="Pair concepts whose embedding cosine similarity lies in [LOW, HIGH] (JSON backend only)",
+    )
+    parser.add_argument(
+        "--max-depth",
+        type=int,
+        default=None,
+        help="Only pair entries at most this many generations from the seed concepts (JSON backend only)",
+    )
+    parser.add_argument(
+        "--eviction",
+        choices=tuple(_EVICTION_POLICIES),
+        default=None,
+        help="Order in which entries are evicted once --max-history is reached (JSON backend only; default oldest)",
+    )
+    parser.add_argument(
+        "--pin-seeds",
+        action="store_true",
+        help="Never evict the seed concepts (JSON backend only)",
+    )
+    parser.add_argument("--max-history", type=int, default=10_000, help="Maximum number of entries kept in memory")
     parser.add_argument("--iterations", type=int, default=1, help="Number of iterations to execute (0 for infinite)")
     parser.add_argument("--batch-size", type=int, default=1, help="Number of concept pairs per iteration")
     parser.add_argument("--novelty", type=float, default=6.5, help="Novelty threshold for accepting ideas")
@@ -37,11 +131,89 @@ def _parse_args(argv: list[str]) -> argparse.Namespace:
             "Requires ANTHROPIC_API_KEY to be set."
         ),
     )
+    parser.add_argument(
+        "--critic-model",
+        default=None,
+        help="Anthropic model for the critic (its screening stage with --escalation-model); default --anthropic-model",
+    )
+    parser.add_argument(
+        "--escalation-model",
+        default=None,
+        help="Anthropic model that re-scores borderline ideas after the critic model has screened them",
+    )
+    parser.add_argument(
+        "--borderline-band",
+        type=float,
+        default=1.0,
+        help="Escalate ideas whose closest score lies within this distance of its threshold",
+    )
+    parser.add_argument(
+        "--predictor",
+        action="store_true",
+        help="Skip the critic for proposals a local model (kept in <memory>.predictor) predicts will be rejected",
+    )
+    parser.add_argument(
+        "--predictor-floor",
+        type=float,
+        default=0.1,
+        help="Acceptance probability below which --predictor skips the critic",
+    )
+    parser.add_argument(
+        "--exploration",
+        type=float,
+        default=0.1,
+        help="Fraction of likely rejects still sent to the critic so the predictor stays calibrated",
+    )
+    parser.add_argument(
+        "--cache",
+        action="store_true",
+        help="Reuse low-temperature (critic) responses across runs via a cache in <memory>.llmcache",
+    )
+    parser.add_argument(
+        "--no-stream",
+        action="store_true",
+        help="Wait for complete critic responses instead of streaming them and stopping once the score JSON closes",
+    )
     parser.add_argument(
         "--anthropic-system-prompt",
         default=None,
         help="Optional system prompt to send with Anthropic requests.",
     )
+    parser.add_argument(
+        "--batch-api",
+        action="store_true",
+        help=(
+            "Submit each iteration's generator and critic prompts as Anthropic Message Batches (cheaper, slower); "
+            "progress is checkpointed in <memory>.batch. Requires --anthropic-model."
+        ),
+    )
+    parser.add_argument(
+        "--pipeline",
+        action="store_true",
+        help="Overlap iterations: run generator and critic calls on worker threads joined by bounded queues",
+    )
+    parser.add_argument("--generator-workers", type=int, default=8, help="Generator workers with --pipeline")
+    parser.add_argument("--critic-workers", type=int, default=8, help="Critic workers with --pipeline")
+    parser.add_argument("--poll-interval", type=float, default=60.0, help="Seconds between Message Batch status polls")
+    parser.add_argument(
+        "--price-table",
+        type=Path,
+        default=None,
+        help='JSON price table for cost reporting: {"<model prefix>": {"input": USD/Mtok, "output": USD/Mtok}}',
+    )
+    parser.add_argument(
+        "--max-calls-per-minute", type=float, default=None, help="Pace iterations to stay under this many LLM calls"
+    )
+    parser.add_argument("--max-tokens-per-hour", type=float, default=None, help="Pause once this many tokens are used")
+    parser.add_argument("--max-cost-per-day", type=float, default=None, help="Pause once this much USD is spent")
+    parser.add_argument(
+        "--target-ideas-per-hour",
+        type=float,
+        default=None,
+        help="Explore only as many pairs as this rate of accepted ideas needs; any budget or target replaces the sleep",
+    )
+    parser.add_argument("--rpm", type=float, default=None, help="Client-side Anthropic requests-per-minute limit")
+    parser.add_argument("--tpm", type=float, default=None, help="Client-side Anthropic tokens-per-minute limit")
     return parser.parse_args(argv)
 
 
@@ -49,7 +221,7 @@ def _configure_logging(level: str) -> None:
     logging.basicConfig(level=getattr(logging, level.upper(), logging.INFO), format="%(asctime)s [%(levelname)s] %(message)s")
 
 
-def _bootstrap_memory(store: MemoryStore) -> None:
+def _bootstrap_memory(store: MemoryStore | SQLiteMemoryStore) -> None:
     if len(store) > 0:
         return
     logger.info("Memory is empty; seeding with default concepts.")
@@ -64,8 +236,33 @@ def _bootstrap_memory(store: MemoryStore) -> None:
         store.add_entry(concept, kind="concept", metadata={"seed": True})
 
 
+def _eviction_policy(args: argparse.Namespace) -> EvictionPolicy | None:
+    if args.eviction is None and not args.pin_seeds:
+        return None
+    policy = _EVICTION_POLICIES[args.eviction or "oldest"]()
+    return PinSeeds(policy) if args.pin_seeds else policy
+
+
+def _llm_client(args: argparse.Namespace, model: str | None, throttle: Throttle) -> LLMClient:
+    client: LLMClient = MockLLM()
+    if model is not None:
+        client = AnthropicLLM(model=model, system_prompt=args.anthropic_system_prompt, throttle=throttle)
+    # Cache keys include the model, so every client can share the one cache file.
+    return CachingLLM.beside(args.memory, client) if args.cache else client
+
+
 def main(argv: list[str] | None = None) -> int:
     args = _parse_args(list(argv) if argv is not None else sys.argv[1:])
+    if args.batch_api and not args.anthropic_model:
+        raise SystemExit("--batch-api requires --anthropic-model")
+    if args.batch_api and args.pipeline:
+        raise SystemExit("--pipeline cannot be combined with --batch-api")
+    budgets = (args.max_calls_per_minute, args.max_tokens_per_hour, args.max_cost_per_day, args.target_ideas_per_hour)
+    scheduled = any(budget is not None for budget in budgets)
+    if scheduled and (args.batch_api or args.pipeline):
+        raise SystemExit("Budgets and --target-ideas-per-hour cannot be combined with --batch-api or --pipeline")
+    if (args.critic_model or args.escalation_model) and not args.anthropic_model:
+        raise SystemExit("--critic-model and --escalation-model require --anthropic-model")
     _configure_logging(args.log_level)
 
     config = DaydreamConfig(
@@ -73,39 +270,146 @@ def main(argv: list[str] | None = None) -> int:
         novelty_threshold=args.novelty,
         coherence_threshold=args.coherence,
         usefulness_threshold=args.usefulness,
+        max_history=args.max_history,
+        max_generation_depth=args.max_depth if args.backend == "json" else None,
+        borderline_band=args.borderline_band,
     )
 
-    memory = MemoryStore(persistence_path=args.memory)
+    pair_registry = ExploredPairRegistry.beside(args.memory) if args.track_pairs else None
+    deduplicator = NearDuplicateIndex.beside(args.memory) if args.dedup else None
+    memory: MemoryStore | SQLiteMemoryStore
+    if args.backend == "sqlite":
+        memory = SQLiteMemoryStore(args.memory, pair_registry=pair_registry, deduplicator=deduplicator)
+    else:
+        memory = MemoryStore(
+            persistence_path=args.memory,
+            journal=args.journal or args.shared,
+            shared=args.shared,
+            storage="columnar" if args.snapshot_format == "binary" else args.storage,
+            snapshot_format=args.snapshot_format,
+            pair_registry=pair_registry,
+            deduplicator=deduplicator,
+            embedding_index=EmbeddingIndex(similarity_band=tuple(args.similarity_band)) if args.similarity_band else None,
+            lineage_index=LineageIndex() if args.max_depth is not None else None,
+            eviction_policy=_eviction_policy(args),
+        )
     _bootstrap_memory(memory)
 
-    if args.anthropic_model:
-        llm_client = AnthropicLLM(
-            model=args.anthropic_model,
-            system_prompt=args.anthropic_system_prompt,
-        )
-    else:
-        llm_client = MockLLM()
-    # For a production system you would swap in a real LLM client here.
-    llm_client = MockLLM()
+    # One client per model. Anthropic clients share a throttle, since rate limits apply per account.
+    throttle = default_throttle()
+    if args.rpm or args.tpm:
+        throttle.limiter = RateLimiter(requests_per_minute=args.rpm, tokens_per_minute=args.tpm)
+    clients: dict[str | None, LLMClient] = {}
+
+    def client_for(model: str | None) -> LLMClient:
+        if model not in clients:
+            clients[model] = _llm_client(args, model, throttle)
+        return clients[model]
+
+    llm_client = client_for(args.anthropic_model)
     generator = IdeaGenerator(llm_client)
-    critic = IdeaCritic(llm_client)
+    critic = IdeaCritic(
+        client_for(args.critic_model or args.anthropic_model),
+        stream=not args.no_stream,
+        escalation_client=client_for(args.escalation_model) if args.escalation_model else None,
+    )
 
-    loop = DaydreamingLoop(config=config, memory=memory, generator=generator, critic=critic)
+    ledger = CostLedger(
+        load_prices(args.price_table) if args.price_table else None,
+        default_model=args.anthropic_model,
+    )
+    predictor = (
+        AcceptancePredictor.beside(args.memory, floor=args.predictor_floor, exploration=args.exploration)
+        if args.predictor
+        else None
+    )
+    loop = DaydreamingLoop(
+        config=config, memory=memory, generator=generator, critic=critic, ledger=ledger, predictor=predictor
+    )
 
     def report(results):
         for result in results:
+            if result.predicted_reject:
+                logger.info("[skipped p=%.2f] %s", result.acceptance_probability, result.proposal.text)
+                continue
+            if result.score is None:
+                logger.info("[duplicate] %s", result.proposal.text)
+                continue
             status = "ACCEPTED" if result.accepted else "rejected"
             logger.info(
-                "[%s] %s | novelty=%.1f coherence=%.1f usefulness=%.1f",
+                "[%s] %s | novelty=%.1f coherence=%.1f usefulness=%.1f%s",
                 status,
                 result.proposal.text,
                 result.score.novelty,
                 result.score.coherence,
                 result.score.usefulness,
+                " (escalated)" if result.escalated else "",
             )
+        if isinstance(results, ScheduledIteration):
+            logger.info("Scheduler: %s", results.decision.describe())
 
     iterations = None if args.iterations == 0 else args.iterations
-    loop.run_forever(callback=report, max_iterations=iterations)
+    if args.batch_api:
+        runner = MessageBatchRunner(
+            model=args.anthropic_model,
+            system_prompt=args.anthropic_system_prompt,
+            poll_interval=args.poll_interval,
+        )
+        checkpoint = BatchCheckpoint.beside(args.memory)
+        for _ in itertools.count() if iterations is None else range(iterations):
+            report(loop.run_batched_iteration(runner, checkpoint))
+    elif args.pipeline:
+        loop.run_pipelined(
+            callback=report,
+            max_iterations=iterations,
+            generator_workers=args.generator_workers,
+            critic_workers=args.critic_workers,
+        )
+    else:
+        scheduler = (
+            BudgetScheduler(
+                max_calls_per_minute=args.max_calls_per_minute,
+                max_tokens_per_hour=args.max_tokens_per_hour,
+                max_cost_per_day=args.max_cost_per_day,
+                target_accepted_per_hour=args.target_ideas_per_hour,
+                batch_size=args.batch_size,
+            )
+            if scheduled
+            else None
+        )
+        loop.run_forever(callback=report, max_iterations=iterations, scheduler=scheduler)
+    for line in ledger.summary().splitlines():
+        logger.info("Cost %s", line)
+    if predictor is not None:
+        stats = predictor.stats
+        logger.info(
+            "Predictor: %d critic calls saved, %d likely rejects explored; precision %s, recall %s (%d examples seen)",
+            stats.skipped,
+            stats.explored,
+            "n/a" if stats.precision is None else f"{stats.precision:.2f}",
+            "n/a" if stats.recall is None else f"{stats.recall:.2f}",
+            predictor.examples,
+        )
+    coverage = memory.pair_coverage()
+    if coverage is not None:
+        logger.info(
+            "Explored %d of %d concept pairs (%.4f%%)", coverage.explored, coverage.total_pairs, coverage.fraction * 100
+        )
+    for model, client in clients.items():
+        if not isinstance(client, CachingLLM):
+            continue
+        stats = client.stats
+        logger.info(
+            "LLM cache (%s): %d hits (%d from disk), %d misses, %d uncached; %d bytes served, %d bytes stored",
+            model or "mock",
+            stats.hits,
+            stats.disk_hits,
+            stats.misses,
+            stats.bypassed,
+            stats.hit_bytes,
+            stats.stored_bytes,
+        )
+        client.close()
     return 0
 
 
@@ -3,20 +3,50 @@
 from .config import DaydreamConfig
 from .loop import DaydreamingLoop
 from .memory import MemoryStore, MemoryEntry
-from .llm import AnthropicLLM, LLMClient, MockLLM
-from .llm import LLMClient, MockLLM
+from .sqlite_store import SQLiteMemoryStore
+from .pairs import ExploredPairRegistry, PairCoverage
+from .embedding import Embedder, EmbeddingIndex, HashingEmbedder
+from .dedup import NearDuplicateIndex
+from .lineage import LineageIndex
+from .eviction import EvictionPolicy, LeastRecentlySampled, LowestScoreFirst, OldestFirst, PinSeeds, WeightedEviction
+from .llm import AnthropicLLM, AsyncAnthropicLLM, LLMClient, MockLLM, batched_generate
+from .cache import CachingLLM
+from .costs import CostLedger, ModelPrice
 from .generator import IdeaGenerator
 from .critic import IdeaCritic, IdeaScore
+from .predictor import AcceptancePredictor
+from .scheduler import BudgetScheduler
 
 __all__ = [
     "DaydreamConfig",
     "DaydreamingLoop",
     "MemoryStore",
     "MemoryEntry",
+    "SQLiteMemoryStore",
+    "ExploredPairRegistry",
+    "PairCoverage",
+    "Embedder",
+    "EmbeddingIndex",
+    "HashingEmbedder",
+    "NearDuplicateIndex",
+    "LineageIndex",
+    "EvictionPolicy",
+    "OldestFirst",
+    "LowestScoreFirst",
+    "LeastRecentlySampled",
+    "WeightedEviction",
+    "PinSeeds",
     "LLMClient",
     "MockLLM",
     "AnthropicLLM",
+    "AsyncAnthropicLLM",
+    "batched_generate",
+    "CachingLLM",
+    "CostLedger",
+    "ModelPrice",
     "IdeaGenerator",
     "IdeaCritic",
     "IdeaScore",
+    "AcceptancePredictor",
+    "BudgetScheduler",
 ]
@@ -0,0 +1,114 @@
+"""Execute LLM requests through Anthropic's Message Batches API."""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Any, Callable
+
+from .llm import LLMRequest, LLMResponse, _anthropic_client, _message_params, _message_response
+
+logger = logging.getLogger(__name__)
+
+
+class MessageBatchRunner:
+    """Submit a set of requests as one Message Batch and collect the results.
+
+    ``client`` is an ``anthropic.Anthropic`` instance (or anything exposing
+    ``messages.batches.create/retrieve/results``). Batches trade latency for
+    cost: results may take up to a day, but are billed at a discount, which
+    suits unattended runs.
+    """
+
+    def __init__(
+        self,
+        client: Any = None,
+        *,
+        model: str = "claude-3-opus-20240229",
+        system_prompt: str | None = None,
+        poll_interval: float = 60.0,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        if poll_interval < 0:
+            raise ValueError("poll_interval must be non-negative")
+        self._client = client or _anthropic_client("Anthropic")
+        self._model = model
+        self._system_prompt = system_prompt
+        self._poll_interval = poll_interval
+        self._sleep = sleep
+
+    def submit(self, requests: dict[str, LLMRequest]) -> str:
+        """Create a batch keyed by ``custom_id`` and return its id."""
+
+        batch = self._client.messages.batches.create(
+            requests=[
+                {"custom_id": custom_id, "params": _message_params(self._model, self._system_prompt, request)}
+                for custom_id, request in requests.items()
+            ]
+        )
+        logger.info("Submitted message batch %s with %d requests", batch.id, len(requests))
+        return batch.id
+
+    def wait(self, batch_id: str) -> dict[str, LLMResponse | None]:
+        """Poll until ``batch_id`` has ended; failed, expired or cancelled requests map to ``None``."""
+
+        while True:
+            batch = self._client.messages.batches.retrieve(batch_id)
+            if batch.processing_status == "ended":
+                break
+            logger.debug("Message batch %s is %s", batch_id, batch.processing_status)
+            self._sleep(self._poll_interval)
+        responses: dict[str, LLMResponse | None] = {}
+        for item in self._client.messages.batches.results(batch_id):
+            if item.result.type == "succeeded":
+                responses[item.custom_id] = _message_response(item.result.message)
+            else:
+                logger.warning("Batch request %s %s", item.custom_id, item.result.type)
+                responses[item.custom_id] = None
+        return responses
+
+
+class BatchCheckpoint:
+    """JSON document recording the progress of a batched iteration.
+
+    Every :meth:`save` atomically replaces the file, so after a crash the
+    loop resumes from the last completed step (for example polling an
+    already-submitted batch) instead of starting over.
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        self._path = Path(path)
+
+    @classmethod
+    def beside(cls, memory_path: str | Path) -> "BatchCheckpoint":
+        """The checkpoint stored next to a memory file (``<memory>.batch``)."""
+
+        memory_path = Path(memory_path)
+        return cls(memory_path.with_name(memory_path.name + ".batch"))
+
+    @property
+    def path(self) -> Path:
+        return self._path
+
+    def load(self) -> dict[str, Any]:
+        try:
+            return json.loads(self._path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return {}
+
+    def save(self, state: dict[str, Any]) -> None:
+        tmp_path = self._path.with_name(self._path.name + ".tmp")
+        with tmp_path.open("w", encoding="utf-8") as handle:
+            json.dump(state, handle, sort_keys=True)
+            handle.flush()
+            os.fsync(handle.fileno())
+        tmp_path.replace(self._path)
+
+    def clear(self) -> None:
+        self._path.unlink(missing_ok=True)
+
+
+__all__ = ["BatchCheckpoint", "MessageBatchRunner"]
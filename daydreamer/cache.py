@@ -0,0 +1,217 @@
+"""Content-addressed response cache wrapping any :class:`~daydreamer.llm.LLMClient`."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from .llm import LLMClient, LLMRequest, LLMResponse, LLMStream, TokenUsage
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    text TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+"""
+
+
+@dataclass(slots=True)
+class CacheStats:
+    """Counters describing how a :class:`CachingLLM` has been used."""
+
+    memory_hits: int = 0
+    disk_hits: int = 0
+    misses: int = 0
+    bypassed: int = 0  # requests outside the cached temperature range
+    hit_bytes: int = 0  # UTF-8 bytes of responses served from the cache
+    stored_bytes: int = 0  # UTF-8 bytes of responses written to the cache
+    memory_entries: int = 0
+
+    @property
+    def hits(self) -> int:
+        return self.memory_hits + self.disk_hits
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class CachingLLM(LLMClient):
+    """Serve repeated requests from an LRU tier backed by an optional SQLite file.
+
+    Responses are keyed on a SHA-256 of the wrapped client's
+    :attr:`~daydreamer.llm.LLMClient.cache_identity` (model and system prompt)
+    and the request's prompt, temperature and ``max_tokens``. Only requests
+    whose temperature lies in ``temperature_range`` (inclusive) are cached,
+    so by default low-temperature critic calls are reused while creative
+    generations always reach the model. The most recent ``capacity``
+    responses stay in memory; with a ``path`` every response is also kept on
+    disk and survives restarts. A stream the backend cancelled because the
+    caller closed it early is not cached, since its text is truncated. Hits
+    are marked ``cached`` and report zero usage under the wrapped client's
+    model.
+    """
+
+    def __init__(
+        self,
+        client: LLMClient,
+        path: str | Path | None = None,
+        *,
+        capacity: int = 1024,
+        temperature_range: tuple[float, float] = (0.0, 0.5),
+    ) -> None:
+        if capacity < 0:
+            raise ValueError("capacity must be non-negative")
+        low, high = temperature_range
+        if low > high:
+            raise ValueError("temperature_range must be (low, high) with low <= high")
+        self._client = client
+        self._capacity = capacity
+        self._temperature_range = (low, high)
+        self._lock = threading.Lock()
+        self._memory: OrderedDict[str, str] = OrderedDict()
+        self._stats = CacheStats()
+        self._conn: sqlite3.Connection | None = None
+        if path is not None:
+            self._conn = sqlite3.connect(str(path), check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(_SCHEMA)
+
+    @classmethod
+    def beside(cls, memory_path: str | Path, client: LLMClient, **kwargs: Any) -> "CachingLLM":
+        """Open the cache stored next to a memory file (``<memory>.llmcache``)."""
+
+        memory_path = Path(memory_path)
+        return cls(client, memory_path.with_name(memory_path.name + ".llmcache"), **kwargs)
+
+    @property
+    def cache_identity(self) -> dict[str, Any]:
+        return self._client.cache_identity
+
+    @property
+    def stats(self) -> CacheStats:
+        """A snapshot of the cache counters."""
+
+        with self._lock:
+            return CacheStats(
+                memory_hits=self._stats.memory_hits,
+                disk_hits=self._stats.disk_hits,
+                misses=self._stats.misses,
+                bypassed=self._stats.bypassed,
+                hit_bytes=self._stats.hit_bytes,
+                stored_bytes=self._stats.stored_bytes,
+                memory_entries=len(self._memory),
+            )
+
+    def key(self, request: LLMRequest) -> str:
+        payload = json.dumps(
+            [self.cache_identity, request.prompt, request.temperature, request.max_tokens],
+            sort_keys=True,
+            default=str,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def generate(self, request: LLMRequest) -> LLMResponse:
+        key = self._lookup_key(request)
+        if key is None:
+            return self._client.generate(request)
+        cached = self._get(key)
+        if cached is not None:
+            return cached
+        response = self._client.generate(request)
+        self._put(key, response)
+        return response
+
+    async def agenerate(self, request: LLMRequest) -> LLMResponse:
+        key = self._lookup_key(request)
+        if key is None:
+            return await self._client.agenerate(request)
+        cached = self._get(key)
+        if cached is not None:
+            return cached
+        response = await self._client.agenerate(request)
+        self._put(key, response)
+        return response
+
+    def generate_stream(self, request: LLMRequest) -> LLMStream:
+        key = self._lookup_key(request)
+        if key is None:
+            return self._client.generate_stream(request)
+        cached = self._get(key)
+        if cached is not None:
+            return LLMStream.complete(cached)
+        stream = self._client.generate_stream(request)
+
+        def finish(text: str, cancelled: bool) -> LLMResponse:
+            response = stream.response
+            # A stream the backend cancelled holds truncated text; a replayed response is complete either way.
+            if response.stop_reason != "cancelled":
+                self._put(key, response)
+            return response
+
+        return LLMStream(stream, finish)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    # ------------------------------------------------------------------
+    def _lookup_key(self, request: LLMRequest) -> str | None:
+        low, high = self._temperature_range
+        if low <= request.temperature <= high:
+            return self.key(request)
+        with self._lock:
+            self._stats.bypassed += 1
+        return None
+
+    def _get(self, key: str) -> LLMResponse | None:
+        with self._lock:
+            text = self._memory.get(key)
+            if text is not None:
+                self._memory.move_to_end(key)
+                self._stats.memory_hits += 1
+            elif self._conn is not None:
+                row = self._conn.execute("SELECT text FROM responses WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    text = row[0]
+                    self._remember(key, text)
+                    self._stats.disk_hits += 1
+            if text is None:
+                self._stats.misses += 1
+                return None
+            self._stats.hit_bytes += len(text.encode("utf-8"))
+        return LLMResponse(text=text, usage=TokenUsage(), model=self.cache_identity.get("model"), cached=True)
+
+    def _put(self, key: str, response: LLMResponse) -> None:
+        with self._lock:
+            self._remember(key, response.text)
+            self._stats.stored_bytes += len(response.text.encode("utf-8"))
+            if self._conn is not None:
+                with self._conn:
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO responses (key, text, created_at) VALUES (?, ?, ?)",
+                        (key, response.text, time.time()),
+                    )
+
+    def _remember(self, key: str, text: str) -> None:
+        if self._capacity == 0:
+            return
+        self._memory[key] = text
+        self._memory.move_to_end(key)
+        while len(self._memory) > self._capacity:
+            self._memory.popitem(last=False)
+
+
+__all__ = ["CacheStats", "CachingLLM"]
@@ -0,0 +1,509 @@
+"""Columnar, array-backed alternative to :class:`~daydreamer.timeline.Timeline`."""
+
+from __future__ import annotations
+
+import json
+import math
+import re
+import uuid
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any, Iterable, Iterator
+
+import numpy as np
+
+from .memory import MemoryEntry
+
+# Dropped rows at the front are reclaimed once they exceed this many and half the table.
+_MIN_RECLAIM = 1024
+_SCORE_KEYS = ("novelty", "coherence", "usefulness")
+_NO_SOURCE = -1
+_ABSENT = np.iinfo(np.uint32).max  # text length marking a missing optional field
+_CANONICAL_UUID = re.compile(r"[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}")
+_FOREIGN_NAMESPACE = uuid.UUID("6f1c6c1e-7d55-4b8e-9a43-1b0f4f3f0c11")
+
+# name -> (dtype, trailing shape, fill value)
+_COLUMNS: dict[str, tuple[type, tuple[int, ...], float | int]] = {
+    "created_at": (np.float64, (), 0.0),
+    "kind": (np.uint16, (), 0),
+    "serial": (np.int32, (), 0),
+    "scores": (np.float32, (3,), math.nan),
+    "sources": (np.int32, (2,), _NO_SOURCE),
+    # content, justification and leftover metadata JSON are stored back to back
+    "text_offset": (np.int64, (), 0),
+    "text_lengths": (np.uint32, (3,), 0),
+}
+
+
+@dataclass
+class ColumnarState:
+    """Plain-array image of a :class:`ColumnarTimeline` (live rows only).
+
+    ``columns`` are indexed by row, ``serial_uuids`` by serial and
+    ``sorted_serials`` orders serials by the high word of their UUID. Text
+    offsets in ``columns["text_offset"]`` point into ``arena``.
+    """
+
+    columns: dict[str, np.ndarray]
+    serial_uuids: np.ndarray
+    sorted_serials: np.ndarray
+    kinds: list[str]
+    foreign_ids: dict[int, str]
+    arena: bytes | memoryview
+
+
+class ColumnarTimeline:
+    """Time-ordered entries stored as NumPy columns plus a shared string arena.
+
+    Drop-in replacement for :class:`~daydreamer.timeline.Timeline` used by
+    ``MemoryStore(storage="columnar")``. Each entry gets a serial number; ids
+    are kept once per serial as 16-byte UUIDs, ``kind`` is interned to a small
+    integer code, critic scores live in a float32 matrix and ``sources`` are
+    stored as serial pairs. Content, justification and any remaining metadata
+    (as JSON) are consecutive UTF-8 runs in a shared arena.
+    :class:`MemoryEntry` objects are only built when an entry is accessed.
+
+    A timeline rebuilt with :meth:`from_state` uses the given arrays and arena
+    in place (for example views of a memory-mapped snapshot); new text is
+    appended to a separate ``bytearray`` after the read-only base arena.
+
+    Ids that are not canonical UUID strings are hashed to a UUID for lookup and
+    the original string is kept on the side. Ids are resolved (for
+    ``sources`` and removal) through a sorted array of UUID words that is
+    rebuilt in bulk, plus a small dict for ids added since the last rebuild.
+    """
+
+    def __init__(self, entries: Iterable[MemoryEntry] = ()) -> None:
+        self._columns = _empty_columns(16)
+        self._head = 0
+        self._size = 0
+        self._kinds: list[str] = []
+        self._kind_codes: dict[str, int] = {}
+        self._base: bytes | memoryview = b""
+        self._arena = bytearray()
+        self._garbage = 0
+        self._serial_uuids = np.zeros((16, 2), dtype=np.uint64)
+        self._serial_count = 0
+        self._foreign_ids: dict[int, str] = {}
+        # id -> serial lookup: sorted high words for old serials plus a dict of recent ones.
+        self._sorted_high = np.zeros(0, dtype=np.uint64)
+        self._sorted_serials = np.zeros(0, dtype=np.int32)
+        self._recent_ids: dict[str, int] = {}
+        self.extend(entries)
+
+    # ------------------------------------------------------------------
+    # Timeline interface
+    # ------------------------------------------------------------------
+    def __len__(self) -> int:
+        return self._size - self._head
+
+    def __iter__(self) -> Iterator[MemoryEntry]:
+        return iter([self._materialize(row) for row in range(self._head, self._size)])
+
+    def __getitem__(self, index: int) -> MemoryEntry:
+        return self._materialize(self._row(index))
+
+    def kind_at(self, index: int) -> str:
+        return self._kinds[self._columns["kind"][self._row(index)]]
+
+    def append(self, entry: MemoryEntry) -> None:
+        self.extend([entry])
+
+    def extend(self, entries: Iterable[MemoryEntry]) -> None:
+        batch = sorted(entries, key=lambda entry: entry.created_at)
+        if not batch:
+            return
+        rows = self._encode(batch)
+        created = self._columns["created_at"]
+        if self._size == self._head or created[self._size - 1] <= rows["created_at"][0]:
+            position = self._size
+        else:
+            live = created[self._head : self._size]
+            position = self._head + int(np.searchsorted(live, rows["created_at"][0], side="right"))
+            merged = {
+                name: np.concatenate((self._columns[name][position : self._size], values))
+                for name, values in rows.items()
+            }
+            order = np.argsort(merged["created_at"], kind="stable")
+            rows = {name: values[order] for name, values in merged.items()}
+        end = position + len(rows["created_at"])
+        self._reserve(end)
+        for name, values in rows.items():
+            self._columns[name][position:end] = values
+        self._size = end
+
+    def newest(self, n: int) -> list[MemoryEntry]:
+        if n <= 0:
+            return []
+        start = max(self._head, self._size - n)
+        return [self._materialize(row) for row in range(self._size - 1, start - 1, -1)]
+
+    def pop_oldest(self, count: int) -> list[MemoryEntry]:
+        count = max(0, min(count, len(self)))
+        dropped = [self._materialize(row) for row in range(self._head, self._head + count)]
+        self._garbage += int(self._stored_lengths(slice(self._head, self._head + count)).sum())
+        self._head += count
+        if self._head >= _MIN_RECLAIM and self._head * 2 >= self._size:
+            self._keep(np.arange(self._head, self._size))
+        return dropped
+
+    def remove(self, entry_ids: set[str]) -> list[MemoryEntry]:
+        targets = [serial for serial in self._lookup(list(entry_ids)) if serial is not None]
+        mask = np.isin(self._columns["serial"][self._head : self._size], targets)
+        removed_rows = np.nonzero(mask)[0] + self._head
+        removed = [self._materialize(row) for row in removed_rows.tolist()]
+        self._garbage += int(self._stored_lengths(removed_rows).sum())
+        self._keep(np.nonzero(~mask)[0] + self._head)
+        return removed
+
+    def kind_counts(self) -> Counter[str]:
+        counts = np.bincount(self._columns["kind"][self._head : self._size], minlength=len(self._kinds))
+        return Counter({kind: count for kind, count in zip(self._kinds, counts.tolist()) if count})
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by columns and the arena, including spare capacity."""
+
+        columns = sum(column.nbytes for column in self._columns.values())
+        return columns + self._serial_uuids.nbytes + self._arena_size
+
+    # ------------------------------------------------------------------
+    # Array images
+    # ------------------------------------------------------------------
+    def export_state(self) -> ColumnarState:
+        """Copy the live rows into a :class:`ColumnarState` with a packed arena."""
+
+        rows = slice(self._head, self._size)
+        columns = {name: column[rows].copy() for name, column in self._columns.items()}
+        columns["text_offset"], arena = self._packed_text(rows)
+        # Only serials the live rows still reference (as ids or sources) are written, renumbered densely.
+        live = self._live_serials(rows)
+        _renumber(columns, live)
+        serial_uuids = self._serial_uuids[live]
+        return ColumnarState(
+            columns=columns,
+            serial_uuids=serial_uuids,
+            sorted_serials=np.argsort(serial_uuids[:, 0], kind="stable").astype(np.int32),
+            kinds=list(self._kinds),
+            foreign_ids=self._live_foreign_ids(live),
+            arena=arena,
+        )
+
+    @classmethod
+    def from_state(cls, state: ColumnarState) -> "ColumnarTimeline":
+        """Adopt ``state`` without copying its arrays or arena."""
+
+        timeline = cls()
+        timeline._columns = dict(state.columns)
+        timeline._size = len(state.columns["created_at"])
+        timeline._kinds = list(state.kinds)
+        timeline._kind_codes = {kind: code for code, kind in enumerate(timeline._kinds)}
+        timeline._base = state.arena
+        timeline._serial_uuids = state.serial_uuids
+        timeline._serial_count = len(state.serial_uuids)
+        timeline._foreign_ids = dict(state.foreign_ids)
+        timeline._sorted_serials = state.sorted_serials
+        timeline._sorted_high = state.serial_uuids[state.sorted_serials, 0]
+        return timeline
+
+    # ------------------------------------------------------------------
+    # Encoding helpers
+    # ------------------------------------------------------------------
+    def _encode(self, batch: list[MemoryEntry]) -> dict[str, np.ndarray]:
+        count = len(batch)
+        first = self._allocate_serials([entry.id for entry in batch])
+        self._recent_ids.update((entry.id, first + idx) for idx, entry in enumerate(batch))
+        scores: list[tuple[float, float, float]] = []
+        lengths: list[int] = []
+        source_rows: list[int] = []
+        source_ids: list[str] = []
+        pieces: list[bytes] = []
+        no_scores = (math.nan, math.nan, math.nan)
+        for idx, entry in enumerate(batch):
+            extra = dict(entry.metadata)
+            score = extra.get("scores")
+            if (
+                isinstance(score, dict)
+                and set(score) == set(_SCORE_KEYS)
+                and all(isinstance(value, (int, float)) for value in score.values())
+            ):
+                scores.append((score["novelty"], score["coherence"], score["usefulness"]))
+                del extra["scores"]
+            else:
+                scores.append(no_scores)
+            source = extra.get("sources")
+            if isinstance(source, (list, tuple)) and len(source) == 2 and all(isinstance(s, str) for s in source):
+                source_rows.append(idx)
+                source_ids.extend(source)
+                del extra["sources"]
+            justification = extra.pop("justification", None)
+            if justification is not None and not isinstance(justification, str):
+                extra["justification"] = justification
+                justification = None
+            for text in (entry.content, justification, json.dumps(extra, sort_keys=True) if extra else None):
+                if text is None:
+                    lengths.append(_ABSENT)
+                    continue
+                data = text.encode("utf-8")
+                lengths.append(len(data))
+                pieces.append(data)
+
+        sources = np.full((count, 2), _NO_SOURCE, dtype=np.int32)
+        if source_rows:
+            sources[source_rows] = np.asarray(self._resolve(source_ids), dtype=np.int32).reshape(-1, 2)
+        text_lengths = np.asarray(lengths, dtype=np.uint32).reshape(-1, 3)
+        stored = np.where(text_lengths == _ABSENT, 0, text_lengths).sum(axis=1, dtype=np.int64)
+        offsets = self._arena_size + np.cumsum(stored) - stored
+        self._arena += b"".join(pieces)
+        if len(self._recent_ids) > max(_MIN_RECLAIM, self._serial_count // 32):
+            self._rebuild_lookup()
+        return {
+            "created_at": np.fromiter((entry.created_at for entry in batch), dtype=np.float64, count=count),
+            "kind": np.fromiter((self._kind_code(entry.kind) for entry in batch), dtype=np.uint16, count=count),
+            "serial": np.arange(first, first + count, dtype=np.int32),
+            "scores": np.asarray(scores, dtype=np.float32).reshape(-1, 3),
+            "sources": sources,
+            "text_offset": offsets,
+            "text_lengths": text_lengths,
+        }
+
+    def _materialize(self, row: int) -> MemoryEntry:
+        columns = self._columns
+        content, justification, extra = self._texts(row)
+        metadata: dict[str, Any] = json.loads(extra) if extra is not None else {}
+        sources = columns["sources"][row]
+        if sources[0] != _NO_SOURCE:
+            metadata["sources"] = (self._id_of(int(sources[0])), self._id_of(int(sources[1])))
+        scores = columns["scores"][row]
+        if not math.isnan(scores[0]):
+            # float32 keeps ~7 significant digits; round-trip through that precision.
+            metadata["scores"] = {key: float(f"{value:.7g}") for key, value in zip(_SCORE_KEYS, scores.tolist())}
+        if justification is not None:
+            metadata["justification"] = justification
+        return MemoryEntry(
+            id=self._id_of(int(columns["serial"][row])),
+            content=content or "",
+            kind=self._kinds[columns["kind"][row]],
+            created_at=float(columns["created_at"][row]),
+            metadata=metadata,
+        )
+
+    def _texts(self, row: int) -> list[str | None]:
+        lengths = self._columns["text_lengths"][row].tolist()
+        start = int(self._columns["text_offset"][row])
+        data = self._text_range(start, start + sum(length for length in lengths if length != _ABSENT))
+        texts: list[str | None] = []
+        offset = 0
+        for length in lengths:
+            if length == _ABSENT:
+                texts.append(None)
+                continue
+            texts.append(data[offset : offset + length].decode("utf-8"))
+            offset += length
+        return texts
+
+    @property
+    def _arena_size(self) -> int:
+        return len(self._base) + len(self._arena)
+
+    def _text_range(self, start: int, stop: int) -> bytes:
+        """Arena bytes ``[start, stop)`` across the base and appended segments."""
+
+        split = len(self._base)
+        if stop <= split:
+            return bytes(self._base[start:stop])
+        if start >= split:
+            return bytes(self._arena[start - split : stop - split])
+        return bytes(self._base[start:]) + bytes(self._arena[: stop - split])
+
+    def _packed_text(self, rows: slice) -> tuple[np.ndarray, bytes]:
+        """Text of ``rows`` packed back to back, with the new per-row offsets."""
+
+        starts = self._columns["text_offset"][rows]
+        lengths = self._stored_lengths(rows)
+        offsets = np.cumsum(lengths) - lengths
+        if not len(starts):
+            return offsets, b""
+        if np.array_equal(starts[1:], starts[:-1] + lengths[:-1]):
+            # Common case: rows were appended in order and nothing was dropped in between.
+            data = self._text_range(int(starts[0]), int(starts[-1] + lengths[-1]))
+        else:
+            data = b"".join(
+                self._text_range(start, start + length) for start, length in zip(starts.tolist(), lengths.tolist())
+            )
+        return offsets, data
+
+    def _stored_lengths(self, rows: slice | np.ndarray) -> np.ndarray:
+        """Arena bytes used by each of ``rows``."""
+
+        lengths = self._columns["text_lengths"][rows]
+        return np.where(lengths == _ABSENT, 0, lengths).sum(axis=1, dtype=np.int64)
+
+    def _kind_code(self, kind: str) -> int:
+        code = self._kind_codes.get(kind)
+        if code is None:
+            code = self._kind_codes[kind] = len(self._kinds)
+            self._kinds.append(kind)
+        return code
+
+    # ------------------------------------------------------------------
+    # Id <-> serial mapping
+    # ------------------------------------------------------------------
+    def _allocate_serials(self, entry_ids: list[str]) -> int:
+        """Assign consecutive serials to ``entry_ids``; returns the first one."""
+
+        first = self._serial_count
+        needed = first + len(entry_ids)
+        if needed > len(self._serial_uuids):
+            # A reopened snapshot adopts exact-size arrays, which may be empty.
+            capacity = max(needed, len(self._serial_uuids) * 2, 16)
+            grown = np.zeros((capacity, 2), dtype=np.uint64)
+            grown[:first] = self._serial_uuids[:first]
+            self._serial_uuids = grown
+        raw = []
+        for offset, entry_id in enumerate(entry_ids):
+            canonical = _canonical_uuid_bytes(entry_id)
+            if canonical is None:
+                canonical = uuid.uuid5(_FOREIGN_NAMESPACE, entry_id).bytes
+                self._foreign_ids[first + offset] = entry_id
+            raw.append(canonical)
+        self._serial_uuids[first:needed] = np.frombuffer(b"".join(raw), dtype=np.uint64).reshape(-1, 2)
+        self._serial_count = needed
+        return first
+
+    def _resolve(self, entry_ids: list[str]) -> list[int]:
+        """Serials for ``entry_ids``; unknown ids (dangling sources) get a new id-only serial."""
+
+        serials = self._lookup(entry_ids)
+        for idx, serial in enumerate(serials):
+            if serial is None:
+                entry_id = entry_ids[idx]
+                serial = self._recent_ids.get(entry_id)
+                if serial is None:
+                    serial = self._recent_ids[entry_id] = self._allocate_serials([entry_id])
+                serials[idx] = serial
+        return serials  # type: ignore[return-value]
+
+    def _lookup(self, entry_ids: list[str]) -> list[int | None]:
+        """Resolve ids: recent ones via a small dict, older ones by one vectorised binary search."""
+
+        serials: list[int | None] = [self._recent_ids.get(entry_id) for entry_id in entry_ids]
+        pending = [idx for idx, serial in enumerate(serials) if serial is None]
+        if not pending or not len(self._sorted_high):
+            return serials
+        words = np.frombuffer(b"".join(_uuid_bytes(entry_ids[idx]) for idx in pending), dtype=np.uint64)
+        words = words.reshape(-1, 2)
+        # The sort is stable, so the last slot with a matching high word holds the newest serial.
+        slots = np.searchsorted(self._sorted_high, words[:, 0], side="right") - 1
+        candidates = self._sorted_serials[np.maximum(slots, 0)]
+        found = (slots >= 0) & (self._serial_uuids[candidates] == words).all(axis=1)
+        for idx, hit, candidate in zip(pending, found.tolist(), candidates.tolist()):
+            if hit:
+                serials[idx] = candidate
+        return serials
+
+    def _rebuild_lookup(self) -> None:
+        order = np.argsort(self._serial_uuids[: self._serial_count, 0], kind="stable")
+        self._sorted_high = self._serial_uuids[order, 0]
+        self._sorted_serials = order.astype(np.int32)
+        self._recent_ids.clear()
+
+    def _live_serials(self, rows: slice) -> np.ndarray:
+        """Serials that ``rows`` reference as ids or sources, in ascending order."""
+
+        sources = self._columns["sources"][rows]
+        return np.unique(np.concatenate((self._columns["serial"][rows], sources[sources != _NO_SOURCE])))
+
+    def _live_foreign_ids(self, live: np.ndarray) -> dict[int, str]:
+        """Original strings of foreign ids among ``live``, keyed by their position in it."""
+
+        foreign: dict[int, str] = {}
+        for serial, entry_id in self._foreign_ids.items():
+            position = int(np.searchsorted(live, serial))
+            if position < len(live) and live[position] == serial:
+                foreign[position] = entry_id
+        return foreign
+
+    def _compact_serials(self) -> None:
+        """Drop serials no row references any more once they make up half of the table."""
+
+        live = self._live_serials(slice(self._head, self._size))
+        if len(live) * 2 > self._serial_count:
+            return
+        _renumber({name: self._columns[name][self._head : self._size] for name in ("serial", "sources")}, live)
+        self._foreign_ids = self._live_foreign_ids(live)
+        self._serial_uuids = self._serial_uuids[live]
+        self._serial_count = len(live)
+        self._rebuild_lookup()
+
+    def _id_of(self, serial: int) -> str:
+        foreign = self._foreign_ids.get(serial)
+        if foreign is not None:
+            return foreign
+        return str(uuid.UUID(bytes=self._serial_uuids[serial].tobytes()))
+
+    # ------------------------------------------------------------------
+    # Storage management
+    # ------------------------------------------------------------------
+    def _row(self, index: int) -> int:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("timeline index out of range")
+        return self._head + index
+
+    def _reserve(self, size: int) -> None:
+        capacity = len(self._columns["created_at"])
+        if size <= capacity:
+            return
+        grown = _empty_columns(max(size, capacity + capacity // 2, 16))
+        for name, column in self._columns.items():
+            grown[name][: self._size] = column[: self._size]
+        self._columns = grown
+
+    def _keep(self, rows: np.ndarray) -> None:
+        """Compact the table down to ``rows`` (absolute, ordered)."""
+
+        for column in self._columns.values():
+            column[: len(rows)] = column[rows]
+        self._head = 0
+        self._size = len(rows)
+        self._compact_serials()
+        if self._garbage * 2 > self._arena_size:
+            self._compact_arena()
+
+    def _compact_arena(self) -> None:
+        offsets, data = self._packed_text(slice(0, self._size))
+        self._columns["text_offset"][: self._size] = offsets
+        self._base = b""
+        self._arena = bytearray(data)
+        self._garbage = 0
+
+
+def _empty_columns(capacity: int) -> dict[str, np.ndarray]:
+    return {name: np.full((capacity, *shape), fill, dtype=dtype) for name, (dtype, shape, fill) in _COLUMNS.items()}
+
+
+def _renumber(columns: dict[str, np.ndarray], live: np.ndarray) -> None:
+    """Rewrite ``serial`` and ``sources`` in place as positions in the sorted serials ``live``."""
+
+    columns["serial"][:] = np.searchsorted(live, columns["serial"])
+    sources = columns["sources"]
+    linked = sources != _NO_SOURCE
+    sources[linked] = np.searchsorted(live, sources[linked])
+
+
+def _canonical_uuid_bytes(entry_id: str) -> bytes | None:
+    """Bytes of ``entry_id`` if it is a canonical (lower-case, hyphenated) UUID string."""
+
+    if _CANONICAL_UUID.fullmatch(entry_id) is None:
+        return None
+    return bytes.fromhex(entry_id.replace("-", ""))
+
+
+def _uuid_bytes(entry_id: str) -> bytes:
+    canonical = _canonical_uuid_bytes(entry_id)
+    return canonical if canonical is not None else uuid.uuid5(_FOREIGN_NAMESPACE, entry_id).bytes
+
+
+__all__ = ["ColumnarState", "ColumnarTimeline"]
@@ -15,8 +15,15 @@ class DaydreamConfig:
         novelty_threshold: Minimum novelty score to accept an idea.
         usefulness_threshold: Minimum usefulness score to accept an idea.
         coherence_threshold: Minimum coherence score to accept an idea.
-        max_history: Maximum number of entries to keep in memory (oldest dropped).
-        sleep_interval: Seconds to sleep between iterations when running continuously.
+        max_history: Maximum number of entries to keep in memory (oldest dropped
+            unless the store has an eviction policy).
+        sleep_interval: Seconds to sleep between iterations when running continuously
+            without a budget scheduler.
+        max_generation_depth: When set, only entries at most this many generations
+            away from the seed concepts are paired (requires a lineage index).
+        borderline_band: With a cascaded critic, first-stage scores this close to
+            the thresholds are escalated. Ideas that clear every threshold by more
+            than the band, or miss one by more than it, keep the first-stage score.
     """
 
     batch_size: int = 1
@@ -25,6 +32,8 @@ class DaydreamConfig:
     coherence_threshold: float = 6.0
     max_history: int | None = 10_000
     sleep_interval: timedelta = field(default=timedelta(seconds=5))
+    max_generation_depth: int | None = None
+    borderline_band: float = 1.0
 
     def __post_init__(self) -> None:
         if self.batch_size < 1:
@@ -37,3 +46,7 @@ class DaydreamConfig:
             raise ValueError("max_history must be None or >= 1")
         if self.sleep_interval.total_seconds() < 0:
             raise ValueError("sleep_interval must be non-negative")
+        if self.max_generation_depth is not None and self.max_generation_depth < 0:
+            raise ValueError("max_generation_depth must be None or >= 0")
+        if self.borderline_band < 0:
+            raise ValueError("borderline_band must be non-negative")
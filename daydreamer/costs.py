@@ -0,0 +1,325 @@
+"""Token, cost and latency accounting for LLM calls made by the loop."""
+
+from __future__ import annotations
+
+import json
+import logging
+import threading
+from collections import Counter, deque
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Mapping
+
+from .llm import LLMResponse, TokenUsage
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True, slots=True)
+class ModelPrice:
+    """USD per million tokens.
+
+    Cache writes default to 1.25x and cache reads to 0.1x the input price,
+    matching Anthropic's five-minute prompt cache.
+    """
+
+    input: float
+    output: float
+    cache_write: float | None = None
+    cache_read: float | None = None
+
+    def cost(self, usage: TokenUsage) -> float:
+        cache_write = self.input * 1.25 if self.cache_write is None else self.cache_write
+        cache_read = self.input * 0.1 if self.cache_read is None else self.cache_read
+        return (
+            usage.input_tokens * self.input
+            + usage.output_tokens * self.output
+            + usage.cache_creation_input_tokens * cache_write
+            + usage.cache_read_input_tokens * cache_read
+        ) / 1_000_000
+
+
+# Message Batches are billed at half the standard price.
+BATCH_PRICE_FACTOR = 0.5
+
+# Keys are model-name prefixes; the longest matching prefix wins.
+DEFAULT_PRICES: dict[str, ModelPrice] = {
+    "claude-3-haiku": ModelPrice(input=0.25, output=1.25),
+    "claude-3-5-haiku": ModelPrice(input=0.80, output=4.0),
+    "claude-haiku-4": ModelPrice(input=1.0, output=5.0),
+    "claude-3-sonnet": ModelPrice(input=3.0, output=15.0),
+    "claude-3-5-sonnet": ModelPrice(input=3.0, output=15.0),
+    "claude-3-7-sonnet": ModelPrice(input=3.0, output=15.0),
+    "claude-sonnet-4": ModelPrice(input=3.0, output=15.0),
+    "claude-3-opus": ModelPrice(input=15.0, output=75.0),
+    "claude-opus-4": ModelPrice(input=15.0, output=75.0),
+    "claude-opus-4-5": ModelPrice(input=5.0, output=25.0),
+    "mock": ModelPrice(input=0.0, output=0.0),
+}
+
+
+def load_prices(path: str | Path) -> dict[str, ModelPrice]:
+    """Read a price table: ``{"<model prefix>": {"input": ..., "output": ..., ...}}``."""
+
+    raw = json.loads(Path(path).read_text(encoding="utf-8"))
+    try:
+        return {prefix: ModelPrice(**values) for prefix, values in raw.items()}
+    except TypeError as exc:
+        raise ValueError(f"Invalid price table {path}: {exc}") from exc
+
+
+@dataclass(slots=True)
+class StageTotals:
+    """Aggregated accounting for one stage (``generator``, ``critic``, ...)."""
+
+    calls: int = 0  # calls that reached the model; cache hits are counted in ``cached`` instead
+    items: int = 0  # ideas covered; a batched call covers several
+    cached: int = 0  # responses served from a response cache
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cache_creation_input_tokens: int = 0
+    cache_read_input_tokens: int = 0
+    cost: float = 0.0
+    latency: float = 0.0  # summed seconds over calls that reported it
+    time_to_first_byte: float = 0.0
+    timed_calls: int = 0
+    stop_reasons: Counter[str] = field(default_factory=Counter)
+
+    @property
+    def mean_latency(self) -> float | None:
+        return self.latency / self.timed_calls if self.timed_calls else None
+
+    @property
+    def mean_time_to_first_byte(self) -> float | None:
+        return self.time_to_first_byte / self.timed_calls if self.timed_calls else None
+
+    def add(self, response: LLMResponse, cost: float, items: int = 1) -> None:
+        self.items += items
+        if response.cached:
+            self.cached += 1
+            return
+        self.calls += 1
+        self.cost += cost
+        usage = response.usage
+        if usage is not None:
+            self.input_tokens += usage.input_tokens
+            self.output_tokens += usage.output_tokens
+            self.cache_creation_input_tokens += usage.cache_creation_input_tokens
+            self.cache_read_input_tokens += usage.cache_read_input_tokens
+        if response.latency is not None:
+            self.timed_calls += 1
+            self.latency += response.latency
+            self.time_to_first_byte += response.time_to_first_byte or 0.0
+        if response.stop_reason:
+            self.stop_reasons[response.stop_reason] += 1
+
+    def merge(self, other: StageTotals) -> None:
+        for name in (
+            "calls",
+            "items",
+            "cached",
+            "input_tokens",
+            "output_tokens",
+            "cache_creation_input_tokens",
+            "cache_read_input_tokens",
+            "cost",
+            "latency",
+            "time_to_first_byte",
+            "timed_calls",
+        ):
+            setattr(self, name, getattr(self, name) + getattr(other, name))
+        self.stop_reasons.update(other.stop_reasons)
+
+
+# Ledger stages of a cascaded critic (see IdeaCritic): every idea is screened, borderline ones escalated.
+SCREENING_STAGE = "critic"
+ESCALATION_STAGE = "critic-escalation"
+
+
+@dataclass(frozen=True, slots=True)
+class CascadeSummary:
+    """How a cascaded critic's two stages were used.
+
+    ``savings`` estimates what scoring every screened idea at the mean
+    escalation cost would have cost, minus what both stages actually cost;
+    it is ``None`` until something has been escalated.
+    """
+
+    screened: int
+    escalated: int
+    cost: float
+    savings: float | None
+
+    @property
+    def escalation_rate(self) -> float:
+        return self.escalated / self.screened if self.screened else 0.0
+
+    @classmethod
+    def from_stages(cls, stages: Mapping[str, StageTotals]) -> CascadeSummary | None:
+        """Summarise ``stages``; ``None`` when nothing has been escalated."""
+
+        escalation = stages.get(ESCALATION_STAGE)
+        if escalation is None or not escalation.items:
+            return None
+        screening = stages.get(SCREENING_STAGE, StageTotals())
+        cost = screening.cost + escalation.cost
+        savings = screening.items * escalation.cost / escalation.items - cost if escalation.cost else None
+        return cls(screened=screening.items, escalated=escalation.items, cost=cost, savings=savings)
+
+
+@dataclass(slots=True)
+class IterationCost:
+    """Accounting for one loop iteration."""
+
+    stages: dict[str, StageTotals] = field(default_factory=dict)
+    accepted: int = 0
+
+    @property
+    def cost(self) -> float:
+        return sum(stage.cost for stage in self.stages.values())
+
+    @property
+    def cascade(self) -> CascadeSummary | None:
+        return CascadeSummary.from_stages(self.stages)
+
+
+class CostLedger:
+    """Per-stage and per-iteration totals of the LLM calls the loop makes.
+
+    Costs come from ``prices`` (model-name prefix to :class:`ModelPrice`,
+    :data:`DEFAULT_PRICES` by default), looked up by the model each response
+    reports, falling back to ``default_model``. Calls whose model has no
+    price count towards tokens and latency but cost nothing (with a warning).
+    The last ``history`` iterations are kept.
+    """
+
+    def __init__(
+        self,
+        prices: Mapping[str, ModelPrice] | None = None,
+        *,
+        default_model: str | None = None,
+        history: int = 1000,
+    ) -> None:
+        self._prices = dict(DEFAULT_PRICES if prices is None else prices)
+        self._default_model = default_model
+        self._lock = threading.Lock()
+        self._totals: dict[str, StageTotals] = {}
+        self._accepted = 0
+        self._iterations: deque[IterationCost] = deque(maxlen=history)
+        self._unpriced: set[str | None] = set()
+
+    def price_for(self, model: str | None) -> ModelPrice | None:
+        model = model or self._default_model
+        if model is None:
+            return None
+        matches = [prefix for prefix in self._prices if model.startswith(prefix)]
+        return self._prices[max(matches, key=len)] if matches else None
+
+    def begin_iteration(self) -> None:
+        with self._lock:
+            self._iterations.append(IterationCost())
+
+    def record(self, stage: str, response: LLMResponse, *, price_factor: float = 1.0, items: int = 1) -> float:
+        """Add one call to ``stage`` and return its cost in USD.
+
+        ``price_factor`` scales the list price, e.g. :data:`BATCH_PRICE_FACTOR`;
+        ``items`` is the number of ideas the call covered. Cached responses
+        cost nothing and are counted apart from calls.
+        """
+
+        model = response.model or self._default_model
+        price = None if response.cached else self.price_for(model)
+        cost = price.cost(response.usage) * price_factor if price is not None and response.usage is not None else 0.0
+        with self._lock:
+            if price is None and not response.cached and model not in self._unpriced:
+                self._unpriced.add(model)
+                logger.warning("No price for model %r; its calls are counted as free", model)
+            self._totals.setdefault(stage, StageTotals()).add(response, cost, items)
+            if self._iterations:
+                self._iterations[-1].stages.setdefault(stage, StageTotals()).add(response, cost, items)
+        return cost
+
+    def record_accepted(self, count: int = 1) -> None:
+        with self._lock:
+            self._accepted += count
+            if self._iterations:
+                self._iterations[-1].accepted += count
+
+    @property
+    def stages(self) -> dict[str, StageTotals]:
+        """Totals per stage since the ledger was created."""
+
+        with self._lock:
+            copies = {}
+            for name, totals in self._totals.items():
+                copy = StageTotals()
+                copy.merge(totals)
+                copies[name] = copy
+            return copies
+
+    @property
+    def iterations(self) -> list[IterationCost]:
+        with self._lock:
+            return list(self._iterations)
+
+    @property
+    def accepted(self) -> int:
+        return self._accepted
+
+    @property
+    def total_cost(self) -> float:
+        with self._lock:
+            return sum(stage.cost for stage in self._totals.values())
+
+    @property
+    def cascade(self) -> CascadeSummary | None:
+        """Escalation rate and estimated savings of a cascaded critic."""
+
+        return CascadeSummary.from_stages(self.stages)
+
+    @property
+    def cost_per_accepted_idea(self) -> float | None:
+        """Everything spent (rejected and duplicate proposals included) per accepted idea."""
+
+        accepted = self._accepted
+        return self.total_cost / accepted if accepted else None
+
+    def summary(self) -> str:
+        lines = []
+        for name, stage in sorted(self.stages.items()):
+            latency = stage.mean_latency
+            lines.append(
+                f"{name}: {stage.calls} calls"
+                + (f" (+{stage.cached} cache hits)" if stage.cached else "")
+                + f", {stage.input_tokens} in"
+                f" (+{stage.cache_read_input_tokens} cached, +{stage.cache_creation_input_tokens} cache writes),"
+                f" {stage.output_tokens} out, ${stage.cost:.4f}"
+                + ("" if latency is None else f", {latency:.2f}s mean latency")
+            )
+        cascade = self.cascade
+        if cascade is not None:
+            lines.append(
+                f"critic cascade: {cascade.escalated} of {cascade.screened} ideas escalated"
+                f" ({cascade.escalation_rate:.1%})"
+                + ("" if cascade.savings is None else f", ~${cascade.savings:.4f} saved")
+            )
+        per_idea = self.cost_per_accepted_idea
+        lines.append(
+            f"total ${self.total_cost:.4f} for {self._accepted} accepted ideas"
+            + ("" if per_idea is None else f" (${per_idea:.4f} per idea)")
+        )
+        return "\n".join(lines)
+
+
+__all__ = [
+    "BATCH_PRICE_FACTOR",
+    "CascadeSummary",
+    "CostLedger",
+    "DEFAULT_PRICES",
+    "ESCALATION_STAGE",
+    "IterationCost",
+    "ModelPrice",
+    "SCREENING_STAGE",
+    "StageTotals",
+    "load_prices",
+]
@@ -3,14 +3,29 @@
 from __future__ import annotations
 
 import json
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterator, Sequence, cast
 
-from .llm import LLMClient, LLMRequest, LLMResponse
+from .llm import ContentBlock, LLMClient, LLMRequest, LLMResponse
 
-_CRITIC_PROMPT = """You are a discerning critic. Evaluate the following hypothesis on a scale of 1--10 for each of the following criteria:\n- Novelty: Is this idea surprising and non-obvious? (1=obvious, 10=paradigm-shifting)\n- Coherence: Is the reasoning logical and well-formed? (1=nonsense, 10=rigorous)\n- Usefulness: Could this idea lead to a testable hypothesis, a new product, or a solution to a problem? (1=useless, 10=highly applicable)\n\nHypothesis:\n"""  # noqa: E501
+_SCORE_KEYS = ("novelty", "coherence", "usefulness")
+
+# Shared by the single and batched prompts, so both score against the same rubric.
+_RUBRIC = """on a scale of 1--10 for each of the following criteria:\n- Novelty: Is this idea surprising and non-obvious? (1=obvious, 10=paradigm-shifting)\n- Coherence: Is the reasoning logical and well-formed? (1=nonsense, 10=rigorous)\n- Usefulness: Could this idea lead to a testable hypothesis, a new product, or a solution to a problem? (1=useless, 10=highly applicable)\n\n"""  # noqa: E501
+
+_CRITIC_PROMPT = f"You are a discerning critic. Evaluate the following hypothesis {_RUBRIC}Hypothesis:\n"
 
 _CRITIC_SUFFIX = """\n\nRespond in compact JSON with the following shape:\n{\n  "novelty": <float>,\n  "coherence": <float>,\n  "usefulness": <float>,\n  "justification": "<1-2 sentences summary>"\n}"""
 
+_BATCH_PROMPT = (
+    f"You are a discerning critic. Evaluate each of the following hypotheses independently {_RUBRIC}Hypotheses:\n"
+)
+
+_BATCH_SUFFIX = """\n\nRespond with a compact JSON array holding one object per hypothesis:\n[\n  {\n    "id": "<hypothesis id>",\n    "novelty": <float>,\n    "coherence": <float>,\n    "usefulness": <float>,\n    "justification": "<1 sentence summary>"\n  }\n]"""
+
+# Output budget per hypothesis in a batched request.
+_BATCH_TOKENS_PER_IDEA = 160
+
 
 @dataclass(slots=True)
 class IdeaScore:
@@ -18,28 +33,168 @@ class IdeaScore:
     coherence: float
     usefulness: float
     justification: str
+    response: LLMResponse | None = field(default=None, compare=False, repr=False)
+    # The first-stage score of a cascaded critic when this score came from escalation.
+    screening: IdeaScore | None = field(default=None, compare=False, repr=False)
 
     @property
     def average(self) -> float:
         return (self.novelty + self.coherence + self.usefulness) / 3
 
+    @property
+    def escalated(self) -> bool:
+        return self.screening is not None
+
 
 class IdeaCritic:
-    """Scores ideas according to structured rubric."""
+    """Scores ideas according to structured rubric.
+
+    With ``stream`` (the default) the response is streamed and closed as soon
+    as the score object is complete, so commentary the model adds after the
+    closing brace is never generated.
 
-    def __init__(self, client: LLMClient, *, prompt_prefix: str | None = None) -> None:
+    With an ``escalation_client`` the critic is a two-stage cascade: ``client``
+    (a cheap, fast model) screens every idea and only scores for which the
+    ``escalate`` predicate passed to :meth:`score` holds are re-scored by the
+    escalation model. The returned score then keeps the first-stage score in
+    :attr:`IdeaScore.screening`.
+
+    :meth:`score_batch` packs several hypotheses into one request, so the
+    rubric is sent once per batch rather than once per idea. Every score of a
+    batch shares that call's :attr:`IdeaScore.response`.
+    """
+
+    def __init__(
+        self,
+        client: LLMClient,
+        *,
+        prompt_prefix: str | None = None,
+        batch_prompt_prefix: str | None = None,
+        stream: bool = True,
+        escalation_client: LLMClient | None = None,
+    ) -> None:
         self._client = client
         self._prompt_prefix = prompt_prefix or _CRITIC_PROMPT
+        self._batch_prompt_prefix = batch_prompt_prefix or _BATCH_PROMPT
+        self._stream = stream
+        self._escalation_client = escalation_client
+
+    @property
+    def cascaded(self) -> bool:
+        return self._escalation_client is not None
+
+    def score(self, idea: str, *, escalate: Callable[[IdeaScore], bool] | None = None) -> IdeaScore:
+        request = self.build_request(idea)
+        screening = self._score(self._client, request)
+        if self._escalation_client is None or escalate is None or not escalate(screening):
+            return screening
+        score = self._score(self._escalation_client, request)
+        score.screening = screening
+        return score
+
+    def score_batch(
+        self, ideas: Sequence[str], *, escalate: Callable[[IdeaScore], bool] | None = None
+    ) -> list[IdeaScore]:
+        """Score ``ideas`` with one call per stage; results keep the order of ``ideas``.
+
+        Hypotheses the response leaves out (or that cannot be matched to an
+        id) are re-scored individually. With a cascade, the ideas to escalate
+        are re-scored together in one escalation call.
+        """
+
+        scores = self._score_batch(self._client, ideas)
+        if self._escalation_client is None or escalate is None:
+            return scores
+        borderline = [index for index, score in enumerate(scores) if escalate(score)]
+        if borderline:
+            rescored = self._score_batch(self._escalation_client, [ideas[index] for index in borderline])
+            for index, score in zip(borderline, rescored):
+                score.screening = scores[index]
+                scores[index] = score
+        return scores
+
+    def build_request(self, idea: str) -> LLMRequest:
+        """The request :meth:`score` sends, for callers that execute it themselves (e.g. batches)."""
+
+        # The rubric prefix is identical across calls and marked for prompt caching.
+        return LLMRequest.from_blocks(
+            [ContentBlock(self._prompt_prefix, cache=True), ContentBlock(f"{idea.strip()}{_CRITIC_SUFFIX}")],
+            temperature=0.2,
+        )
+
+    def build_batch_request(self, ideas: Sequence[str]) -> LLMRequest:
+        """The request :meth:`score_batch` sends; hypothesis ``n`` (from 1) gets the id ``Hn``."""
+
+        hypotheses = "\n\n".join(
+            f'<hypothesis id="H{number}">\n{idea.strip()}\n</hypothesis>' for number, idea in enumerate(ideas, 1)
+        )
+        return LLMRequest.from_blocks(
+            [ContentBlock(self._batch_prompt_prefix, cache=True), ContentBlock(f"{hypotheses}{_BATCH_SUFFIX}")],
+            temperature=0.2,
+            max_tokens=max(512, _BATCH_TOKENS_PER_IDEA * len(ideas)),
+        )
+
+    def parse_score(self, response: LLMResponse) -> IdeaScore:
+        return self._to_score(self._parse_response(response), response)
+
+    def parse_batch(self, response: LLMResponse, count: int) -> dict[int, IdeaScore]:
+        """Map hypothesis positions (from 0) to scores.
+
+        Entries may come in any order and a truncated array still yields its
+        complete objects; entries with a missing, unknown or repeated id, or
+        with a score that is missing or not a number, are skipped.
+        """
+
+        text = response.text.strip()
+        try:
+            payload = json.loads(text)
+            items = payload if isinstance(payload, list) else [payload]
+        except json.JSONDecodeError:
+            items = list(_embedded_objects(text))
+        scores: dict[int, IdeaScore] = {}
+        for item in items:
+            if not isinstance(item, dict):
+                continue
+            index = _hypothesis_index(item.get("id"), count)
+            if index is None or index in scores:
+                continue
+            if not all(_is_number(item.get(key)) for key in _SCORE_KEYS):
+                continue  # left to the single-idea fallback rather than scored as 0
+            scores[index] = self._to_score(self._normalise(item, ""), response)
+        return scores
+
+    def _score(self, client: LLMClient, request: LLMRequest) -> IdeaScore:
+        return self.parse_score(self._complete(client, request))
+
+    def _score_batch(self, client: LLMClient, ideas: Sequence[str]) -> list[IdeaScore]:
+        if len(ideas) == 1:
+            return [self._score(client, self.build_request(ideas[0]))]
+        if not ideas:
+            return []
+        parsed = self.parse_batch(self._complete(client, self.build_batch_request(ideas), array=True), len(ideas))
+        return [
+            parsed[index] if index in parsed else self._score(client, self.build_request(idea))
+            for index, idea in enumerate(ideas)
+        ]
 
-    def score(self, idea: str) -> IdeaScore:
-        prompt = f"{self._prompt_prefix}{idea.strip()}{_CRITIC_SUFFIX}"
-        response = self._client.generate(LLMRequest(prompt=prompt, temperature=0.2))
-        payload = self._parse_response(response)
+    def _complete(self, client: LLMClient, request: LLMRequest, *, array: bool = False) -> LLMResponse:
+        if not self._stream:
+            return client.generate(request)
+        scanner = JSONObjectScanner(array=array)
+        with client.generate_stream(request) as stream:
+            for delta in stream:
+                if scanner.feed(delta):
+                    break
+        return stream.response
+
+    @staticmethod
+    def _to_score(payload: dict[str, Any], response: LLMResponse) -> IdeaScore:
         return IdeaScore(
             novelty=payload["novelty"],
             coherence=payload["coherence"],
             usefulness=payload["usefulness"],
             justification=payload.get("justification", ""),
+            response=response,
         )
 
     def _parse_response(self, response: LLMResponse) -> dict[str, float | str]:
@@ -47,12 +202,16 @@ class IdeaCritic:
         try:
             payload = json.loads(text)
         except json.JSONDecodeError:
-            # Fall back to heuristic parsing when the critic misbehaves.
-            payload = self._fallback_parse(text)
-        for key in ("novelty", "coherence", "usefulness"):
+            # Models sometimes wrap the object in prose; otherwise parse heuristically.
+            payload = next(_embedded_objects(text), None) or self._fallback_parse(text)
+        return self._normalise(payload, text)
+
+    @staticmethod
+    def _normalise(payload: dict[str, Any], justification: str) -> dict[str, Any]:
+        for key in _SCORE_KEYS:
             value = float(payload.get(key, 0.0))
             payload[key] = max(0.0, min(10.0, value))
-        payload.setdefault("justification", text)
+        payload.setdefault("justification", justification)
         return payload
 
     @staticmethod
@@ -72,4 +231,98 @@ class IdeaCritic:
         }
 
 
-__all__ = ["IdeaCritic", "IdeaScore"]
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool) and value == value  # not NaN
+
+
+def _hypothesis_index(value: Any, count: int) -> int | None:
+    """Position of the hypothesis with id ``Hn`` (or just ``n``)."""
+
+    text = str(value).strip().upper().removeprefix("H")
+    if not text.isdigit() or not 1 <= int(text) <= count:
+        return None
+    return int(text) - 1
+
+
+def _embedded_objects(text: str) -> Iterator[dict[str, Any]]:
+    """JSON objects found in ``text`` in order, skipping surrounding prose and invalid objects."""
+
+    position = 0
+    while True:
+        scanner = JSONObjectScanner()
+        if not scanner.feed(text[position:]):
+            return
+        try:
+            payload = json.loads(scanner.object or "")
+        except json.JSONDecodeError:
+            payload = None
+        if isinstance(payload, dict):
+            yield payload
+        position += cast(int, scanner.end)
+
+
+class JSONObjectScanner:
+    """Incrementally finds the first top-level JSON object in streamed text.
+
+    :meth:`feed` returns ``True`` once the object's closing brace has been
+    seen; braces inside strings are ignored. Text before the opening brace
+    (a preamble such as "Here is my evaluation:") is skipped. With ``array``
+    the scanner looks for the first top-level array instead.
+    """
+
+    def __init__(self, *, array: bool = False) -> None:
+        self._open, self._close = "[]" if array else "{}"
+        self._text: list[str] = []
+        self._start: int | None = None
+        self._end: int | None = None
+        self._offset = 0
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+
+    @property
+    def complete(self) -> bool:
+        return self._end is not None
+
+    @property
+    def end(self) -> int | None:
+        """Offset just past the closing bracket, once complete."""
+
+        return self._end
+
+    @property
+    def object(self) -> str | None:
+        """The object's text once complete."""
+
+        if self._start is None or self._end is None:
+            return None
+        return "".join(self._text)[self._start : self._end]
+
+    def feed(self, chunk: str) -> bool:
+        if self._end is not None:
+            return True
+        self._text.append(chunk)
+        for index, char in enumerate(chunk, self._offset):
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"' and self._start is not None:
+                self._in_string = True
+            elif char == self._open:
+                if self._start is None:
+                    self._start = index
+                self._depth += 1
+            elif char == self._close and self._start is not None:
+                self._depth -= 1
+                if self._depth == 0:
+                    self._end = index + 1
+                    return True
+        self._offset += len(chunk)
+        return False
+
+
+__all__ = ["IdeaCritic", "IdeaScore", "JSONObjectScanner"]
@@ -0,0 +1,209 @@
+"""MinHash/LSH near-duplicate detection for generated ideas."""
+
+from __future__ import annotations
+
+import re
+import struct
+import threading
+import zlib
+from pathlib import Path
+from typing import Iterable
+
+import numpy as np
+
+_MAGIC = b"DDLSH001"
+# magic, permutations, bands, shingle size
+_HEADER = struct.Struct("<8sIII")
+_RECORD = struct.Struct("<BH")
+_ADD, _REMOVE = 1, 2
+_PRIME = np.uint64(4294967291)  # largest prime below 2**32
+_SEED = 0x5EED
+_WORD = re.compile(r"\w+")
+
+
+class NearDuplicateIndex:
+    """Locality-sensitive hash index over MinHash signatures of idea texts.
+
+    Texts are shingled into overlapping word n-grams and summarised by
+    ``num_perm`` MinHash values, split into ``bands`` LSH bands. Candidates that
+    share a band are confirmed by their estimated Jaccard similarity against
+    ``threshold``.
+
+    With a ``path`` every add/remove is appended to a binary log of signatures,
+    so reopening rebuilds the band tables without re-hashing any text. A torn
+    trailing record is discarded on load, and the log is rewritten with only
+    the live signatures whenever removals come to dominate it.
+    """
+
+    def __init__(
+        self,
+        path: str | Path | None = None,
+        *,
+        num_perm: int = 64,
+        bands: int = 16,
+        threshold: float = 0.7,
+        shingle_size: int = 3,
+    ) -> None:
+        if num_perm < 1 or bands < 1 or num_perm % bands:
+            raise ValueError("num_perm must be a positive multiple of bands")
+        if not 0 < threshold <= 1:
+            raise ValueError("threshold must be in (0, 1]")
+        if shingle_size < 1:
+            raise ValueError("shingle_size must be >= 1")
+        self._num_perm = num_perm
+        self._bands = bands
+        self._rows = num_perm // bands
+        self._threshold = threshold
+        self._shingle_size = shingle_size
+        rng = np.random.default_rng(_SEED)
+        self._a = rng.integers(1, 1 << 31, size=num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, 1 << 31, size=num_perm, dtype=np.uint64)
+        self._lock = threading.RLock()
+        self._signatures: dict[str, np.ndarray] = {}
+        self._tables: list[dict[bytes, set[str]]] = [{} for _ in range(bands)]
+        self._path = Path(path) if path else None
+        self._log_records = 0
+        if self._path:
+            self._load()
+
+    @classmethod
+    def beside(cls, memory_path: str | Path, **kwargs: float) -> "NearDuplicateIndex":
+        """Open the index stored next to a memory file (``<memory>.lsh``)."""
+
+        memory_path = Path(memory_path)
+        return cls(memory_path.with_name(memory_path.name + ".lsh"), **kwargs)
+
+    def __len__(self) -> int:
+        return len(self._signatures)
+
+    def __contains__(self, entry_id: object) -> bool:
+        return entry_id in self._signatures
+
+    def ids(self) -> set[str]:
+        with self._lock:
+            return set(self._signatures)
+
+    def signature(self, text: str) -> np.ndarray:
+        words = _WORD.findall(text.lower())
+        size = min(self._shingle_size, len(words)) or 1
+        shingles = {" ".join(words[idx : idx + size]) for idx in range(max(1, len(words) - size + 1))}
+        hashes = np.fromiter(
+            (zlib.crc32(shingle.encode("utf-8")) for shingle in shingles), dtype=np.uint64, count=len(shingles)
+        )
+        permuted = (hashes[:, None] * self._a + self._b) % _PRIME
+        return permuted.min(axis=0).astype(np.uint32)
+
+    def add(self, entry_id: str, text: str) -> None:
+        self.add_signature(entry_id, self.signature(text))
+
+    def add_signature(self, entry_id: str, signature: np.ndarray) -> None:
+        with self._lock:
+            if entry_id in self._signatures:
+                return
+            self._insert(entry_id, signature)
+            self._append(_ADD, entry_id, signature)
+
+    def remove(self, entry_ids: Iterable[str]) -> None:
+        with self._lock:
+            for entry_id in entry_ids:
+                if self._discard(entry_id):
+                    self._append(_REMOVE, entry_id)
+            if self._path and self._bloated():
+                self._rewrite()
+
+    def find_duplicate(self, text: str, *, signature: np.ndarray | None = None) -> str | None:
+        """Return the id of an indexed text that ``text`` nearly duplicates."""
+
+        signature = self.signature(text) if signature is None else signature
+        with self._lock:
+            seen: set[str] = set()
+            for band, key in enumerate(self._band_keys(signature)):
+                for candidate in self._tables[band].get(key, ()):
+                    if candidate in seen:
+                        continue
+                    seen.add(candidate)
+                    if float(np.mean(self._signatures[candidate] == signature)) >= self._threshold:
+                        return candidate
+        return None
+
+    # ------------------------------------------------------------------
+    def _band_keys(self, signature: np.ndarray) -> list[bytes]:
+        data = signature.tobytes()
+        width = self._rows * 4
+        return [data[band * width : (band + 1) * width] for band in range(self._bands)]
+
+    def _insert(self, entry_id: str, signature: np.ndarray) -> None:
+        self._signatures[entry_id] = signature
+        for band, key in enumerate(self._band_keys(signature)):
+            self._tables[band].setdefault(key, set()).add(entry_id)
+
+    def _discard(self, entry_id: str) -> bool:
+        signature = self._signatures.pop(entry_id, None)
+        if signature is None:
+            return False
+        for band, key in enumerate(self._band_keys(signature)):
+            bucket = self._tables[band].get(key)
+            if bucket is not None:
+                bucket.discard(entry_id)
+                if not bucket:
+                    del self._tables[band][key]
+        return True
+
+    def _header(self) -> bytes:
+        return _HEADER.pack(_MAGIC, self._num_perm, self._bands, self._shingle_size)
+
+    def _append(self, op: int, entry_id: str, signature: np.ndarray | None = None) -> None:
+        if not self._path:
+            return
+        encoded = entry_id.encode("utf-8")
+        payload = _RECORD.pack(op, len(encoded)) + encoded
+        if signature is not None:
+            payload += signature.astype("<u4").tobytes()
+        with self._path.open("ab") as handle:
+            handle.write(payload)
+        self._log_records += 1
+
+    def _load(self) -> None:
+        if not self._path.exists():
+            self._path.write_bytes(self._header())
+            return
+        data = self._path.read_bytes()
+        if data[: _HEADER.size] != self._header():
+            # Written with different parameters; signatures are not comparable.
+            self._path.write_bytes(self._header())
+            return
+        offset, good = _HEADER.size, _HEADER.size
+        sig_bytes = self._num_perm * 4
+        while offset + _RECORD.size <= len(data):
+            op, length = _RECORD.unpack_from(data, offset)
+            end = offset + _RECORD.size + length + (sig_bytes if op == _ADD else 0)
+            if end > len(data):
+                break
+            entry_id = data[offset + _RECORD.size : offset + _RECORD.size + length].decode("utf-8")
+            if op == _ADD:
+                signature = np.frombuffer(data, dtype="<u4", count=self._num_perm, offset=end - sig_bytes)
+                self._insert(entry_id, signature.astype(np.uint32))
+            else:
+                self._discard(entry_id)
+            self._log_records += 1
+            offset = good = end
+        if good != len(data) or self._bloated():
+            self._rewrite()
+
+    def _bloated(self) -> bool:
+        """Whether removed signatures dominate the log, so rewriting it pays off."""
+
+        return self._log_records > 2 * len(self._signatures) + 64
+
+    def _rewrite(self) -> None:
+        tmp_path = self._path.with_name(self._path.name + ".tmp")
+        with tmp_path.open("wb") as handle:
+            handle.write(self._header())
+            for entry_id, signature in self._signatures.items():
+                encoded = entry_id.encode("utf-8")
+                handle.write(_RECORD.pack(_ADD, len(encoded)) + encoded + signature.astype("<u4").tobytes())
+        tmp_path.replace(self._path)
+        self._log_records = len(self._signatures)
+
+
+__all__ = ["NearDuplicateIndex"]
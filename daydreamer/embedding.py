@@ -0,0 +1,216 @@
+"""Embedding index used for distance-controlled pair sampling."""
+
+from __future__ import annotations
+
+import random
+import threading
+from abc import ABC, abstractmethod
+from typing import Iterable, Sequence
+
+import numpy as np
+
+from .memory import MemoryEntry
+
+
+class Embedder(ABC):
+    """Maps texts to L2-normalised float32 vectors."""
+
+    dimension: int
+
+    @abstractmethod
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        """Return a ``(len(texts), dimension)`` float32 matrix with unit-norm rows."""
+
+
+class HashingEmbedder(Embedder):
+    """Local, dependency-free embedder based on hashed character n-grams.
+
+    N-grams of every text in a batch are hashed in one vectorised pass over the
+    concatenated bytes; each hash selects one of ``dimension`` buckets and a
+    sign, so unrelated n-grams cancel out rather than pile up.
+    """
+
+    def __init__(self, dimension: int = 256, *, ngram_range: tuple[int, int] = (3, 5)) -> None:
+        if dimension < 1:
+            raise ValueError("dimension must be >= 1")
+        low, high = ngram_range
+        if not 1 <= low <= high:
+            raise ValueError("ngram_range must satisfy 1 <= low <= high")
+        self.dimension = dimension
+        self._ngram_range = ngram_range
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        count = len(texts)
+        encoded = [f" {' '.join(text.lower().split())} ".encode("utf-8") for text in texts]
+        data = np.frombuffer(b"".join(encoded), dtype=np.uint8).astype(np.uint32)
+        owner = np.repeat(np.arange(count, dtype=np.int64), [len(item) for item in encoded])
+        buckets: list[np.ndarray] = []
+        weights: list[np.ndarray] = []
+        low, high = self._ngram_range
+        for size in range(low, high + 1):
+            width = len(data) - size + 1
+            if width <= 0:
+                continue
+            hashes = np.full(width, size, dtype=np.uint32)
+            for offset in range(size):
+                hashes = hashes * np.uint32(_FNV_PRIME) ^ data[offset : offset + width]
+            # N-grams that straddle two texts are discarded.
+            rows = owner[:width]
+            valid = rows == owner[size - 1 : size - 1 + width]
+            hashes = _avalanche(hashes[valid])
+            buckets.append(rows[valid] * self.dimension + (hashes % np.uint32(self.dimension)).astype(np.int64))
+            weights.append(np.where(hashes & np.uint32(0x80000000), -1.0, 1.0))
+        if not buckets:
+            return np.zeros((count, self.dimension), dtype=np.float32)
+        matrix = np.bincount(
+            np.concatenate(buckets), weights=np.concatenate(weights), minlength=count * self.dimension
+        ).astype(np.float32)
+        matrix = matrix.reshape(count, self.dimension)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        np.divide(matrix, norms, out=matrix, where=norms > 0)
+        return matrix
+
+
+_FNV_PRIME = 16777619
+
+
+def _avalanche(hashes: np.ndarray) -> np.ndarray:
+    """Mix the low-entropy FNV state so bucket and sign bits are independent."""
+
+    hashes = hashes ^ (hashes >> np.uint32(16))
+    hashes = hashes * np.uint32(0x45D9F3B)
+    hashes = hashes ^ (hashes >> np.uint32(16))
+    hashes = hashes * np.uint32(0x45D9F3B)
+    return hashes ^ (hashes >> np.uint32(16))
+
+
+class EmbeddingIndex:
+    """Contiguous matrix of entry embeddings with band-limited partner sampling.
+
+    Rows are kept dense: removals move the last row into the freed slot, so the
+    matrix never has holes and the capacity shrinks as the store is pruned.
+    Partners are chosen among a random candidate pool of ``candidate_pool``
+    rows, which keeps each draw a fixed-size matrix product regardless of how
+    many entries are indexed.
+    """
+
+    def __init__(
+        self,
+        embedder: Embedder | None = None,
+        *,
+        similarity_band: tuple[float, float] = (0.15, 0.6),
+        candidate_pool: int = 1024,
+    ) -> None:
+        low, high = similarity_band
+        if not -1.0 <= low <= high <= 1.0:
+            raise ValueError("similarity_band must satisfy -1 <= low <= high <= 1")
+        if candidate_pool < 1:
+            raise ValueError("candidate_pool must be >= 1")
+        self._embedder = embedder or HashingEmbedder()
+        self._band = (low, high)
+        self._candidate_pool = candidate_pool
+        self._lock = threading.RLock()
+        self._matrix = np.zeros((16, self._embedder.dimension), dtype=np.float32)
+        self._entries: list[MemoryEntry] = []
+        self._rows: dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, entry_id: object) -> bool:
+        return entry_id in self._rows
+
+    @property
+    def similarity_band(self) -> tuple[float, float]:
+        return self._band
+
+    def add(self, entries: Iterable[MemoryEntry]) -> None:
+        new = [entry for entry in entries if entry.id not in self._rows]
+        if not new:
+            return
+        vectors = self._embedder.embed([entry.content for entry in new])
+        with self._lock:
+            start = len(self._entries)
+            self._reserve(start + len(new))
+            self._matrix[start : start + len(new)] = vectors
+            for offset, entry in enumerate(new):
+                self._rows[entry.id] = start + offset
+                self._entries.append(entry)
+
+    def remove(self, entry_ids: Iterable[str]) -> None:
+        with self._lock:
+            for entry_id in entry_ids:
+                row = self._rows.pop(entry_id, None)
+                if row is None:
+                    continue
+                last = len(self._entries) - 1
+                if row != last:
+                    moved = self._entries[last]
+                    self._matrix[row] = self._matrix[last]
+                    self._entries[row] = moved
+                    self._rows[moved.id] = row
+                self._entries.pop()
+            if len(self._matrix) > 16 and len(self._entries) < len(self._matrix) // 4:
+                self._matrix = self._matrix[: max(16, len(self._matrix) // 2)].copy()
+
+    def similarity(self, first: MemoryEntry, second: MemoryEntry) -> float:
+        with self._lock:
+            return float(self._matrix[self._rows[first.id]] @ self._matrix[self._rows[second.id]])
+
+    def sample_partners(
+        self, anchors: Sequence[MemoryEntry], *, exclude: set[str] | None = None
+    ) -> list[MemoryEntry | None]:
+        """Pick one partner per anchor whose similarity falls inside the band.
+
+        When no candidate lands in the band the one closest to its centre is
+        used instead. Partners are distinct from each other, from the anchors
+        and from ``exclude``; ``None`` marks anchors that could not be paired.
+        """
+
+        with self._lock:
+            size = len(self._entries)
+            # Anchors that are not indexed (e.g. evicted but not yet purged from the store) get no partner.
+            indexed = [position for position, anchor in enumerate(anchors) if anchor.id in self._rows]
+            anchor_rows = [self._rows[anchors[position].id] for position in indexed]
+            if size < 2 or not anchor_rows:
+                return [None] * len(anchors)
+            pool = min(size, self._candidate_pool)
+            candidates = np.asarray(random.sample(range(size), pool), dtype=np.int64)
+            similarities = self._matrix[anchor_rows] @ self._matrix[candidates].T
+            candidate_entries = [self._entries[row] for row in candidates.tolist()]
+
+        low, high = self._band
+        centre = (low + high) / 2
+        in_band = (similarities >= low) & (similarities <= high)
+        # Rank in-band candidates first (in random order), then by distance to the band centre.
+        order = np.lexsort((np.abs(similarities - centre), ~in_band), axis=1)
+        taken = set(exclude or ()) | {anchor.id for anchor in anchors}
+        partners: list[MemoryEntry | None] = [None] * len(anchors)
+        for anchor_idx, position in enumerate(indexed):
+            row_order = order[anchor_idx]
+            in_band_count = int(in_band[anchor_idx].sum())
+            shuffled = np.concatenate((np.random.permutation(row_order[:in_band_count]), row_order[in_band_count:]))
+            partner = None
+            for candidate_idx in shuffled.tolist():
+                candidate = candidate_entries[candidate_idx]
+                if candidate.id not in taken:
+                    partner = candidate
+                    break
+            if partner is not None:
+                taken.add(partner.id)
+            partners[position] = partner
+        return partners
+
+    # ------------------------------------------------------------------
+    def _reserve(self, size: int) -> None:
+        if size <= len(self._matrix):
+            return
+        capacity = len(self._matrix)
+        while capacity < size:
+            capacity *= 2
+        grown = np.zeros((capacity, self._matrix.shape[1]), dtype=np.float32)
+        grown[: len(self._entries)] = self._matrix[: len(self._entries)]
+        self._matrix = grown
+
+
+__all__ = ["Embedder", "EmbeddingIndex", "HashingEmbedder"]
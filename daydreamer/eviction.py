@@ -0,0 +1,222 @@
+"""Eviction policies deciding which entries :meth:`MemoryStore.prune` drops."""
+
+from __future__ import annotations
+
+import heapq
+import itertools
+import math
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Iterable
+
+from .memory import MemoryEntry
+
+_SCORE_KEYS = ("novelty", "coherence", "usefulness")
+
+
+@dataclass(slots=True)
+class Usage:
+    """How often and how recently an entry was handed out by ``sample_pairs``."""
+
+    count: int = 0
+    last_sampled: float | None = None
+
+
+class EvictionPolicy(ABC):
+    """Orders entries for eviction: the lowest :meth:`priority` goes first.
+
+    Priorities may only change through :class:`Usage`, which the store
+    updates from ``sample_pairs`` when :attr:`tracks_usage` is set.
+    """
+
+    tracks_usage = False
+
+    @abstractmethod
+    def priority(self, entry: MemoryEntry, usage: Usage) -> float:
+        """Eviction priority of ``entry``; ties are broken oldest first."""
+
+    def pinned(self, entry: MemoryEntry) -> bool:
+        """Whether ``entry`` must never be evicted."""
+
+        return False
+
+
+def critic_average(entry: MemoryEntry, default: float = 10.0) -> float:
+    """Mean critic score of an accepted idea; ``default`` for unscored entries."""
+
+    scores = entry.metadata.get("scores")
+    if not isinstance(scores, dict):
+        return default
+    values = [scores[key] for key in _SCORE_KEYS if isinstance(scores.get(key), (int, float))]
+    return sum(values) / len(values) if values else default
+
+
+class OldestFirst(EvictionPolicy):
+    """Evict by ``created_at``, matching the default pruning order."""
+
+    def priority(self, entry: MemoryEntry, usage: Usage) -> float:
+        return entry.created_at
+
+
+class LowestScoreFirst(EvictionPolicy):
+    """Evict the ideas with the lowest critic average first.
+
+    Entries without critic scores (concepts) rank as ``unscored``, which by
+    default keeps them until every scored idea has gone.
+    """
+
+    def __init__(self, *, unscored: float = 10.0) -> None:
+        self._unscored = unscored
+
+    def priority(self, entry: MemoryEntry, usage: Usage) -> float:
+        return critic_average(entry, self._unscored)
+
+
+class LeastRecentlySampled(EvictionPolicy):
+    """Evict the entries that have gone longest without being sampled.
+
+    Entries that were never sampled count as last used when they were created.
+    """
+
+    tracks_usage = True
+
+    def priority(self, entry: MemoryEntry, usage: Usage) -> float:
+        return usage.last_sampled if usage.last_sampled is not None else entry.created_at
+
+
+class WeightedEviction(EvictionPolicy):
+    """Blend of age, critic score and use count; higher blends are kept longer.
+
+    ``priority = age_weight * created_at / age_scale
+    + score_weight * critic_average / 10 + use_weight * log1p(uses)``, so with
+    the defaults one hour of age is worth a full score point range or an
+    ``e``-fold increase in uses.
+    """
+
+    tracks_usage = True
+
+    def __init__(
+        self,
+        *,
+        age_weight: float = 1.0,
+        score_weight: float = 1.0,
+        use_weight: float = 1.0,
+        age_scale: float = 3600.0,
+        unscored: float = 10.0,
+    ) -> None:
+        if age_scale <= 0:
+            raise ValueError("age_scale must be positive")
+        self._age_weight = age_weight
+        self._score_weight = score_weight
+        self._use_weight = use_weight
+        self._age_scale = age_scale
+        self._unscored = unscored
+        self.tracks_usage = use_weight != 0
+
+    def priority(self, entry: MemoryEntry, usage: Usage) -> float:
+        return (
+            self._age_weight * entry.created_at / self._age_scale
+            + self._score_weight * critic_average(entry, self._unscored) / 10
+            + self._use_weight * math.log1p(usage.count)
+        )
+
+
+class PinSeeds(EvictionPolicy):
+    """Wrap another policy and never evict entries with ``metadata["seed"]``."""
+
+    def __init__(self, policy: EvictionPolicy | None = None) -> None:
+        self._policy = policy or OldestFirst()
+        self.tracks_usage = self._policy.tracks_usage
+
+    def priority(self, entry: MemoryEntry, usage: Usage) -> float:
+        return self._policy.priority(entry, usage)
+
+    def pinned(self, entry: MemoryEntry) -> bool:
+        return bool(entry.metadata.get("seed")) or self._policy.pinned(entry)
+
+
+class EvictionQueue:
+    """Lazy-deletion min-heap of evictable entries ordered by a policy.
+
+    Re-prioritising an entry pushes a fresh heap item and bumps the entry's
+    version, so stale items are skipped when popped; the heap is rebuilt once
+    stale items outnumber live ones. Every push, touch and pop is O(log n).
+    """
+
+    def __init__(self, policy: EvictionPolicy) -> None:
+        self._policy = policy
+        self._heap: list[tuple[float, float, int, int, MemoryEntry]] = []
+        self._versions: dict[str, int] = {}
+        self._usage: dict[str, Usage] = {}
+        self._counter = itertools.count()
+
+    def __len__(self) -> int:
+        return len(self._versions)
+
+    @property
+    def policy(self) -> EvictionPolicy:
+        return self._policy
+
+    def push(self, entries: Iterable[MemoryEntry]) -> None:
+        for entry in entries:
+            if entry.id not in self._versions and not self._policy.pinned(entry):
+                self._push(entry)
+
+    def discard(self, entry_ids: Iterable[str]) -> None:
+        for entry_id in entry_ids:
+            self._versions.pop(entry_id, None)
+            self._usage.pop(entry_id, None)
+
+    def touch(self, entries: Iterable[MemoryEntry], now: float | None = None) -> None:
+        """Record that ``entries`` were just sampled."""
+
+        if not self._policy.tracks_usage:
+            return
+        now = time.time() if now is None else now
+        for entry in entries:
+            if entry.id not in self._versions:
+                continue
+            usage = self._usage.setdefault(entry.id, Usage())
+            usage.count += 1
+            usage.last_sampled = now
+            self._push(entry)
+
+    def usage(self, entry_id: str) -> Usage:
+        return self._usage.get(entry_id) or Usage()
+
+    def pop(self, count: int) -> list[MemoryEntry]:
+        """Remove and return up to ``count`` entries with the lowest priority."""
+
+        victims: list[MemoryEntry] = []
+        while self._heap and len(victims) < count:
+            _, _, version, _, entry = heapq.heappop(self._heap)
+            if self._versions.get(entry.id) != version:
+                continue
+            del self._versions[entry.id]
+            self._usage.pop(entry.id, None)
+            victims.append(entry)
+        return victims
+
+    # ------------------------------------------------------------------
+    def _push(self, entry: MemoryEntry) -> None:
+        version = next(self._counter)
+        self._versions[entry.id] = version
+        priority = self._policy.priority(entry, self._usage.get(entry.id) or Usage())
+        heapq.heappush(self._heap, (priority, entry.created_at, version, 0, entry))
+        if len(self._heap) > 2 * len(self._versions) + 64:
+            self._heap = [item for item in self._heap if self._versions.get(item[4].id) == item[2]]
+            heapq.heapify(self._heap)
+
+
+__all__ = [
+    "EvictionPolicy",
+    "EvictionQueue",
+    "LeastRecentlySampled",
+    "LowestScoreFirst",
+    "OldestFirst",
+    "PinSeeds",
+    "Usage",
+    "WeightedEviction",
+    "critic_average",
+]
@@ -2,13 +2,25 @@
 
 from __future__ import annotations
 
+import math
+import re
 from dataclasses import dataclass
+from typing import Callable, Sequence
 
-from .llm import LLMClient, LLMRequest, LLMResponse
+from .llm import ContentBlock, LLMClient, LLMRequest, LLMResponse
 from .memory import MemoryEntry
 
 _DEFAULT_PROMPT = """You are a creative synthesizer. Your task is to find deep, non-obvious, and potentially groundbreaking connections between the two following concepts. Do not state the obvious. Generate a hypothesis, a novel analogy, a potential research question, or a creative synthesis. Be speculative but ground your reasoning.\n\nConcept 1: {concept_a}\nConcept 2: {concept_b}\n\nThink step-by-step to explore potential connections:\n1. Are these concepts analogous in some abstract way?\n2. Could one concept be a metaphor for the other?\n3. Do they represent a similar problem or solution in different domains?\n4. Could they be combined to create a new idea or solve a problem?\n5. What revealing contradiction or tension exists between them?\n\nSynthesize your most interesting finding below."""
 
+_MULTI_PROMPT = """You are a creative synthesizer. For each of the following pairs of concepts, find deep, non-obvious, and potentially groundbreaking connections between the two concepts. Do not state the obvious. Generate a hypothesis, a novel analogy, a potential research question, or a creative synthesis. Be speculative but ground your reasoning.\n\nFor each pair, think step-by-step to explore potential connections:\n1. Are these concepts analogous in some abstract way?\n2. Could one concept be a metaphor for the other?\n3. Do they represent a similar problem or solution in different domains?\n4. Could they be combined to create a new idea or solve a problem?\n5. What revealing contradiction or tension exists between them?\n\nPairs:\n"""  # noqa: E501
+
+_MULTI_SUFFIX = """\n\nTreat every pair independently. For each pair, write your most interesting finding inside a <synthesis> tag carrying the pair's id, for example <synthesis id="P1">...</synthesis>."""  # noqa: E501
+
+_SYNTHESIS = re.compile(r'<synthesis id="P(\d+)">(.*?)</synthesis>', re.S)
+
+# Output tokens reserved for each synthesis (the single-pair request's default max_tokens).
+_TOKENS_PER_IDEA = 512
+
 
 @dataclass(slots=True)
 class IdeaProposal:
@@ -20,18 +32,135 @@ class IdeaProposal:
 
 
 class IdeaGenerator:
-    """Wraps an LLM to propose ideas from concept pairs."""
+    """Wraps an LLM to propose ideas from concept pairs.
+
+    :meth:`propose_many` asks for several syntheses per call, so the long
+    instructions are sent once per call rather than once per pair. Pairs go
+    into a call until its estimated tokens (the pairs' concepts plus an
+    output allowance per idea) would exceed ``call_token_budget``. A custom
+    ``prompt_template`` without a ``multi_prompt_prefix`` is proposed one
+    pair per call.
+    """
 
-    def __init__(self, client: LLMClient, *, prompt_template: str | None = None, temperature: float = 0.8) -> None:
+    def __init__(
+        self,
+        client: LLMClient,
+        *,
+        prompt_template: str | None = None,
+        multi_prompt_prefix: str | None = None,
+        temperature: float = 0.8,
+        call_token_budget: int = 4096,
+    ) -> None:
+        if call_token_budget < 1:
+            raise ValueError("call_token_budget must be >= 1")
         self._client = client
         self._prompt_template = prompt_template or _DEFAULT_PROMPT
+        if multi_prompt_prefix is None and prompt_template is None:
+            multi_prompt_prefix = _MULTI_PROMPT
+        self._multi_prompt_prefix = multi_prompt_prefix
         self._temperature = temperature
+        self._call_token_budget = call_token_budget
+
+    def propose(
+        self, concept_a: MemoryEntry, concept_b: MemoryEntry, *, on_text: Callable[[str], None] | None = None
+    ) -> IdeaProposal:
+        """Synthesize an idea; ``on_text`` receives the proposal's text as it streams in."""
+
+        request = self.build_request(concept_a, concept_b)
+        if on_text is None:
+            return self.parse_response(request, self._client.generate(request))
+        with self._client.generate_stream(request) as stream:
+            for delta in stream:
+                on_text(delta)
+        return self.parse_response(request, stream.response)
+
+    def build_request(self, concept_a: MemoryEntry, concept_b: MemoryEntry) -> LLMRequest:
+        """The request :meth:`propose` sends, for callers that execute it themselves (e.g. batches)."""
+
+        # Everything before the first concept is identical across calls and marked for prompt caching.
+        prefix, variable = _split_template(self._prompt_template)
+        return LLMRequest.from_blocks(
+            [
+                ContentBlock(prefix.format(), cache=True),
+                ContentBlock(variable.format(concept_a=concept_a.content, concept_b=concept_b.content)),
+            ],
+            temperature=self._temperature,
+        )
+
+    def parse_response(self, request: LLMRequest, response: LLMResponse) -> IdeaProposal:
+        return IdeaProposal(text=response.text.strip(), prompt=request.prompt, response=response)
+
+    def propose_many(self, pairs: Sequence[tuple[MemoryEntry, MemoryEntry]]) -> list[IdeaProposal]:
+        """Propose one idea per pair, several pairs per call; results keep the order of ``pairs``.
+
+        Pairs whose synthesis is missing from a response (or left unfinished)
+        are proposed again with single-pair calls. Proposals from one call
+        share its :attr:`IdeaProposal.response`.
+        """
+
+        proposals: list[IdeaProposal] = []
+        for chunk in self.chunk_pairs(pairs):
+            if len(chunk) == 1:
+                proposals.append(self.propose(*chunk[0]))
+                continue
+            request = self.build_multi_request(chunk)
+            parsed = self.parse_multi_response(request, self._client.generate(request), len(chunk))
+            proposals.extend(
+                parsed[index] if index in parsed else self.propose(*pair) for index, pair in enumerate(chunk)
+            )
+        return proposals
+
+    def chunk_pairs(
+        self, pairs: Sequence[tuple[MemoryEntry, MemoryEntry]]
+    ) -> list[list[tuple[MemoryEntry, MemoryEntry]]]:
+        """Split ``pairs`` into the groups :meth:`propose_many` sends together."""
+
+        if self._multi_prompt_prefix is None:
+            return [[pair] for pair in pairs]
+        chunks: list[list[tuple[MemoryEntry, MemoryEntry]]] = []
+        used = 0
+        for pair in pairs:
+            cost = math.ceil((len(pair[0].content) + len(pair[1].content)) / 4) + _TOKENS_PER_IDEA
+            if chunks and used + cost <= self._call_token_budget:
+                chunks[-1].append(pair)
+                used += cost
+            else:
+                chunks.append([pair])
+                used = cost
+        return chunks
+
+    def build_multi_request(self, pairs: Sequence[tuple[MemoryEntry, MemoryEntry]]) -> LLMRequest:
+        """The request for several pairs; pair ``n`` (from 1) gets the id ``Pn``."""
+
+        if self._multi_prompt_prefix is None:
+            raise ValueError("multi-pair requests need a multi_prompt_prefix when a custom prompt_template is set")
+        listing = "\n\n".join(
+            f'<pair id="P{number}">\nConcept 1: {concept_a.content}\nConcept 2: {concept_b.content}\n</pair>'
+            for number, (concept_a, concept_b) in enumerate(pairs, 1)
+        )
+        return LLMRequest.from_blocks(
+            [ContentBlock(self._multi_prompt_prefix, cache=True), ContentBlock(f"{listing}{_MULTI_SUFFIX}")],
+            temperature=self._temperature,
+            max_tokens=_TOKENS_PER_IDEA * len(pairs),
+        )
+
+    def parse_multi_response(self, request: LLMRequest, response: LLMResponse, count: int) -> dict[int, IdeaProposal]:
+        """Map pair positions (from 0) to proposals; unknown, repeated or empty syntheses are skipped."""
+
+        proposals: dict[int, IdeaProposal] = {}
+        for number, text in _SYNTHESIS.findall(response.text):
+            index = int(number) - 1
+            if 0 <= index < count and index not in proposals and text.strip():
+                proposals[index] = IdeaProposal(text=text.strip(), prompt=request.prompt, response=response)
+        return proposals
+
+
+def _split_template(template: str) -> tuple[str, str]:
+    """Split ``template`` before its first concept placeholder."""
 
-    def propose(self, concept_a: MemoryEntry, concept_b: MemoryEntry) -> IdeaProposal:
-        prompt = self._prompt_template.format(concept_a=concept_a.content, concept_b=concept_b.content)
-        request = LLMRequest(prompt=prompt, temperature=self._temperature)
-        response = self._client.generate(request)
-        return IdeaProposal(text=response.text.strip(), prompt=prompt, response=response)
+    positions = [index for index in (template.find("{concept_a}"), template.find("{concept_b}")) if index >= 0]
+    split = min(positions, default=len(template))
+    return template[:split], template[split:]
 
 
 __all__ = ["IdeaGenerator", "IdeaProposal"]
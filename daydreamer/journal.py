@@ -0,0 +1,164 @@
+"""Append-only write-ahead journal used by :class:`~daydreamer.memory.MemoryStore`."""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Iterable, Iterator
+
+try:  # pragma: no cover - platform dependent
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None  # type: ignore[assignment]
+
+
+class MemoryJournal:
+    """Line-delimited JSON log of memory mutations.
+
+    Every record carries a monotonically increasing ``seq`` number. Snapshots
+    remember the last sequence they contain, so replay only applies newer
+    records and a crash between writing a snapshot and trimming the journal is
+    harmless. A torn trailing line (crash mid-append) is discarded on open.
+
+    With ``shared=True`` several processes may use the same journal: writers
+    serialise through :meth:`locked` (an advisory ``flock`` on a sibling
+    ``.lock`` file, which survives compaction replacing the journal itself)
+    and each process follows the others' appends with :meth:`read_new`.
+    """
+
+    def __init__(self, path: str | Path, *, fsync: bool = False, shared: bool = False) -> None:
+        if shared and fcntl is None:
+            raise RuntimeError("shared journals need fcntl.flock, which this platform lacks")
+        self._path = Path(path)
+        self._fsync = fsync
+        self._shared = shared
+        self._lock = threading.RLock()
+        self._lock_handle: Any = None
+        self._lock_depth = 0
+        # Position of read_new: the file (inode and first line) and the offset consumed so far.
+        self._identity: tuple[int, bytes] | None = None
+        self._offset = 0
+        if shared:
+            with self.locked():
+                pass  # locked() repairs a torn tail left by a crashed writer
+        else:
+            self._repair()
+
+    @property
+    def path(self) -> Path:
+        return self._path
+
+    @property
+    def size_bytes(self) -> int:
+        try:
+            return self._path.stat().st_size
+        except FileNotFoundError:
+            return 0
+
+    def append(self, records: Iterable[dict[str, Any]]) -> None:
+        data = "".join(json.dumps(record, sort_keys=True) + "\n" for record in records)
+        if not data:
+            return
+        with self._lock, self._path.open("a", encoding="utf-8") as handle:
+            handle.write(data)
+            handle.flush()
+            if self._fsync:
+                os.fsync(handle.fileno())
+
+    @contextmanager
+    def locked(self) -> Iterator[None]:
+        """Hold the cross-process write lock (re-entrant within a process)."""
+
+        with self._lock:
+            if self._lock_depth == 0 and self._shared:
+                handle = self._path.with_name(self._path.name + ".lock").open("a+b")
+                fcntl.flock(handle.fileno(), fcntl.LOCK_EX)
+                self._lock_handle = handle
+                # Appends only happen under the lock, so a torn tail now means a writer died.
+                self._repair()
+            self._lock_depth += 1
+            try:
+                yield
+            finally:
+                self._lock_depth -= 1
+                if self._lock_depth == 0 and self._lock_handle is not None:
+                    fcntl.flock(self._lock_handle.fileno(), fcntl.LOCK_UN)
+                    self._lock_handle.close()
+                    self._lock_handle = None
+
+    def replay(self, *, after: int = 0) -> Iterator[dict[str, Any]]:
+        """Yield records whose sequence number is greater than ``after``.
+
+        Reading starts from the beginning of the journal and leaves
+        :meth:`read_new` positioned after the last record.
+        """
+
+        self._identity = None
+        for record in self.read_new():
+            if record["seq"] > after:
+                yield record
+
+    def read_new(self) -> list[dict[str, Any]]:
+        """Complete records appended since the previous call or :meth:`replay`.
+
+        Once compaction has replaced the file, reading restarts at its
+        beginning; callers skip records by sequence number.
+        """
+
+        try:
+            handle = self._path.open("rb")
+        except FileNotFoundError:
+            return []
+        with handle:
+            # Inode numbers are reused after a replace, so the first line identifies the file too.
+            first_line = handle.readline()
+            identity = (os.fstat(handle.fileno()).st_ino, first_line if first_line.endswith(b"\n") else b"")
+            offset = self._offset if identity == self._identity else 0
+            handle.seek(offset)
+            data = handle.read()
+        end = data.rfind(b"\n") + 1  # a torn or in-progress line is left for later
+        self._identity, self._offset = identity, offset + end
+        return [json.loads(line) for line in data[:end].splitlines()]
+
+    def truncate_through(self, sequence: int) -> None:
+        """Drop every record with ``seq <= sequence`` (they live in a snapshot now)."""
+
+        with self._lock:
+            if not self._path.exists():
+                return
+            kept = [line for line in self._read_lines() if json.loads(line)["seq"] > sequence]
+            if not kept:
+                # Leave a marker so readers of an emptied journal still learn the latest sequence.
+                kept = [json.dumps({"op": "mark", "seq": sequence}, sort_keys=True) + "\n"]
+            tmp_path = self._path.with_name(self._path.name + ".tmp")
+            with tmp_path.open("w", encoding="utf-8") as handle:
+                handle.writelines(kept)
+                handle.flush()
+                os.fsync(handle.fileno())
+            tmp_path.replace(self._path)
+
+    # ------------------------------------------------------------------
+    def _read_lines(self) -> list[str]:
+        with self._path.open("r", encoding="utf-8") as handle:
+            return [line for line in handle if line.endswith("\n")]
+
+    def _repair(self) -> None:
+        try:
+            handle = self._path.open("r+b")
+        except FileNotFoundError:
+            return
+        with handle:
+            size = handle.seek(0, os.SEEK_END)
+            if size == 0:
+                return
+            handle.seek(size - 1)
+            if handle.read(1) == b"\n":
+                return
+            handle.seek(0)
+            handle.truncate(handle.read().rfind(b"\n") + 1)
+
+
+__all__ = ["MemoryJournal"]
@@ -0,0 +1,253 @@
+"""Provenance graph over ``metadata["sources"]`` links between memory entries."""
+
+from __future__ import annotations
+
+import threading
+from collections import deque
+from typing import Callable, Iterable
+
+import numpy as np
+
+from .memory import MemoryEntry
+
+_NONE = -1
+
+
+class LineageIndex:
+    """Integer adjacency arrays describing which entries produced which.
+
+    Every entry id maps to a node number. ``parents[node]`` holds the (up to
+    two) source nodes and children are kept as intrusive linked lists: the
+    link from a node's ``j``-th parent is edge ``2 * node + j``, so
+    ``first_child[parent]`` and ``next_edge[edge]`` describe each parent's
+    children without any per-edge allocation.
+
+    ``depth`` is the generation of an entry: 0 for entries without sources
+    (seed concepts) and one more than the deepest parent otherwise.
+
+    Pruned entries stay in the graph as *ghosts* while a remaining entry still
+    descends from them, so ancestry and depth survive pruning; a ghost is
+    reclaimed (and its node number reused) once its last child goes. Sources
+    that were never added (for example because they were pruned before a
+    restart) become ghost roots.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.RLock()
+        self._nodes: dict[str, int] = {}
+        self._ids: list[str | None] = []
+        self._free: list[int] = []
+        self._parents = np.full((16, 2), _NONE, dtype=np.int32)
+        self._next_edge = np.full((16, 2), _NONE, dtype=np.int32)
+        self._first_child = np.full(16, _NONE, dtype=np.int32)
+        self._depth = np.zeros(16, dtype=np.int32)
+        self._children = np.zeros(16, dtype=np.int32)  # linked children, live or ghost
+        self._offspring = np.zeros(16, dtype=np.int32)  # children ever added
+        self._live = np.zeros(16, dtype=bool)
+
+    def __len__(self) -> int:
+        return int(self._live.sum())
+
+    def __contains__(self, entry_id: object) -> bool:
+        node = self._nodes.get(entry_id)  # type: ignore[arg-type]
+        return node is not None and bool(self._live[node])
+
+    def add(self, entries: Iterable[MemoryEntry]) -> None:
+        """Index ``entries`` (processed oldest first) and link them to their sources."""
+
+        with self._lock:
+            for entry in sorted(entries, key=lambda item: item.created_at):
+                node = self._node(entry.id)
+                if self._live[node]:
+                    continue
+                self._live[node] = True
+                sources = entry.metadata.get("sources")
+                if not isinstance(sources, (list, tuple)) or self._parents[node, 0] != _NONE:
+                    continue
+                parents = [self._node(source) for source in dict.fromkeys(sources[:2]) if isinstance(source, str)]
+                for slot, parent in enumerate(parents):
+                    self._parents[node, slot] = parent
+                    self._next_edge[node, slot] = self._first_child[parent]
+                    self._first_child[parent] = 2 * node + slot
+                    self._children[parent] += 1
+                    self._offspring[parent] += 1
+                if not parents:
+                    continue
+                depth = max(int(self._depth[parent]) for parent in parents) + 1
+                if self._first_child[node] == _NONE:
+                    self._depth[node] = depth
+                else:  # a placeholder that already has children
+                    self._raise_depth(node, depth)
+
+    def remove(self, entry_ids: Iterable[str]) -> None:
+        """Mark entries as pruned; ghosts without children are reclaimed."""
+
+        with self._lock:
+            for entry_id in entry_ids:
+                node = self._nodes.get(entry_id)
+                if node is not None and self._live[node]:
+                    self._live[node] = False
+                    self._reclaim(node)
+
+    def depth(self, entry_id: str) -> int:
+        """Generation depth of ``entry_id`` (0 for seeds and unknown ids)."""
+
+        node = self._nodes.get(entry_id)
+        return 0 if node is None else int(self._depth[node])
+
+    def depths(self, entry_ids: Iterable[str]) -> np.ndarray:
+        nodes = np.fromiter((self._nodes.get(entry_id, _NONE) for entry_id in entry_ids), dtype=np.int64)
+        with self._lock:
+            return np.where(nodes == _NONE, 0, self._depth[nodes])
+
+    def max_depth(self) -> int:
+        with self._lock:
+            live = self._depth[: len(self._ids)][self._live[: len(self._ids)]]
+            return int(live.max()) if len(live) else 0
+
+    def ancestors(self, entry_id: str, *, roots_only: bool = False, include_pruned: bool = False) -> list[str]:
+        """Ids of every entry ``entry_id`` descends from, nearest generations first.
+
+        ``roots_only`` keeps only ancestors without sources of their own (the
+        seed concepts an idea ultimately came from). Pruned ancestors are
+        traversed but only reported with ``include_pruned``.
+        """
+
+        with self._lock:
+            node = self._nodes.get(entry_id)
+            if node is None:
+                return []
+            found = self._walk(node, lambda current: [int(p) for p in self._parents[current] if p != _NONE])
+            if roots_only:
+                found = [ancestor for ancestor in found if self._parents[ancestor, 0] == _NONE]
+            return self._report(found, include_pruned)
+
+    def descendants(self, entry_id: str, *, include_pruned: bool = False) -> list[str]:
+        """Ids of every entry derived (directly or not) from ``entry_id``."""
+
+        with self._lock:
+            node = self._nodes.get(entry_id)
+            if node is None:
+                return []
+            return self._report(self._walk(node, self._child_nodes), include_pruned)
+
+    def most_productive(self, n: int = 1) -> list[tuple[str, int]]:
+        """The ``n`` remaining entries that produced the most indexed children."""
+
+        with self._lock:
+            size = len(self._ids)
+            counts = np.where(self._live[:size], self._offspring[:size], -1)
+            n = min(n, int((counts > 0).sum()))
+            if n <= 0:
+                return []
+            top = np.argpartition(-counts, n - 1)[:n]
+            top = top[np.argsort(-counts[top], kind="stable")]
+            return [(self._ids[node], int(counts[node])) for node in top.tolist()]  # type: ignore[misc]
+
+    # ------------------------------------------------------------------
+    def _node(self, entry_id: str) -> int:
+        node = self._nodes.get(entry_id)
+        if node is not None:
+            return node
+        if self._free:
+            node = self._free.pop()
+            self._ids[node] = entry_id
+        else:
+            node = len(self._ids)
+            self._ids.append(entry_id)
+            self._reserve(node + 1)
+        self._nodes[entry_id] = node
+        return node
+
+    def _child_nodes(self, node: int) -> list[int]:
+        children = []
+        edge = int(self._first_child[node])
+        while edge != _NONE:
+            children.append(edge // 2)
+            edge = int(self._next_edge[edge // 2, edge % 2])
+        return children
+
+    def _walk(self, start: int, neighbours: Callable[[int], list[int]]) -> list[int]:
+        seen = {start}
+        order: list[int] = []
+        queue = deque([start])
+        while queue:
+            for other in neighbours(queue.popleft()):
+                if other not in seen:
+                    seen.add(other)
+                    order.append(other)
+                    queue.append(other)
+        return order
+
+    def _report(self, nodes: list[int], include_pruned: bool) -> list[str]:
+        return [self._ids[node] for node in nodes if include_pruned or self._live[node]]  # type: ignore[misc]
+
+    def _raise_depth(self, node: int, depth: int) -> None:
+        """Set ``node``'s depth and push increases down to already-linked descendants."""
+
+        queue = deque([(node, depth)])
+        while queue:
+            current, value = queue.popleft()
+            if self._depth[current] >= value and current != node:
+                continue
+            self._depth[current] = value
+            queue.extend((child, value + 1) for child in self._child_nodes(current) if self._depth[child] <= value)
+
+    def _reclaim(self, node: int) -> None:
+        """Free ghost ``node`` if nothing links to it, cascading up to its parents."""
+
+        stack = [node]
+        while stack:
+            current = stack.pop()
+            if self._live[current] or self._children[current]:
+                continue
+            for slot, parent in enumerate(self._parents[current].tolist()):
+                if parent == _NONE:
+                    continue
+                self._unlink(parent, 2 * current + slot)
+                self._children[parent] -= 1
+                stack.append(parent)
+            del self._nodes[self._ids[current]]  # type: ignore[index]
+            self._ids[current] = None
+            self._parents[current] = _NONE
+            self._next_edge[current] = _NONE
+            self._first_child[current] = _NONE
+            self._depth[current] = 0
+            self._offspring[current] = 0
+            self._free.append(current)
+
+    def _unlink(self, parent: int, edge: int) -> None:
+        following = self._next_edge[edge // 2, edge % 2]
+        if self._first_child[parent] == edge:
+            self._first_child[parent] = following
+            return
+        previous = int(self._first_child[parent])
+        while previous != _NONE:
+            link = self._next_edge[previous // 2, previous % 2]
+            if link == edge:
+                self._next_edge[previous // 2, previous % 2] = following
+                return
+            previous = int(link)
+
+    def _reserve(self, size: int) -> None:
+        capacity = len(self._depth)
+        if size <= capacity:
+            return
+        while capacity < size:
+            capacity *= 2
+        for name, fill in (
+            ("_parents", _NONE),
+            ("_next_edge", _NONE),
+            ("_first_child", _NONE),
+            ("_depth", 0),
+            ("_children", 0),
+            ("_offspring", 0),
+            ("_live", False),
+        ):
+            current = getattr(self, name)
+            grown = np.full((capacity, *current.shape[1:]), fill, dtype=current.dtype)
+            grown[: len(current)] = current
+            setattr(self, name, grown)
+
+
+__all__ = ["LineageIndex"]
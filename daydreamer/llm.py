@@ -2,67 +2,308 @@
 
 from __future__ import annotations
 
+import asyncio
 import hashlib
 import itertools
+import logging
+import math
 import os
-from importlib import import_module, util
+import threading
+import time
 from abc import ABC, abstractmethod
-from dataclasses import dataclass
-from typing import Any, Iterable, TYPE_CHECKING, cast
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, replace
+from importlib import import_module, util
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Iterable, Iterator, Sequence, TypeVar, cast
+
+from .ratelimit import AdaptiveConcurrency, RetryPolicy, Throttle, estimate_tokens
 
 if TYPE_CHECKING:  # pragma: no cover - import for type checking only
     from anthropic import Anthropic as AnthropicClient
+    from anthropic import AsyncAnthropic as AsyncAnthropicClient
 else:  # pragma: no cover - placeholder type when anthropic isn't installed at runtime
     AnthropicClient = Any
-from abc import ABC, abstractmethod
-from dataclasses import dataclass
-from typing import Iterable
+    AsyncAnthropicClient = Any
+
+logger = logging.getLogger(__name__)
+
+_T = TypeVar("_T")
+
+# Default cap on in-flight requests for batched_generate.
+DEFAULT_CONCURRENCY = 32
+
+
+@dataclass(frozen=True, slots=True)
+class ContentBlock:
+    """A piece of a structured prompt; ``cache`` marks the end of a cacheable prefix."""
+
+    text: str
+    cache: bool = False
 
 
 @dataclass(slots=True)
 class LLMRequest:
+    """A completion request.
+
+    ``prompt`` is always the full text. Requests built with
+    :meth:`from_blocks` also keep the prompt's structure in ``blocks``, which
+    backends with prompt caching use to mark the static prefix; other
+    backends just read ``prompt``.
+    """
+
     prompt: str
     temperature: float = 0.7
     max_tokens: int = 512
+    blocks: tuple[ContentBlock, ...] = ()
+
+    @classmethod
+    def from_blocks(cls, blocks: Sequence[ContentBlock], **kwargs: Any) -> "LLMRequest":
+        blocks = tuple(block for block in blocks if block.text)
+        return cls(prompt="".join(block.text for block in blocks), blocks=blocks, **kwargs)
+
+
+@dataclass(frozen=True, slots=True)
+class TokenUsage:
+    """Token counts reported for one call.
+
+    ``input_tokens`` are the uncached input tokens, ``cache_read_input_tokens``
+    were served from the provider's prompt cache and
+    ``cache_creation_input_tokens`` were written to it.
+    """
+
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cache_creation_input_tokens: int = 0
+    cache_read_input_tokens: int = 0
+
+    @property
+    def total_input_tokens(self) -> int:
+        return self.input_tokens + self.cache_creation_input_tokens + self.cache_read_input_tokens
+
+    @property
+    def cached_fraction(self) -> float:
+        """Share of the input tokens read from the prompt cache."""
+
+        total = self.total_input_tokens
+        return self.cache_read_input_tokens / total if total else 0.0
 
 
 @dataclass(slots=True)
 class LLMResponse:
+    """A completion plus whatever accounting the backend reports.
+
+    ``latency`` is the wall time of the whole call, including rate-limit
+    waits and retries; ``time_to_first_byte`` covers only the attempt that
+    succeeded, from sending it until the first response bytes arrived
+    (for non-streaming calls, the complete response). Fields a backend does
+    not report are ``None``. ``cached`` marks responses served from a
+    response cache, which never reached the model and report zero usage.
+    """
+
     text: str
+    usage: TokenUsage | None = None
+    stop_reason: str | None = None
+    model: str | None = None
+    time_to_first_byte: float | None = None
+    latency: float | None = None
+    cached: bool = False
+
+
+class LLMStream:
+    """A completion delivered as text deltas.
+
+    Iterating yields the deltas as they arrive and :meth:`close` cancels the
+    rest of the generation. :attr:`response` waits for the stream to end (or
+    returns at once after :meth:`close`) and reports the text received; a
+    closed stream has ``stop_reason`` ``"cancelled"``. Use it as a context
+    manager to close abandoned streams.
+    """
+
+    def __init__(self, deltas: Iterator[str], finish: Callable[[str, bool], LLMResponse]) -> None:
+        self._deltas = deltas
+        self._finish = finish  # (text received, cancelled) -> response
+        self._parts: list[str] = []
+        self._response: LLMResponse | None = None
+
+    @classmethod
+    def complete(cls, response: LLMResponse) -> "LLMStream":
+        """Replay an already finished response as a single delta."""
+
+        return cls(iter([response.text] if response.text else []), lambda text, cancelled: response)
+
+    @property
+    def text(self) -> str:
+        """The text received so far."""
+
+        return "".join(self._parts)
+
+    @property
+    def response(self) -> LLMResponse:
+        for _ in self:
+            pass
+        return cast(LLMResponse, self._response)
+
+    def __iter__(self) -> "LLMStream":
+        return self
+
+    def __next__(self) -> str:
+        if self._response is not None:
+            raise StopIteration
+        try:
+            delta = next(self._deltas)
+        except StopIteration:
+            self._response = self._finish(self.text, False)
+            raise
+        self._parts.append(delta)
+        return delta
+
+    def close(self) -> None:
+        if self._response is not None:
+            return
+        close = getattr(self._deltas, "close", None)
+        if close is not None:
+            close()
+        self._response = self._finish(self.text, True)
+
+    def __enter__(self) -> "LLMStream":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
 
 
 class LLMClient(ABC):
-    """Abstract base class for language model backends."""
+    """Abstract base class for language model backends.
+
+    Subclasses implement the blocking :meth:`generate`; :meth:`agenerate`
+    runs it on a worker thread unless a backend provides a native coroutine,
+    and :meth:`generate_stream` replays the finished response unless the
+    backend streams natively.
+    """
 
     @abstractmethod
     def generate(self, request: LLMRequest) -> LLMResponse:
         """Execute a completion request."""
 
+    @property
+    def cache_identity(self) -> dict[str, Any]:
+        """Settings besides the request that shape responses (model, system prompt).
+
+        Response caches include this in their keys.
+        """
+
+        return {"client": type(self).__name__}
+
+    async def agenerate(self, request: LLMRequest) -> LLMResponse:
+        """Execute a completion request without blocking the event loop."""
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.generate, request)
+
+    def generate_stream(self, request: LLMRequest) -> LLMStream:
+        """Execute a completion request, yielding text as it is produced."""
+
+        return LLMStream.complete(self.generate(request))
+
 
 class MockLLM(LLMClient):
     """Simple deterministic mock used for tests and demos.
 
     The mock generates pseudo-creative outputs by hashing the prompt.
+    ``latency`` simulates a slow backend: :meth:`generate` sleeps and
+    :meth:`agenerate` awaits that many seconds before answering.
+    ``token_latency`` adds decoding time per four-character "token", which
+    :meth:`generate_stream` spends between deltas, so closing a stream early
+    saves it. Usage is estimated at four characters per token so cost
+    accounting can be exercised offline.
     """
 
-    def __init__(self, scripted: dict[str, str] | None = None) -> None:
+    def __init__(
+        self, scripted: dict[str, str] | None = None, *, latency: float = 0.0, token_latency: float = 0.0
+    ) -> None:
+        if latency < 0 or token_latency < 0:
+            raise ValueError("latency and token_latency must be non-negative")
         self._scripted = scripted or {}
         self._counter = itertools.count(1)
+        self._latency = latency
+        self._token_latency = token_latency
 
     def generate(self, request: LLMRequest) -> LLMResponse:
+        text = self._text(request)
+        duration = self._duration(text)
+        if duration:
+            time.sleep(duration)
+        return self._respond(request, text, time_to_first_byte=duration, latency=duration)
+
+    async def agenerate(self, request: LLMRequest) -> LLMResponse:
+        text = self._text(request)
+        duration = self._duration(text)
+        if duration:
+            await asyncio.sleep(duration)
+        return self._respond(request, text, time_to_first_byte=duration, latency=duration)
+
+    def generate_stream(self, request: LLMRequest) -> LLMStream:
+        started = time.perf_counter()
+        text = self._text(request)
+        first_delta: list[float] = []
+
+        def deltas() -> Iterator[str]:
+            if self._latency:
+                time.sleep(self._latency)
+            for index in range(0, len(text), 4):
+                if self._token_latency:
+                    time.sleep(self._token_latency)
+                if not first_delta:
+                    first_delta.append(time.perf_counter() - started)
+                yield text[index : index + 4]
+
+        def finish(received: str, cancelled: bool) -> LLMResponse:
+            response = self._respond(
+                request,
+                received,
+                time_to_first_byte=first_delta[0] if first_delta else None,
+                latency=time.perf_counter() - started,
+            )
+            return replace(response, stop_reason="cancelled") if cancelled else response
+
+        return LLMStream(deltas(), finish)
+
+    def _text(self, request: LLMRequest) -> str:
         if request.prompt in self._scripted:
-            return LLMResponse(text=self._scripted[request.prompt])
+            return self._scripted[request.prompt]
         digest = hashlib.sha1(request.prompt.encode("utf-8")).hexdigest()[:12]
         idx = next(self._counter)
-        text = (
-            f"Idea {idx}: blend-{digest[:4]} {digest[4:8]} {digest[8:]} | "
-            f"Prompt length {len(request.prompt)}"
+        return f"Idea {idx}: blend-{digest[:4]} {digest[4:8]} {digest[8:]} | Prompt length {len(request.prompt)}"
+
+    def _duration(self, text: str) -> float:
+        return self._latency + self._token_latency * math.ceil(len(text) / 4)
+
+    def _respond(
+        self, request: LLMRequest, text: str, *, time_to_first_byte: float | None, latency: float
+    ) -> LLMResponse:
+        usage = TokenUsage(input_tokens=math.ceil(len(request.prompt) / 4), output_tokens=math.ceil(len(text) / 4))
+        return LLMResponse(
+            text=text,
+            usage=usage,
+            stop_reason="end_turn",
+            model="mock",
+            time_to_first_byte=time_to_first_byte,
+            latency=latency,
         )
-        return LLMResponse(text=text)
 
 
 class AnthropicLLM(LLMClient):
-    """LLM client backed by Anthropic's Messages API."""
+    """LLM client backed by Anthropic's Messages API.
+
+    Calls go through a :class:`~daydreamer.ratelimit.Throttle`. The default
+    one retries 429/529/5xx and connection errors with jittered backoff
+    (honouring ``retry-after``) under an AIMD concurrency limit; pass a
+    throttle with a :class:`~daydreamer.ratelimit.RateLimiter` to stay under
+    requests- and tokens-per-minute quotas. A client created here has the
+    SDK's own retries disabled so the throttle sees every failure.
+    :meth:`generate_stream` retries only until the stream opens; the
+    throttle's slot is released once the response headers arrive.
+    """
 
     def __init__(
         self,
@@ -70,55 +311,324 @@ class AnthropicLLM(LLMClient):
         *,
         model: str = "claude-3-opus-20240229",
         system_prompt: str | None = None,
+        throttle: Throttle | None = None,
     ) -> None:
-        self._client = client or self._default_client()
+        self._throttle = throttle or default_throttle()
+        self._client = client or cast("AnthropicClient", _anthropic_client("Anthropic", self._throttle))
         self._model = model
         self._system_prompt = system_prompt
 
-    def _default_client(self) -> AnthropicClient:
-        api_key = os.environ.get("ANTHROPIC_API_KEY")
-        if not api_key:
-            raise RuntimeError(
-                "ANTHROPIC_API_KEY environment variable must be set when no client is provided."
-            )
-        if util.find_spec("anthropic") is None:
-            raise RuntimeError(
-                "The 'anthropic' package is required to use AnthropicLLM. Install it via 'pip install anthropic'."
-            )
-        module = import_module("anthropic")
-        client_cls = getattr(module, "Anthropic")
-        return cast("AnthropicClient", client_cls(api_key=api_key))
+    @property
+    def throttle(self) -> Throttle:
+        return self._throttle
+
+    @property
+    def cache_identity(self) -> dict[str, Any]:
+        return {"model": self._model, "system": self._system_prompt}
 
     def generate(self, request: LLMRequest) -> LLMResponse:
-        message = self._client.messages.create(
-            model=self._model,
-            system=self._system_prompt,
-            max_tokens=request.max_tokens,
-            temperature=request.temperature,
-            messages=[{"role": "user", "content": request.prompt}],
+        params = _message_params(self._model, self._system_prompt, request)
+        timer = _CallTimer()
+        message = self._throttle.call(
+            lambda: timer.attempt(self._client.messages.create)(**params),
+            tokens=estimate_tokens(request.prompt, request.max_tokens),
+            usage=_usage_tokens,
+        )
+        return _message_response(message, timer)
+
+    def generate_stream(self, request: LLMRequest) -> LLMStream:
+        params = _message_params(self._model, self._system_prompt, request)
+        timer = _CallTimer()
+        tokens = estimate_tokens(request.prompt, request.max_tokens)
+        events = self._throttle.call(
+            lambda: timer.attempt(self._client.messages.create)(**params, stream=True), tokens=tokens
         )
-        text_parts: list[str] = []
-        for item in message.content:
-            if item.type == "text":
-                text_parts.append(item.text)
-        return LLMResponse(text="".join(text_parts).strip())
+        streamed = _StreamedMessage(events, timer)
+
+        def finish(text: str, cancelled: bool) -> LLMResponse:
+            response = streamed.response(text, cancelled)
+            self._throttle.settle(tokens, _rate_limited_tokens(response.usage))
+            return response
+
+        return LLMStream(streamed.deltas(), finish)
+
+
+class AsyncAnthropicLLM(LLMClient):
+    """Anthropic client built on the SDK's ``AsyncAnthropic``.
+
+    One async client (and so one HTTP connection pool) serves every request.
+    Blocking :meth:`generate` calls and :func:`batched_generate` run on a
+    shared background event loop, so the pool is reused across calls; when
+    awaiting :meth:`agenerate` directly, keep to a single event loop.
+    Streaming is not native here; use :class:`AnthropicLLM` for it.
+    """
+
+    def __init__(
+        self,
+        client: AsyncAnthropicClient | None = None,
+        *,
+        model: str = "claude-3-opus-20240229",
+        system_prompt: str | None = None,
+        throttle: Throttle | None = None,
+    ) -> None:
+        self._throttle = throttle or default_throttle()
+        self._client = client or _anthropic_client("AsyncAnthropic", self._throttle)
+        self._model = model
+        self._system_prompt = system_prompt
+
+    @property
+    def throttle(self) -> Throttle:
+        return self._throttle
+
+    @property
+    def cache_identity(self) -> dict[str, Any]:
+        return {"model": self._model, "system": self._system_prompt}
+
+    def generate(self, request: LLMRequest) -> LLMResponse:
+        return _run(self.agenerate(request))
+
+    async def agenerate(self, request: LLMRequest) -> LLMResponse:
+        params = _message_params(self._model, self._system_prompt, request)
+        timer = _CallTimer()
+        message = await self._throttle.acall(
+            lambda: timer.attempt(self._client.messages.create)(**params),
+            tokens=estimate_tokens(request.prompt, request.max_tokens),
+            usage=_usage_tokens,
+        )
+        return _message_response(message, timer)
+
+
+def default_throttle() -> Throttle:
+    """Retries with backoff under an AIMD concurrency limit, without a rate limit."""
+
+    return Throttle(concurrency=AdaptiveConcurrency(), retry=RetryPolicy())
+
+
+def _anthropic_client(name: str, throttle: Throttle | None = None) -> Any:
+    api_key = os.environ.get("ANTHROPIC_API_KEY")
+    if not api_key:
+        raise RuntimeError("ANTHROPIC_API_KEY environment variable must be set when no client is provided.")
+    if util.find_spec("anthropic") is None:
+        raise RuntimeError(
+            "The 'anthropic' package is required to use AnthropicLLM. Install it via 'pip install anthropic'."
+        )
+    options: dict[str, Any] = {"max_retries": 0} if throttle is not None and throttle.retry is not None else {}
+    return getattr(import_module("anthropic"), name)(api_key=api_key, **options)
+
+
+def _message_params(model: str, system_prompt: str | None, request: LLMRequest) -> dict[str, Any]:
+    content: str | list[dict[str, Any]] = request.prompt
+    if request.blocks:
+        # A cache_control breakpoint caches everything before it, system prompt included.
+        content = [
+            {"type": "text", "text": block.text, **({"cache_control": {"type": "ephemeral"}} if block.cache else {})}
+            for block in request.blocks
+        ]
+    params: dict[str, Any] = {
+        "model": model,
+        "max_tokens": request.max_tokens,
+        "temperature": request.temperature,
+        "messages": [{"role": "user", "content": content}],
+    }
+    if system_prompt is not None:
+        params["system"] = system_prompt
+    return params
+
+
+def _token_usage(message: Any) -> TokenUsage | None:
+    usage = getattr(message, "usage", None)
+    if usage is None:
+        return None
+    return TokenUsage(
+        input_tokens=_usage_count(usage, "input_tokens"),
+        output_tokens=_usage_count(usage, "output_tokens"),
+        cache_creation_input_tokens=_usage_count(usage, "cache_creation_input_tokens"),
+        cache_read_input_tokens=_usage_count(usage, "cache_read_input_tokens"),
+    )
+
+
+def _usage_count(usage: Any, name: str) -> int:
+    return int(getattr(usage, name, 0) or 0)  # cache fields are None when caching is unused
+
+
+def _usage_tokens(message: Any) -> int:
+    """Tokens that count against rate limits (cache reads are exempt)."""
+
+    return _rate_limited_tokens(_token_usage(message))
+
+
+def _rate_limited_tokens(usage: TokenUsage | None) -> int:
+    if usage is None:
+        return 0
+    return usage.input_tokens + usage.cache_creation_input_tokens + usage.output_tokens
+
+
+class _CallTimer:
+    """Start times of a call and of its latest attempt (see :class:`LLMResponse`)."""
+
+    def __init__(self) -> None:
+        self.started = self.attempt_started = time.perf_counter()
+
+    def attempt(self, function: Callable[..., _T]) -> Callable[..., _T]:
+        self.attempt_started = time.perf_counter()
+        return function
+
+
+def _message_response(message: Any, timer: _CallTimer | None = None) -> LLMResponse:
+    finished = time.perf_counter()
+    usage = _token_usage(message)
+    if usage is not None:
+        logger.debug(
+            "Input tokens: %d uncached, %d cache reads, %d cache writes; %d output tokens",
+            usage.input_tokens,
+            usage.cache_read_input_tokens,
+            usage.cache_creation_input_tokens,
+            usage.output_tokens,
+        )
+    model = getattr(message, "model", None)
+    stop_reason = getattr(message, "stop_reason", None)
+    return LLMResponse(
+        text=_message_text(message),
+        usage=usage,
+        stop_reason=stop_reason if isinstance(stop_reason, str) else None,
+        model=model if isinstance(model, str) else None,
+        time_to_first_byte=None if timer is None else finished - timer.attempt_started,
+        latency=None if timer is None else finished - timer.started,
+    )
+
+
+def _message_text(message: Any) -> str:
+    return "".join(item.text for item in message.content if item.type == "text").strip()
+
+
+class _StreamedMessage:
+    """Metadata collected from a raw Messages API event stream."""
+
+    def __init__(self, events: Any, timer: _CallTimer) -> None:
+        self._events = events
+        self._timer = timer
+        self._message: Any = None  # from message_start: model and input usage
+        self._stop_reason: str | None = None
+        self._output_tokens: int | None = None
+        self._first_delta: float | None = None
+
+    def deltas(self) -> Iterator[str]:
+        try:
+            for event in self._events:
+                if event.type == "message_start":
+                    self._message = event.message
+                elif event.type == "content_block_delta" and event.delta.type == "text_delta":
+                    if self._first_delta is None:
+                        self._first_delta = time.perf_counter()
+                    yield event.delta.text
+                elif event.type == "message_delta":
+                    self._stop_reason = event.delta.stop_reason
+                    self._output_tokens = event.usage.output_tokens
+        finally:
+            self._events.close()
+
+    def response(self, text: str, cancelled: bool) -> LLMResponse:
+        finished = time.perf_counter()
+        if cancelled:
+            self._events.close()  # drops the connection, which stops generation
+        usage = _token_usage(self._message)
+        if usage is not None:
+            # A cancelled stream never reports its final count; estimate what was generated.
+            output_tokens = self._output_tokens
+            if output_tokens is None:
+                output_tokens = max(usage.output_tokens, math.ceil(len(text) / 4))
+            usage = replace(usage, output_tokens=output_tokens)
+        model = getattr(self._message, "model", None)
+        return LLMResponse(
+            text=text.strip(),
+            usage=usage,
+            stop_reason="cancelled" if cancelled else self._stop_reason,
+            model=model if isinstance(model, str) else None,
+            time_to_first_byte=None if self._first_delta is None else self._first_delta - self._timer.attempt_started,
+            latency=finished - self._timer.started,
+        )
+
+
+# ----------------------------------------------------------------------
+# Batching
+# ----------------------------------------------------------------------
+class _BackgroundLoop:
+    """Event loop on a daemon thread that blocking callers submit coroutines to.
+
+    Keeping one loop alive (rather than ``asyncio.run`` per call) lets async
+    clients keep their connection pools between batches. Its default executor
+    is sized for :meth:`LLMClient.agenerate`'s thread fallback, so blocking
+    clients also fan out up to :data:`DEFAULT_CONCURRENCY` requests.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    def run(self, coroutine: Awaitable[_T]) -> _T:
+        return asyncio.run_coroutine_threadsafe(coroutine, self._ensure_loop()).result()  # type: ignore[arg-type]
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                loop.set_default_executor(ThreadPoolExecutor(DEFAULT_CONCURRENCY, thread_name_prefix="llm"))
+                threading.Thread(target=loop.run_forever, name="llm-event-loop", daemon=True).start()
+                self._loop = loop
+            return self._loop
+
+
+_BACKGROUND = _BackgroundLoop()
+
+
+def _run(coroutine: Awaitable[_T]) -> _T:
+    return _BACKGROUND.run(coroutine)
+
+
+async def abatched_generate(
+    client: LLMClient, requests: Iterable[LLMRequest], *, concurrency: int = DEFAULT_CONCURRENCY
+) -> list[LLMResponse]:
+    """Run requests concurrently, at most ``concurrency`` at a time; results keep request order."""
+
+    if concurrency < 1:
+        raise ValueError("concurrency must be >= 1")
+    limit = asyncio.Semaphore(concurrency)
+
+    async def bounded(request: LLMRequest) -> LLMResponse:
+        async with limit:
+            return await client.agenerate(request)
+
+    return list(await asyncio.gather(*(bounded(request) for request in requests)))
 
 
-def batched_generate(client: LLMClient, requests: Iterable[LLMRequest]) -> list[LLMResponse]:
-    """Sequentially execute a batch of requests.
+def batched_generate(
+    client: LLMClient, requests: Iterable[LLMRequest], *, concurrency: int = DEFAULT_CONCURRENCY
+) -> list[LLMResponse]:
+    """Blocking wrapper around :func:`abatched_generate`.
 
-    This helper keeps the surface compatible with async implementations.
+    Requests are fanned out through ``client.agenerate`` on a shared
+    background event loop, so a batch takes roughly the latency of its
+    slowest ``ceil(len / concurrency)`` rounds instead of the sum.
     """
 
-    return [client.generate(req) for req in requests]
+    requests = list(requests)
+    if not requests:
+        return []
+    return _run(abatched_generate(client, requests, concurrency=concurrency))
 
 
 __all__ = [
+    "DEFAULT_CONCURRENCY",
     "LLMClient",
     "LLMRequest",
     "LLMResponse",
+    "LLMStream",
+    "ContentBlock",
+    "TokenUsage",
     "MockLLM",
     "AnthropicLLM",
+    "AsyncAnthropicLLM",
+    "abatched_generate",
     "batched_generate",
+    "default_throttle",
 ]
-__all__ = ["LLMClient", "LLMRequest", "LLMResponse", "MockLLM", "batched_generate"]
@@ -3,78 +3,231 @@
 from __future__ import annotations
 
 import logging
+import threading
 import time
-from dataclasses import dataclass
-from typing import Callable, Iterable, List, Sequence
+import uuid
+from dataclasses import dataclass, field, replace
+from typing import TYPE_CHECKING, Any, Callable, Iterable, List, Sequence
 
 from .config import DaydreamConfig
+from .costs import BATCH_PRICE_FACTOR, ESCALATION_STAGE, SCREENING_STAGE, CostLedger
 from .critic import IdeaCritic, IdeaScore
 from .generator import IdeaGenerator, IdeaProposal
+from .llm import LLMResponse
 from .memory import MemoryEntry, MemoryStore
+from .pipeline import Stage, run_pipeline
+from .predictor import AcceptancePredictor
+from .scheduler import BudgetScheduler, ScheduledIteration
+from .sqlite_store import SQLiteMemoryStore
+
+if TYPE_CHECKING:  # pragma: no cover - typing only
+    from .batch import BatchCheckpoint, MessageBatchRunner
 
 logger = logging.getLogger(__name__)
 
+# Seconds the pipelined sampler waits when every pair it drew is still in flight.
+_IN_FLIGHT_WAIT = 0.05
+
 
 @dataclass(slots=True)
 class DaydreamResult:
-    """Represents the outcome of evaluating a single idea."""
+    """Represents the outcome of evaluating a single idea.
+
+    ``score`` is ``None`` when the critic was skipped, either because the
+    proposal nearly duplicates an idea already in memory (``duplicate`` is
+    set) or because the acceptance predictor judged it a likely reject
+    (``predicted_reject`` is set). ``acceptance_probability`` is the
+    predictor's estimate, when one was made.
+    """
 
     concept_a: MemoryEntry
     concept_b: MemoryEntry
     proposal: IdeaProposal
-    score: IdeaScore
+    score: IdeaScore | None
     accepted: bool
+    duplicate: bool = False
+    predicted_reject: bool = False
+    acceptance_probability: float | None = None
+
+    @property
+    def escalated(self) -> bool:
+        """Whether a cascaded critic re-scored the idea with its escalation model."""
+
+        return self.score is not None and self.score.escalated
+
+
+@dataclass(slots=True)
+class _Batch:
+    """One sampled batch on its way from the generator to the memory write."""
+
+    proposals: list[tuple[MemoryEntry, MemoryEntry, IdeaProposal]]
+    duplicates: set[int]
+    probabilities: dict[int, float | None]
+    to_score: list[int]
+    scores: dict[int, IdeaScore] = field(default_factory=dict)
 
 
 class DaydreamingLoop:
-    """Core orchestrator that runs the daydreaming process."""
+    """Core orchestrator that runs the daydreaming process.
+
+    Every generator and critic response is recorded in :attr:`ledger` (a
+    fresh :class:`~daydreamer.costs.CostLedger` unless one is passed), which
+    aggregates tokens, latency and cost per stage and per iteration.
+
+    A cascaded critic escalates ideas whose first-stage scores lie within
+    ``config.borderline_band`` of the acceptance thresholds; the two stages
+    are recorded as ``critic`` and ``critic-escalation``.
+
+    With a ``predictor``, proposals it judges unlikely to be accepted skip
+    the critic (apart from its exploration fraction), and every critic verdict
+    trains it. A predictor without history is first fitted to the scores
+    stored in the metadata of ideas already in memory, provided those include
+    ideas the current thresholds would reject.
+    """
 
     def __init__(
         self,
         *,
         config: DaydreamConfig,
-        memory: MemoryStore,
+        memory: MemoryStore | SQLiteMemoryStore,
         generator: IdeaGenerator,
         critic: IdeaCritic,
+        ledger: CostLedger | None = None,
+        predictor: AcceptancePredictor | None = None,
     ) -> None:
         self._config = config
         self._memory = memory
         self._generator = generator
         self._critic = critic
+        self._ledger = ledger if ledger is not None else CostLedger()
+        self._predictor = predictor
+        if predictor is not None and predictor.examples == 0:
+            self._fit_predictor_to_memory(predictor)
+
+    @property
+    def ledger(self) -> CostLedger:
+        return self._ledger
+
+    def run_iteration(self, *, batch_size: int | None = None) -> Sequence[DaydreamResult]:
+        """Explore ``batch_size`` concept pairs (``config.batch_size`` by default) one stage after another."""
 
-    def run_iteration(self) -> Sequence[DaydreamResult]:
-        pairs = self._memory.sample_pairs(self._config.batch_size)
+        pairs = self._sample_pairs(batch_size or self._config.batch_size)
         if not pairs:
             logger.debug("No concept pairs available; skipping iteration.")
             return []
 
+        self._ledger.begin_iteration()
+        return self._write(self._critique(self._generate(pairs)))
+
+    def run_batched_iteration(
+        self, runner: MessageBatchRunner, checkpoint: BatchCheckpoint, *, pairs: int | None = None
+    ) -> Sequence[DaydreamResult]:
+        """Run one iteration over ``pairs`` concept pairs as two Message Batches.
+
+        All generator prompts go out as one batch; once it has ended, the
+        critic prompts for the non-duplicate proposals go out as a second.
+        Accepted ideas are then written with a single ``add_entries`` call.
+        Progress (sampled pairs, batch ids and proposals) is saved to
+        ``checkpoint`` after each step, so calling this again after a crash
+        resumes polling the outstanding batch instead of resubmitting. The ids
+        of accepted ideas are saved before they are written, so a resumed
+        write skips the ones already in memory.
+        Requests that fail inside a batch are dropped from the results.
+        Ideas are scored by the runner's model alone; a cascaded critic's
+        escalation stage is not used here.
+        """
+
+        self._ledger.begin_iteration()
+        state: dict[str, Any] = checkpoint.load()
+        if not state:
+            sampled = self._sample_pairs(pairs or self._config.batch_size)
+            if not sampled:
+                logger.debug("No concept pairs available; skipping iteration.")
+                return []
+            state = {"pairs": [[left.to_json(), right.to_json()] for left, right in sampled]}
+            checkpoint.save(state)
+        concept_pairs = {
+            f"pair-{index}": (MemoryEntry.from_json(left), MemoryEntry.from_json(right))
+            for index, (left, right) in enumerate(state["pairs"])
+        }
+
+        if "generator_batch" not in state:
+            requests = {key: self._generator.build_request(*pair) for key, pair in concept_pairs.items()}
+            state["generator_batch"] = runner.submit(requests)
+            checkpoint.save(state)
+        if "proposals" not in state:
+            responses = runner.wait(state["generator_batch"])
+            for response in responses.values():
+                if response is not None:
+                    self._ledger.record("generator", response, price_factor=BATCH_PRICE_FACTOR)
+            state["proposals"] = {key: response and response.text for key, response in responses.items()}
+            for key, text in state["proposals"].items():
+                if text is not None:
+                    self._memory.mark_explored(*concept_pairs[key])
+            checkpoint.save(state)
+        proposals = {
+            key: self._generator.parse_response(
+                self._generator.build_request(*concept_pairs[key]), LLMResponse(text=text)
+            )
+            for key, text in state["proposals"].items()
+            if text is not None
+        }
+
+        if "critic_batch" not in state:
+            duplicates = {
+                key for key, proposal in proposals.items() if self._memory.find_near_duplicate(proposal.text)
+            }
+            requests = {
+                key: self._critic.build_request(proposal.text)
+                for key, proposal in proposals.items()
+                if key not in duplicates
+            }
+            state["duplicates"] = sorted(duplicates)
+            state["critic_batch"] = runner.submit(requests) if requests else None
+            checkpoint.save(state)
+        scores = runner.wait(state["critic_batch"]) if state["critic_batch"] else {}
+        for response in scores.values():
+            if response is not None:
+                self._ledger.record("critic", response, price_factor=BATCH_PRICE_FACTOR)
+
+        resumed = "entry_ids" in state
+        entry_ids: dict[str, str] = state.setdefault("entry_ids", {})
         results: List[DaydreamResult] = []
-        for concept_a, concept_b in pairs:
-            proposal = self._generator.propose(concept_a, concept_b)
-            score = self._critic.score(proposal.text)
+        accepted_entries: list[MemoryEntry] = []
+        for key, proposal in proposals.items():
+            concept_a, concept_b = concept_pairs[key]
+            if key in state["duplicates"]:
+                results.append(
+                    DaydreamResult(concept_a, concept_b, proposal, score=None, accepted=False, duplicate=True)
+                )
+                continue
+            response = scores.get(key)
+            if response is None:
+                continue
+            score = self._critic.parse_score(response)
             accepted = self._should_accept(score)
             if accepted:
-                metadata = {
-                    "sources": (concept_a.id, concept_b.id),
-                    "scores": {
-                        "novelty": score.novelty,
-                        "coherence": score.coherence,
-                        "usefulness": score.usefulness,
-                    },
-                    "justification": score.justification,
-                }
-                self._memory.add_entry(proposal.text, kind="idea", metadata=metadata)
-                if self._config.max_history:
-                    self._memory.prune(self._config.max_history)
-            results.append(
-                DaydreamResult(
-                    concept_a=concept_a,
-                    concept_b=concept_b,
-                    proposal=proposal,
-                    score=score,
-                    accepted=accepted,
+                accepted_entries.append(
+                    MemoryEntry(
+                        id=entry_ids.setdefault(key, str(uuid.uuid4())),
+                        content=proposal.text,
+                        kind="idea",
+                        metadata=self._idea_metadata(concept_a, concept_b, score),
+                    )
                 )
-            )
+            results.append(DaydreamResult(concept_a, concept_b, proposal, score=score, accepted=accepted))
+        if accepted_entries:
+            self._ledger.record_accepted(len(accepted_entries))
+            if resumed:
+                # The previous attempt may have crashed after writing; keep the ideas it already stored.
+                stored = {entry.id for entry in self._memory}
+                accepted_entries = [entry for entry in accepted_entries if entry.id not in stored]
+            else:
+                checkpoint.save(state)
+            self._memory.add_entries(accepted_entries)
+            if self._config.max_history:
+                self._memory.prune(self._config.max_history)
+        checkpoint.clear()
         return results
 
     def run_forever(
@@ -82,20 +235,279 @@ class DaydreamingLoop:
         *,
         callback: Callable[[Sequence[DaydreamResult]], None] | None = None,
         max_iterations: int | None = None,
+        scheduler: BudgetScheduler | None = None,
     ) -> None:
-        """Repeatedly execute the loop, optionally invoking a callback."""
+        """Repeatedly execute the loop, optionally invoking a callback.
+
+        Without a ``scheduler`` every iteration explores ``config.batch_size``
+        pairs and is followed by ``config.sleep_interval``. With one, each
+        iteration's ledger totals are passed to the scheduler, whose decision
+        sets the next batch size and delay (a pause once a budget window is
+        used up); ``config.sleep_interval`` remains the minimum delay after an
+        iteration that found no pairs or while no budget sets the pace. The callback then receives a
+        :class:`~daydreamer.scheduler.ScheduledIteration`, the results together
+        with that decision.
+        """
 
         iteration = 0
+        batch_size = scheduler.batch_size if scheduler is not None else self._config.batch_size
         while True:
-            results = self.run_iteration()
+            started = time.perf_counter()
+            results: Sequence[DaydreamResult] = self.run_iteration(batch_size=batch_size)
+            delay = self._config.sleep_interval.total_seconds()
+            if scheduler is not None:
+                if results:
+                    scheduler.observe(
+                        self._ledger.iterations[-1], pairs=len(results), duration=time.perf_counter() - started
+                    )
+                decision = scheduler.plan()
+                if not decision.paused and (not results or decision.budget is None):
+                    # Nothing paces the next iteration (no pairs to explore, or no usage a budget can measure
+                    # yet), so wait as long as the unscheduled loop would rather than spinning.
+                    decision = replace(decision, delay=max(decision.delay, delay))
+                batch_size, delay = decision.batch_size, decision.delay
+                results = ScheduledIteration(results, decision)
             if callback:
                 callback(results)
             iteration += 1
             if max_iterations is not None and iteration >= max_iterations:
                 return
-            time.sleep(self._config.sleep_interval.total_seconds())
+            time.sleep(delay)
+
+    def run_pipelined(
+        self,
+        *,
+        callback: Callable[[Sequence[DaydreamResult]], None] | None = None,
+        max_iterations: int | None = None,
+        generator_workers: int = 8,
+        critic_workers: int = 8,
+        queue_size: int = 2,
+        stop: threading.Event | None = None,
+    ) -> None:
+        """Run iterations concurrently as a pipeline of sampling, generation, critique and memory write.
+
+        Each iteration's batch of ``config.batch_size`` pairs moves through
+        the same steps as in :meth:`run_iteration`, but up to
+        ``generator_workers`` batches wait on the generator and
+        ``critic_workers`` on the critic at once. The stages are joined by
+        queues of ``queue_size`` batches, so sampling blocks once the critic
+        falls behind. Accepted ideas are written, and ``callback`` invoked,
+        on the calling thread only. Pairs still in flight are not sampled
+        again. There is no ``sleep_interval`` between batches.
+
+        The run ends after ``max_iterations`` batches or once ``stop`` is set,
+        in both cases after every sampled batch has been written (see
+        :func:`~daydreamer.pipeline.run_pipeline`). The ledger records the run
+        as a single iteration.
+        """
+
+        stop = stop if stop is not None else threading.Event()
+        in_flight: set[frozenset[str]] = set()
+        lock = threading.Lock()
+
+        def batches() -> Iterable[list[tuple[MemoryEntry, MemoryEntry]]]:
+            count = 0
+            while not stop.is_set() and (max_iterations is None or count < max_iterations):
+                with lock:
+                    pairs = [
+                        pair
+                        for pair in self._sample_pairs(self._config.batch_size)
+                        if frozenset((pair[0].id, pair[1].id)) not in in_flight
+                    ]
+                    in_flight.update(frozenset((left.id, right.id)) for left, right in pairs)
+                    idle = not in_flight
+                if pairs:
+                    count += 1
+                    yield pairs
+                elif idle:
+                    # Nothing to sample and nothing on its way into memory: an empty iteration.
+                    logger.debug("No concept pairs available; waiting.")
+                    count += 1
+                    stop.wait(self._config.sleep_interval.total_seconds())
+                else:
+                    stop.wait(_IN_FLIGHT_WAIT)
+
+        def write(batch: _Batch) -> None:
+            try:
+                results = self._write(batch)
+            finally:
+                with lock:
+                    in_flight.difference_update(frozenset((a.id, b.id)) for a, b, _ in batch.proposals)
+            if callback:
+                callback(results)
+
+        self._ledger.begin_iteration()
+        run_pipeline(
+            batches(),
+            [Stage("generator", self._generate, generator_workers), Stage("critic", self._critique, critic_workers)],
+            write,
+            queue_size=queue_size,
+            stop=stop,
+        )
 
     # ------------------------------------------------------------------
+    def _generate(self, pairs: list[tuple[MemoryEntry, MemoryEntry]]) -> _Batch:
+        # Several pairs share generator calls and several proposals share critic calls, sending the
+        # instructions once per call rather than once per idea.
+        proposals: list[tuple[MemoryEntry, MemoryEntry, IdeaProposal]] = []
+        duplicates: set[int] = set()
+        generated = self._generator.propose_many(pairs)
+        self._record_calls(("generator", proposal.response) for proposal in generated)
+        for (concept_a, concept_b), proposal in zip(pairs, generated):
+            self._memory.mark_explored(concept_a, concept_b)
+            duplicate_of = self._memory.find_near_duplicate(proposal.text)
+            if duplicate_of is not None:
+                logger.debug("Skipping critic for near-duplicate of %s", duplicate_of)
+                duplicates.add(len(proposals))
+            proposals.append((concept_a, concept_b, proposal))
+
+        candidates = [index for index in range(len(proposals)) if index not in duplicates]
+        probabilities: dict[int, float | None] = {}
+        to_score = candidates
+        if self._predictor is not None:
+            screened = self._predictor.screen([proposals[index][2].text for index in candidates])
+            probabilities = dict(zip(candidates, screened))
+            to_score = [index for index in candidates if self._predictor.keep(probabilities[index])]
+        return _Batch(proposals, duplicates, probabilities, to_score)
+
+    def _critique(self, batch: _Batch) -> _Batch:
+        ideas = [batch.proposals[index][2].text for index in batch.to_score]
+        batch.scores = dict(zip(batch.to_score, self._critic.score_batch(ideas, escalate=self._is_borderline)))
+        self._record_scores(batch.scores.values())
+        return batch
+
+    def _write(self, batch: _Batch) -> list[DaydreamResult]:
+        """Train the predictor, store accepted ideas and build the results; the only stage that writes memory."""
+
+        scores, probabilities = batch.scores, batch.probabilities
+        if self._predictor is not None:
+            self._predictor.record(
+                [batch.proposals[index][2].text for index in batch.to_score],
+                [self._should_accept(scores[index]) for index in batch.to_score],
+                [probabilities[index] for index in batch.to_score],
+            )
+
+        results: List[DaydreamResult] = []
+        for index, (concept_a, concept_b, proposal) in enumerate(batch.proposals):
+            if index in batch.duplicates:
+                results.append(
+                    DaydreamResult(
+                        concept_a=concept_a,
+                        concept_b=concept_b,
+                        proposal=proposal,
+                        score=None,
+                        accepted=False,
+                        duplicate=True,
+                    )
+                )
+                continue
+            if index not in scores:
+                results.append(
+                    DaydreamResult(
+                        concept_a=concept_a,
+                        concept_b=concept_b,
+                        proposal=proposal,
+                        score=None,
+                        accepted=False,
+                        predicted_reject=True,
+                        acceptance_probability=probabilities[index],
+                    )
+                )
+                continue
+            score = scores[index]
+            accepted = self._should_accept(score)
+            if accepted:
+                self._ledger.record_accepted()
+                metadata = self._idea_metadata(concept_a, concept_b, score)
+                self._memory.add_entry(proposal.text, kind="idea", metadata=metadata)
+                if self._config.max_history:
+                    self._memory.prune(self._config.max_history)
+            results.append(
+                DaydreamResult(
+                    concept_a=concept_a,
+                    concept_b=concept_b,
+                    proposal=proposal,
+                    score=score,
+                    accepted=accepted,
+                    acceptance_probability=probabilities.get(index),
+                )
+            )
+        return results
+
+    def _sample_pairs(self, count: int) -> list[tuple[MemoryEntry, MemoryEntry]]:
+        if self._config.max_generation_depth is None:
+            return self._memory.sample_pairs(count)
+        return self._memory.sample_pairs(count, max_depth=self._config.max_generation_depth)
+
+    @staticmethod
+    def _idea_metadata(concept_a: MemoryEntry, concept_b: MemoryEntry, score: IdeaScore) -> dict[str, Any]:
+        return {
+            "sources": (concept_a.id, concept_b.id),
+            "scores": {
+                "novelty": score.novelty,
+                "coherence": score.coherence,
+                "usefulness": score.usefulness,
+            },
+            "justification": score.justification,
+        }
+
+    def _fit_predictor_to_memory(self, predictor: AcceptancePredictor) -> None:
+        texts: list[str] = []
+        labels: list[bool] = []
+        for entry in self._memory:
+            scores = entry.metadata.get("scores") if entry.kind == "idea" else None
+            if not isinstance(scores, dict):
+                continue
+            score = IdeaScore(
+                novelty=scores.get("novelty", 0.0),
+                coherence=scores.get("coherence", 0.0),
+                usefulness=scores.get("usefulness", 0.0),
+                justification="",
+            )
+            texts.append(entry.content)
+            labels.append(self._should_accept(score))
+        # Stored ideas were accepted, usually under the same thresholds; examples of one class would only count
+        # towards the warmup without teaching the predictor what a reject looks like.
+        if len(set(labels)) < 2:
+            return
+        for start in range(0, len(texts), 256):
+            predictor.update(texts[start : start + 256], labels[start : start + 256])
+        if texts:
+            logger.info("Fitted the acceptance predictor to %d stored ideas", len(texts))
+
+    def _record_scores(self, scores: Iterable[IdeaScore]) -> None:
+        calls: list[tuple[str, LLMResponse | None]] = []
+        for score in scores:
+            if score.screening is not None:
+                calls += [(SCREENING_STAGE, score.screening.response), (ESCALATION_STAGE, score.response)]
+            else:
+                calls.append((SCREENING_STAGE, score.response))
+        self._record_calls(calls)
+
+    def _record_calls(self, calls: Iterable[tuple[str, LLMResponse | None]]) -> None:
+        # Results of one multi-idea call share its response; record each call once, covering all its ideas.
+        counted: dict[int, tuple[str, LLMResponse, int]] = {}
+        for stage, response in calls:
+            if response is not None:
+                _, _, items = counted.get(id(response), (stage, response, 0))
+                counted[id(response)] = (stage, response, items + 1)
+        for stage, response, items in counted.values():
+            self._ledger.record(stage, response, items=items)
+
+    def _is_borderline(self, score: IdeaScore) -> bool:
+        """Whether the closest criterion lies within the borderline band of its threshold."""
+
+        band = self._config.borderline_band
+        return -band <= self._margin(score) < band
+
+    def _margin(self, score: IdeaScore) -> float:
+        # An idea is accepted exactly when every criterion clears its threshold, i.e. the margin is >= 0.
+        return min(
+            score.novelty - self._config.novelty_threshold,
+            score.coherence - self._config.coherence_threshold,
+            score.usefulness - self._config.usefulness_threshold,
+        )
+
     def _should_accept(self, score: IdeaScore) -> bool:
         return (
             score.novelty >= self._config.novelty_threshold
@@ -2,14 +2,29 @@
 
 from __future__ import annotations
 
+import itertools
 import json
+import os
 import random
 import threading
 import time
 import uuid
-from dataclasses import asdict, dataclass, field
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any, Iterable, Iterator, Sequence
+from typing import TYPE_CHECKING, Any, Iterable, Iterator, Sequence
+
+from .dedup import NearDuplicateIndex
+from .journal import MemoryJournal
+from .pairs import ExploredPairRegistry, PairCoverage
+from .timeline import Timeline
+
+if TYPE_CHECKING:  # pragma: no cover - these modules import MemoryEntry from here
+    from .columnar import ColumnarState, ColumnarTimeline
+    from .embedding import EmbeddingIndex
+    from .eviction import EvictionPolicy, EvictionQueue
+    from .lineage import LineageIndex
 
 
 @dataclass(slots=True)
@@ -23,9 +38,13 @@ class MemoryEntry:
     metadata: dict[str, Any] = field(default_factory=dict)
 
     def to_json(self) -> dict[str, Any]:
-        data = asdict(self)
-        data["metadata"] = dict(self.metadata)
-        return data
+        return {
+            "id": self.id,
+            "content": self.content,
+            "kind": self.kind,
+            "created_at": self.created_at,
+            "metadata": dict(self.metadata),
+        }
 
     @classmethod
     def from_json(cls, payload: dict[str, Any]) -> "MemoryEntry":
@@ -38,99 +57,532 @@ class MemoryEntry:
         )
 
 
+# Below this acceptance rate weighted sampling switches from rejection to an explicit draw.
+_MIN_ACCEPTANCE = 1 / 32
+# Redraw budget for sample_pairs when explored pairs are being skipped.
+_MAX_SAMPLING_ROUNDS = 8
+# Evicted entries stay in the timeline as tombstones until they exceed this
+# many, or a sixteenth of the store, and are then removed in one pass.
+_MIN_TOMBSTONES = 64
+
+
 class MemoryStore:
-    """Thread-safe store for concepts and ideas."""
+    """Thread-safe store for concepts and ideas.
+
+    By default every mutation rewrites the whole JSON file. With
+    ``journal=True`` mutations are appended to a write-ahead log next to the
+    snapshot instead, and the log is folded into the snapshot by a background
+    thread once it grows past ``compaction_threshold`` bytes.
+
+    ``kind_weights`` biases :meth:`sample_pairs` towards particular entry
+    kinds (for example ``{"concept": 3.0, "idea": 1.0}``); kinds that are not
+    listed default to a weight of ``1.0``.
+
+    When a ``pair_registry`` is attached, :meth:`sample_pairs` skips pairs that
+    were previously passed to :meth:`mark_explored`. With an
+    ``embedding_index`` each pair is an anchor drawn as above plus a partner
+    whose embedding similarity lies in the index's target band.
+
+    A ``deduplicator`` is kept in sync with every ``kind="idea"`` entry so the
+    loop can drop restatements of stored ideas via :meth:`find_near_duplicate`.
+
+    A ``lineage_index`` tracks which entries each idea was derived from (see
+    :attr:`lineage`) and lets :meth:`sample_pairs` skip entries deeper than a
+    given generation.
+
+    ``storage="columnar"`` keeps entries in NumPy columns and a shared string
+    arena instead of one Python object per entry (see
+    :class:`~daydreamer.columnar.ColumnarTimeline`); entries are then built on
+    access, so treat returned entries as read-only copies.
+
+    ``snapshot_format="binary"`` (columnar storage only) writes snapshots in
+    the memory-mapped format of :mod:`daydreamer.snapshot`, so reopening a
+    large store maps the file instead of parsing it. Either format is
+    recognised when loading.
 
-    def __init__(self, *, persistence_path: str | Path | None = None) -> None:
-        self._entries: list[MemoryEntry] = []
+    ``shared=True`` (journal mode only) lets several processes use the same
+    memory file. Every mutation holds the journal's cross-process lock, first
+    applies records other processes appended since the last look, and then
+    appends its own; reads pick up new records the same way, so each process
+    only ever parses the journal tail it has not seen. Compaction then runs
+    synchronously under the lock.
+
+    An ``eviction_policy`` (see :mod:`daydreamer.eviction`) changes which
+    entries :meth:`prune` drops from oldest-first to the policy's order. The
+    store keeps evictable entries in a heap, so each eviction costs O(log n);
+    evicted entries are skipped by every read and removed from the timeline in
+    batches.
+    """
+
+    def __init__(
+        self,
+        *,
+        persistence_path: str | Path | None = None,
+        journal: bool = False,
+        compaction_threshold: int = 4 * 1024 * 1024,
+        kind_weights: dict[str, float] | None = None,
+        pair_registry: ExploredPairRegistry | None = None,
+        embedding_index: EmbeddingIndex | None = None,
+        deduplicator: NearDuplicateIndex | None = None,
+        lineage_index: LineageIndex | None = None,
+        storage: str = "objects",
+        snapshot_format: str = "json",
+        shared: bool = False,
+        eviction_policy: EvictionPolicy | None = None,
+    ) -> None:
+        if storage not in ("objects", "columnar"):
+            raise ValueError(f"storage must be 'objects' or 'columnar'; got {storage!r}")
+        if snapshot_format not in ("json", "binary"):
+            raise ValueError(f"snapshot_format must be 'json' or 'binary'; got {snapshot_format!r}")
+        if snapshot_format == "binary" and storage != "columnar":
+            raise ValueError("binary snapshots require storage='columnar'")
+        if shared and not (persistence_path and journal):
+            raise ValueError("shared stores need a persistence_path and journal=True")
+        self._storage = storage
+        self._snapshot_format = snapshot_format
+        self._entries = self._new_timeline()
+        self._kind_counts: Counter[str] = Counter()
+        self._kind_weights = dict(kind_weights) if kind_weights else None
+        self._pair_registry = pair_registry
+        self._embedding_index = embedding_index
+        self._deduplicator = deduplicator
+        self._lineage_index = lineage_index
+        self._eviction: EvictionQueue | None = None
+        if eviction_policy is not None:
+            from .eviction import EvictionQueue
+
+            self._eviction = EvictionQueue(eviction_policy)
+        self._evicted: set[str] = set()
         self._lock = threading.RLock()
         self._path = Path(persistence_path) if persistence_path else None
+        self._shared = shared
+        self._journal = (
+            MemoryJournal(self._path.with_name(self._path.name + ".journal"), shared=shared)
+            if self._path and journal
+            else None
+        )
+        self._compaction_threshold = compaction_threshold
+        self._compactor: threading.Thread | None = None
+        self._compaction_lock = threading.Lock()
+        self._sequence = 0
+        self._snapshot_sequence = 0  # journal sequence the memory file already covers
         if self._path:
-            self._load()
+            with self._writing(catch_up=False):
+                self._load()
 
     # ------------------------------------------------------------------
     # Basic operations
     # ------------------------------------------------------------------
     def __len__(self) -> int:  # pragma: no cover - trivial
-        return len(self._entries)
+        self._refresh()
+        return len(self._entries) - len(self._evicted)
 
     def __iter__(self) -> Iterator[MemoryEntry]:  # pragma: no cover - trivial
-        yield from list(self._entries)
+        self._refresh()
+        with self._lock:
+            entries = [entry for entry in self._entries if entry.id not in self._evicted]
+        yield from entries
 
     def add_entry(self, content: str, *, kind: str = "concept", metadata: dict[str, Any] | None = None) -> MemoryEntry:
         entry = MemoryEntry(id=str(uuid.uuid4()), content=content, kind=kind, metadata=metadata or {})
-        with self._lock:
-            self._entries.append(entry)
-            self._persist()
+        with self._writing():
+            self._insert([entry])
+            self._record([{"op": "add", "entry": entry.to_json()}])
         return entry
 
     def add_entries(self, entries: Iterable[MemoryEntry]) -> None:
-        with self._lock:
-            self._entries.extend(entries)
-            self._persist()
+        with self._writing():
+            added = list(entries)
+            self._insert(added)
+            self._record({"op": "add", "entry": entry.to_json()} for entry in added)
 
     def get_recent(self, n: int) -> Sequence[MemoryEntry]:
+        self._refresh()
         with self._lock:
-            return list(sorted(self._entries, key=lambda e: e.created_at, reverse=True)[:n])
+            if not self._evicted:
+                return self._entries.newest(n)
+            newest = self._entries.newest(n + len(self._evicted))
+            return [entry for entry in newest if entry.id not in self._evicted][: max(n, 0)]
 
     def prune(self, max_items: int) -> None:
-        with self._lock:
-            if max_items < 0:
-                raise ValueError("max_items must be non-negative")
-            if len(self._entries) <= max_items:
+        """Evict entries until at most ``max_items`` remain.
+
+        Without an eviction policy the oldest entries go first. With one, the
+        policy decides; pinned entries are never evicted, so the store may
+        stay above ``max_items`` if only pinned entries are left.
+        """
+
+        if max_items < 0:
+            raise ValueError("max_items must be non-negative")
+        with self._writing():
+            excess = len(self._entries) - len(self._evicted) - max_items
+            if excess <= 0:
                 return
-            self._entries.sort(key=lambda e: e.created_at, reverse=True)
-            self._entries = self._entries[:max_items]
-            self._persist()
+            if self._eviction is None:
+                dropped = self._entries.pop_oldest(excess)
+            else:
+                dropped = self._eviction.pop(excess)
+                self._evicted.update(entry.id for entry in dropped)
+            if not dropped:
+                return
+            self._forget(dropped)
+            self._record([{"op": "remove", "ids": [entry.id for entry in dropped]}])
+            if len(self._evicted) > max(_MIN_TOMBSTONES, len(self._entries) // 16):
+                self._purge()
+
+    def compact(self) -> None:
+        """Fold the journal into the snapshot synchronously."""
+
+        if not self._journal:
+            return
+        self.flush()
+        with self._writing():
+            state = self._capture()
+            sequence = self._sequence
+            if self._shared:
+                self._compact(state, sequence)
+                return
+        self._compact(state, sequence)
+
+    def flush(self) -> None:
+        """Wait for any background compaction and flush sidecar indexes."""
+
+        compactor = self._compactor
+        if compactor is not None:
+            compactor.join()
+        if self._pair_registry is not None:
+            self._pair_registry.flush()
 
     # ------------------------------------------------------------------
     # Sampling utilities
     # ------------------------------------------------------------------
-    def sample_pairs(self, k: int) -> list[tuple[MemoryEntry, MemoryEntry]]:
-        """Sample ``k`` concept pairs without replacement.
+    def sample_pairs(
+        self, k: int, *, kind_weights: dict[str, float] | None = None, max_depth: int | None = None
+    ) -> list[tuple[MemoryEntry, MemoryEntry]]:
+        """Sample up to ``k`` disjoint concept pairs without replacement.
 
-        Sampling favours diversity by shuffling and pairing adjacent items.
-        The order of entries is randomized on every call.
+        Positions are drawn directly against the entry list, so a call costs
+        O(k) regardless of the store size. ``kind_weights`` overrides the
+        store-level weighting for this call. ``max_depth`` (which needs a
+        lineage index) rejects entries whose generation depth exceeds it.
         """
 
         if k < 1:
             raise ValueError("k must be >= 1")
+        if max_depth is not None and self._lineage_index is None:
+            raise ValueError("max_depth requires a lineage_index")
+        self._refresh()
 
         with self._lock:
-            if len(self._entries) < 2:
-                return []
-            entries = list(self._entries)
-
-        random.shuffle(entries)
-        pairs: list[tuple[MemoryEntry, MemoryEntry]] = []
-        idx = 0
-        while idx + 1 < len(entries) and len(pairs) < k:
-            left, right = entries[idx], entries[idx + 1]
-            if left.id != right.id:
-                pairs.append((left, right))
-            idx += 2
-
+            weights = kind_weights if kind_weights is not None else self._kind_weights
+            pairs: list[tuple[MemoryEntry, MemoryEntry]] = []
+            used: set[str] = set()
+            # Without filters every drawn pair is usable and one round suffices.
+            filtered = self._pair_registry is not None or max_depth is not None or self._evicted
+            rounds = _MAX_SAMPLING_ROUNDS if filtered else 1
+            for _ in range(rounds):
+                candidates = self._draw_pairs(k - len(pairs), weights, used)
+                for left, right in candidates:
+                    if left.id in used or right.id in used:
+                        continue
+                    if left.id in self._evicted or right.id in self._evicted:
+                        continue
+                    if left.id == right.id or self.is_explored(left, right):
+                        continue
+                    if max_depth is not None and max(self._lineage_index.depths((left.id, right.id))) > max_depth:
+                        continue
+                    used.update((left.id, right.id))
+                    pairs.append((left, right))
+                if len(pairs) >= k or not candidates:
+                    break
+            if self._eviction is not None:
+                self._eviction.touch(entry for pair in pairs for entry in pair)
         return pairs
 
+    def _draw_pairs(
+        self, count: int, weights: dict[str, float] | None, used: set[str]
+    ) -> list[tuple[MemoryEntry, MemoryEntry]]:
+        """Draw ``count`` candidate pairs. Lock must be held."""
+
+        if self._embedding_index is None:
+            positions = self._sample_positions(2 * count, weights)
+            return [(self._entries[left], self._entries[right]) for left, right in zip(positions[::2], positions[1::2])]
+        anchors = [self._entries[position] for position in self._sample_positions(count, weights)]
+        partners = self._embedding_index.sample_partners(anchors, exclude=used)
+        return [(anchor, partner) for anchor, partner in zip(anchors, partners) if partner is not None]
+
+    def find_near_duplicate(self, text: str) -> str | None:
+        """Return the id of a stored idea that ``text`` restates, if any."""
+
+        if self._deduplicator is None:
+            return None
+        return self._deduplicator.find_duplicate(text)
+
+    def mark_explored(self, concept_a: MemoryEntry, concept_b: MemoryEntry) -> None:
+        """Record that a pair has been through the generator and critic."""
+
+        if self._pair_registry is not None:
+            self._pair_registry.add(concept_a.id, concept_b.id)
+
+    def is_explored(self, concept_a: MemoryEntry, concept_b: MemoryEntry) -> bool:
+        return self._pair_registry is not None and (concept_a.id, concept_b.id) in self._pair_registry
+
+    @property
+    def lineage(self) -> LineageIndex | None:
+        """Provenance index for ancestry, descendant and depth queries, if attached."""
+
+        return self._lineage_index
+
+    def pair_coverage(self) -> PairCoverage | None:
+        """Fraction of the current pair space that has been explored, if tracked."""
+
+        if self._pair_registry is None:
+            return None
+        return self._pair_registry.coverage(len(self))
+
+    def _sample_positions(self, count: int, weights: dict[str, float] | None) -> list[int]:
+        """Draw up to ``count`` distinct positions. Lock must be held."""
+
+        if weights is None:
+            total = len(self._entries)
+            return random.sample(range(total), min(count, total))
+        # Kind counts exclude evicted entries, so weighted draws need a timeline without tombstones.
+        self._purge()
+        total = len(self._entries)
+
+        kind_weight = {kind: max(0.0, weights.get(kind, 1.0)) for kind, n in self._kind_counts.items() if n > 0}
+        eligible = sum(self._kind_counts[kind] for kind, weight in kind_weight.items() if weight > 0)
+        count = min(count, eligible)
+        if count < 1:
+            return []
+        max_weight = max(kind_weight.values())
+        mass = sum(weight * self._kind_counts[kind] for kind, weight in kind_weight.items())
+
+        chosen: dict[int, None] = {}
+        # Rejection sampling needs max_weight * total / mass draws per position on
+        # average; fall back to an explicit weighted draw when that gets expensive.
+        if mass >= _MIN_ACCEPTANCE * max_weight * total:
+            while len(chosen) < count:
+                position = random.randrange(total)
+                if position not in chosen and random.random() * max_weight < kind_weight[self._entries.kind_at(position)]:
+                    chosen[position] = None
+        else:
+            population = [idx for idx in range(total) if kind_weight[self._entries.kind_at(idx)] > 0]
+            cumulative = list(itertools.accumulate(kind_weight[self._entries.kind_at(idx)] for idx in population))
+            while len(chosen) < count:
+                for position in random.choices(population, cum_weights=cumulative, k=count - len(chosen)):
+                    chosen.setdefault(position, None)
+        return list(chosen)
+
     # ------------------------------------------------------------------
     # Persistence helpers
     # ------------------------------------------------------------------
+    def _new_timeline(self, entries: Iterable[MemoryEntry] = ()) -> Timeline | ColumnarTimeline:
+        if self._storage == "columnar":
+            from .columnar import ColumnarTimeline
+
+            return ColumnarTimeline(entries)
+        return Timeline(entries)
+
     def _load(self) -> None:
-        if not self._path or not self._path.exists():
+        from .snapshot import is_snapshot, open_snapshot
+
+        if self._path and self._path.exists() and is_snapshot(self._path):
+            timeline, self._sequence = open_snapshot(self._path)
+            self._entries = timeline if self._storage == "columnar" else self._new_timeline(timeline)
+        elif self._path and self._path.exists():
+            try:
+                raw = json.loads(self._path.read_text())
+            except json.JSONDecodeError as exc:  # pragma: no cover - load errors are rare
+                raise ValueError(f"Failed to parse memory file {self._path}: {exc}") from exc
+            # Journaled snapshots wrap the entry list with the last applied sequence.
+            if isinstance(raw, dict):
+                self._sequence = int(raw.get("sequence", 0))
+                raw = raw["entries"]
+            self._entries = self._new_timeline(MemoryEntry.from_json(item) for item in raw)
+        self._snapshot_sequence = self._sequence
+        if self._journal:
+            self._replay(self._journal.replay(after=self._sequence))
+        self._kind_counts = self._entries.kind_counts()
+        if self._embedding_index is not None:
+            self._embedding_index.add(self._entries)
+        if self._lineage_index is not None:
+            self._lineage_index.add(self._entries)
+        if self._eviction is not None:
+            self._eviction.push(self._entries)
+        if self._deduplicator is not None:
+            # The index persists its own signatures; only hash ideas it has not seen.
+            ideas = {entry.id: entry for entry in self._entries if entry.kind == "idea"}
+            indexed = self._deduplicator.ids()
+            self._deduplicator.remove(indexed - ideas.keys())
+            for entry_id in ideas.keys() - indexed:
+                self._deduplicator.add(entry_id, ideas[entry_id].content)
+
+    def _insert(self, entries: list[MemoryEntry]) -> None:
+        """Add entries to the timeline and every index. Lock must be held."""
+
+        self._entries.extend(entries)
+        self._kind_counts.update(entry.kind for entry in entries)
+        if self._embedding_index is not None:
+            self._embedding_index.add(entries)
+        if self._deduplicator is not None:
+            for entry in entries:
+                if entry.kind == "idea":
+                    self._deduplicator.add(entry.id, entry.content)
+        if self._lineage_index is not None:
+            self._lineage_index.add(entries)
+        if self._eviction is not None:
+            self._eviction.push(entries)
+
+    def _forget(self, entries: list[MemoryEntry]) -> None:
+        """Drop already-removed timeline entries from every index. Lock must be held."""
+
+        self._kind_counts.subtract(entry.kind for entry in entries)
+        if self._embedding_index is not None:
+            self._embedding_index.remove(entry.id for entry in entries)
+        if self._deduplicator is not None:
+            self._deduplicator.remove(entry.id for entry in entries)
+        if self._lineage_index is not None:
+            self._lineage_index.remove(entry.id for entry in entries)
+        if self._eviction is not None:
+            self._eviction.discard(entry.id for entry in entries)
+
+    def _purge(self) -> None:
+        """Remove evicted tombstones from the timeline in one pass. Lock must be held."""
+
+        if self._evicted:
+            self._entries.remove(self._evicted)
+            self._evicted = set()
+
+    @contextmanager
+    def _writing(self, *, catch_up: bool = True) -> Iterator[None]:
+        """Hold the store lock and, for shared stores, the cross-process journal lock."""
+
+        with self._lock:
+            if not self._shared:
+                yield
+                return
+            with self._journal.locked():
+                if catch_up:
+                    self._catch_up()
+                yield
+
+    def _refresh(self) -> None:
+        if self._shared:
+            with self._lock:
+                self._catch_up()
+
+    def _catch_up(self) -> None:
+        """Apply records other processes appended to a shared journal. Lock must be held."""
+
+        records = [record for record in self._journal.read_new() if record["seq"] > self._sequence]
+        if not records:
+            return
+        if records[0]["seq"] != self._sequence + 1:
+            # Another process compacted records we never saw into the snapshot.
+            with self._journal.locked():
+                self._purge()
+                self._forget(list(self._entries))
+                self._entries = self._new_timeline()
+                self._sequence = 0
+                self._load()
             return
-        try:
-            raw = json.loads(self._path.read_text())
-        except json.JSONDecodeError as exc:  # pragma: no cover - load errors are rare
-            raise ValueError(f"Failed to parse memory file {self._path}: {exc}") from exc
-        entries = [MemoryEntry.from_json(item) for item in raw]
-        self._entries = entries
+        pending: list[MemoryEntry] = []
+        for record in records:
+            if record["op"] == "add":
+                pending.append(MemoryEntry.from_json(record["entry"]))
+            elif record["op"] == "remove":
+                self._insert(pending)
+                pending = []
+                ids = set(record["ids"])
+                removed = self._entries.remove(ids)
+                self._forget([entry for entry in removed if entry.id not in self._evicted])
+                self._evicted -= ids
+            self._sequence = record["seq"]
+        self._insert(pending)
+
+    def _replay(self, records: Iterable[dict[str, Any]]) -> None:
+        for record in records:
+            if record["op"] == "add":
+                self._entries.append(MemoryEntry.from_json(record["entry"]))
+            elif record["op"] == "remove":
+                self._entries.remove(set(record["ids"]))
+            self._sequence = record["seq"]
+
+    def _record(self, operations: Iterable[dict[str, Any]]) -> None:
+        """Persist a batch of mutations. Must be called with the lock held.
+
+        ``operations`` is only consumed in journal mode, so callers can pass a
+        generator and skip serialising entries when the whole file is rewritten.
+        """
+
+        if not self._journal:
+            self._persist()
+            return
+        operations = list(operations)
+        for operation in operations:
+            self._sequence += 1
+            operation["seq"] = self._sequence
+        self._journal.append(operations)
+        self._maybe_compact()
+
+    def _maybe_compact(self) -> None:
+        if self._journal.size_bytes < self._compaction_threshold:
+            return
+        if self._shared:
+            # Under the cross-process lock, so snapshots never move backwards.
+            self._compact(self._capture(), self._sequence)
+            return
+        if self._compactor is not None and self._compactor.is_alive():
+            return
+        self._compactor = threading.Thread(
+            target=self._compact,
+            args=(self._capture(), self._sequence),
+            name="memory-compactor",
+            daemon=True,
+        )
+        self._compactor.start()
+
+    def _capture(self) -> list[MemoryEntry] | ColumnarState:
+        """Copy what the next snapshot needs. Must be called with the lock held."""
+
+        self._purge()
+        if self._snapshot_format == "binary":
+            return self._entries.export_state()
+        return list(self._entries)
+
+    def _compact(self, state: list[MemoryEntry] | ColumnarState, sequence: int) -> None:
+        with self._compaction_lock:
+            # A background compaction can finish after a newer explicit one; its state is stale by then.
+            if sequence <= self._snapshot_sequence:
+                return
+            self._write_snapshot(state, sequence)
+            self._snapshot_sequence = sequence
+            self._journal.truncate_through(sequence)
 
     def _persist(self) -> None:
         if not self._path:
             return
-        payload = [entry.to_json() for entry in self._entries]
+        self._write_snapshot(self._capture(), None)
+
+    def _write_snapshot(self, state: list[MemoryEntry] | ColumnarState, sequence: int | None) -> None:
+        """Atomically replace the memory file; ``sequence`` is recorded for journaled stores."""
+
+        from .snapshot import write_snapshot
+
         tmp_path = self._path.with_suffix(".tmp")
-        tmp_path.write_text(json.dumps(payload, indent=2, sort_keys=True))
+        with tmp_path.open("wb") as handle:
+            if isinstance(state, list):
+                payload: Any = [entry.to_json() for entry in state]
+                if sequence is None:
+                    data = json.dumps(payload, indent=2, sort_keys=True)
+                else:
+                    data = json.dumps({"sequence": sequence, "entries": payload}, sort_keys=True)
+                handle.write(data.encode("utf-8"))
+            else:
+                write_snapshot(handle, state, sequence=sequence or 0)
+            handle.flush()
+            os.fsync(handle.fileno())
         tmp_path.replace(self._path)
 
 
@@ -0,0 +1,140 @@
+"""Registry of concept pairs the loop has already explored."""
+
+from __future__ import annotations
+
+import hashlib
+import math
+import mmap
+import struct
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+
+_MAGIC = b"DDPAIRS1"
+# magic, bit count, hash count, inserted pair count
+_HEADER = struct.Struct("<8sQIQ")
+
+
+@dataclass(slots=True)
+class PairCoverage:
+    """Summary of how much of the pair space has been explored."""
+
+    explored: int
+    total_pairs: int
+    fraction: float
+    size_bytes: int
+    false_positive_rate: float
+
+
+class ExploredPairRegistry:
+    """Bloom filter over unordered ``(id, id)`` pairs.
+
+    Pairs are hashed order-independently, so ``(a, b)`` and ``(b, a)`` are the
+    same pair. With a ``path`` the filter lives in a memory-mapped file: bits
+    are set in place and never require rewriting the file, and untouched pages
+    stay sparse on disk. At the default sizing (20M pairs, 2% false positives)
+    the filter occupies ~20 MiB; a false positive only means a pair is treated
+    as explored and skipped.
+    """
+
+    def __init__(
+        self,
+        path: str | Path | None = None,
+        *,
+        capacity: int = 20_000_000,
+        false_positive_rate: float = 0.02,
+    ) -> None:
+        if capacity < 1:
+            raise ValueError("capacity must be >= 1")
+        if not 0 < false_positive_rate < 1:
+            raise ValueError("false_positive_rate must be between 0 and 1")
+        self._lock = threading.Lock()
+        self._path = Path(path) if path else None
+        self._file = None
+        bits = math.ceil(-capacity * math.log(false_positive_rate) / math.log(2) ** 2)
+        bits += -bits % 8
+        hashes = max(1, round(bits / capacity * math.log(2)))
+        if self._path and self._path.exists():
+            self._file = self._path.open("r+b")
+            self._buffer: mmap.mmap | bytearray = mmap.mmap(self._file.fileno(), 0)
+            magic, bits, hashes, self._count = _HEADER.unpack_from(self._buffer, 0)
+            if magic != _MAGIC:
+                raise ValueError(f"{self._path} is not an explored-pair registry")
+        elif self._path:
+            self._file = self._path.open("w+b")
+            self._file.truncate(_HEADER.size + bits // 8)
+            self._buffer = mmap.mmap(self._file.fileno(), 0)
+            self._count = 0
+        else:
+            self._buffer = bytearray(_HEADER.size + bits // 8)
+            self._count = 0
+        self._bits = bits
+        self._hashes = hashes
+        self._write_header()
+
+    @classmethod
+    def beside(cls, memory_path: str | Path, **kwargs: float) -> "ExploredPairRegistry":
+        """Open the registry stored next to a memory file (``<memory>.pairs``)."""
+
+        memory_path = Path(memory_path)
+        return cls(memory_path.with_name(memory_path.name + ".pairs"), **kwargs)
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __contains__(self, pair: tuple[str, str]) -> bool:
+        buffer = self._buffer
+        return all(buffer[_HEADER.size + bit // 8] & (1 << (bit % 8)) for bit in self._positions(*pair))
+
+    def add(self, first_id: str, second_id: str) -> bool:
+        """Record a pair; returns ``False`` if it was (probably) already present."""
+
+        with self._lock:
+            new = False
+            for bit in self._positions(first_id, second_id):
+                offset, mask = _HEADER.size + bit // 8, 1 << (bit % 8)
+                if not self._buffer[offset] & mask:
+                    self._buffer[offset] |= mask
+                    new = True
+            if new:
+                self._count += 1
+                self._write_header()
+            return new
+
+    def coverage(self, entry_count: int) -> PairCoverage:
+        """Report coverage of the ``entry_count * (entry_count - 1) / 2`` pair space."""
+
+        total = entry_count * (entry_count - 1) // 2
+        fill = 1 - math.exp(-self._hashes * self._count / self._bits)
+        return PairCoverage(
+            explored=self._count,
+            total_pairs=total,
+            fraction=min(1.0, self._count / total) if total else 0.0,
+            size_bytes=len(self._buffer),
+            false_positive_rate=fill**self._hashes,
+        )
+
+    def flush(self) -> None:
+        if isinstance(self._buffer, mmap.mmap):
+            self._buffer.flush()
+
+    def close(self) -> None:
+        if isinstance(self._buffer, mmap.mmap):
+            self._buffer.flush()
+            self._buffer.close()
+        if self._file:
+            self._file.close()
+
+    # ------------------------------------------------------------------
+    def _positions(self, first_id: str, second_id: str) -> list[int]:
+        low, high = sorted((first_id, second_id))
+        digest = hashlib.blake2b(f"{low}\x00{high}".encode("utf-8"), digest_size=16).digest()
+        h1, h2 = struct.unpack("<QQ", digest)
+        h2 |= 1
+        return [(h1 + idx * h2) % self._bits for idx in range(self._hashes)]
+
+    def _write_header(self) -> None:
+        _HEADER.pack_into(self._buffer, 0, _MAGIC, self._bits, self._hashes, self._count)
+
+
+__all__ = ["ExploredPairRegistry", "PairCoverage"]
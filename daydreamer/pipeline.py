@@ -0,0 +1,135 @@
+"""Bounded-queue pipeline that overlaps the loop's I/O-bound stages."""
+
+from __future__ import annotations
+
+import logging
+import queue
+import threading
+from dataclasses import dataclass
+from typing import Any, Callable, Iterable, Sequence
+
+logger = logging.getLogger(__name__)
+
+# Marks the end of a queue's input; each worker that reads it exits.
+_DONE = object()
+
+
+@dataclass(frozen=True, slots=True)
+class Stage:
+    """One step of a pipeline: ``workers`` threads apply ``handle`` to each item.
+
+    ``handle`` returns the item for the next stage, or ``None`` to drop it.
+    """
+
+    name: str
+    handle: Callable[[Any], Any]
+    workers: int = 1
+
+    def __post_init__(self) -> None:
+        if self.workers < 1:
+            raise ValueError(f"Stage {self.name!r} needs at least one worker")
+
+
+def run_pipeline(
+    source: Iterable[Any],
+    stages: Sequence[Stage],
+    sink: Callable[[Any], None],
+    *,
+    queue_size: int = 2,
+    stop: threading.Event | None = None,
+) -> None:
+    """Feed ``source`` through ``stages`` into ``sink`` until it is exhausted or ``stop`` is set.
+
+    Stages are connected by queues holding at most ``queue_size`` items, so a
+    slow stage blocks the ones before it and the source never runs more than
+    a few items ahead. ``sink`` runs on the calling thread, which therefore
+    is the only one that sees finished items.
+
+    Shutdown drains: once ``stop`` is set (or the source ends) nothing new is
+    read from the source, but every item already taken from it still passes
+    through all stages. An exception in a stage or in ``sink`` sets ``stop``,
+    and the first one is re-raised after the drain. The first
+    ``KeyboardInterrupt`` also drains and is re-raised afterwards; a second
+    one aborts at once.
+    """
+
+    if queue_size < 1:
+        raise ValueError("queue_size must be >= 1")
+    stop = stop if stop is not None else threading.Event()
+    queues: list[queue.Queue[Any]] = [queue.Queue(maxsize=queue_size) for _ in range(len(stages) + 1)]
+    consumers = [stage.workers for stage in stages] + [1]
+    errors: list[BaseException] = []
+    lock = threading.Lock()
+
+    def fail(stage: str, exc: BaseException) -> None:
+        logger.error("Pipeline stage %s failed; draining in-flight work", stage, exc_info=exc)
+        with lock:
+            errors.append(exc)
+        stop.set()
+
+    def feed() -> None:
+        try:
+            for item in source:
+                queues[0].put(item)
+                if stop.is_set():
+                    break
+        except Exception as exc:  # noqa: BLE001 - reported once the pipeline has drained
+            fail("source", exc)
+        finally:
+            for _ in range(consumers[0]):
+                queues[0].put(_DONE)
+
+    remaining = list(consumers[:-1])
+
+    def work(position: int) -> None:
+        stage, inbox, outbox = stages[position], queues[position], queues[position + 1]
+        try:
+            while (item := inbox.get()) is not _DONE:
+                try:
+                    result = stage.handle(item)
+                except Exception as exc:  # noqa: BLE001 - reported once the pipeline has drained
+                    fail(stage.name, exc)
+                    continue
+                if result is not None:
+                    outbox.put(result)
+        finally:
+            with lock:
+                remaining[position] -= 1
+                last = remaining[position] == 0
+            if last:
+                for _ in range(consumers[position + 1]):
+                    outbox.put(_DONE)
+
+    threads = [threading.Thread(target=feed, name="pipeline-source", daemon=True)]
+    for position, stage in enumerate(stages):
+        threads += [
+            threading.Thread(target=work, args=(position,), name=f"pipeline-{stage.name}-{number}", daemon=True)
+            for number in range(stage.workers)
+        ]
+    for thread in threads:
+        thread.start()
+
+    interrupted = False
+    while True:
+        try:
+            item = queues[-1].get()
+            if item is _DONE:
+                break
+            sink(item)
+        except KeyboardInterrupt:
+            if interrupted:
+                raise
+            interrupted = True
+            logger.info("Interrupted; draining in-flight work (interrupt again to abort)")
+            stop.set()
+        except Exception as exc:  # noqa: BLE001 - re-raised once the pipeline has drained
+            fail("sink", exc)
+    for thread in threads:
+        thread.join()
+    if interrupted:
+        raise KeyboardInterrupt
+    if errors:
+        raise errors[0]
+
+
+__all__ = ["Stage", "run_pipeline"]
@@ -0,0 +1,215 @@
+"""Local acceptance predictor that lets the loop skip critic calls on likely rejects."""
+
+from __future__ import annotations
+
+import os
+import random
+import threading
+from dataclasses import dataclass, replace
+from pathlib import Path
+from typing import Sequence
+
+import numpy as np
+
+from .embedding import Embedder, HashingEmbedder
+
+
+@dataclass(slots=True)
+class PredictorStats:
+    """How the predictor has performed since it was opened.
+
+    The confusion counts compare its verdict (acceptance probability at or
+    above the floor) with the critic's on ideas the critic scored. Ideas below
+    the floor only reach the critic through exploration, so each of those
+    counts ``1 / exploration`` times, which keeps recall an unbiased estimate.
+    """
+
+    screened: int = 0  # proposals the predictor gave a probability for
+    skipped: int = 0  # critic calls saved
+    explored: int = 0  # proposals below the floor sent to the critic anyway
+    true_positives: float = 0.0
+    false_positives: float = 0.0
+    false_negatives: float = 0.0
+    true_negatives: float = 0.0
+
+    @property
+    def precision(self) -> float | None:
+        predicted = self.true_positives + self.false_positives
+        return self.true_positives / predicted if predicted else None
+
+    @property
+    def recall(self) -> float | None:
+        actual = self.true_positives + self.false_negatives
+        return self.true_positives / actual if actual else None
+
+
+class AcceptancePredictor:
+    """Online logistic regression over hashed character n-grams of proposal texts.
+
+    It is trained on the critic's verdicts (:meth:`record`), one gradient step
+    per batch. Once it has seen ``warmup`` examples, :meth:`keep` drops
+    proposals whose predicted acceptance probability is below ``floor``. A
+    random ``exploration`` fraction of those still goes to the critic, so the
+    model keeps learning where it is unsure and recall can be measured. With
+    a ``path``, the weights are rewritten there after every update.
+    """
+
+    def __init__(
+        self,
+        path: str | Path | None = None,
+        *,
+        floor: float = 0.1,
+        exploration: float = 0.1,
+        warmup: int = 50,
+        learning_rate: float = 1.0,
+        l2: float = 1e-4,
+        embedder: Embedder | None = None,
+        seed: int | None = None,
+    ) -> None:
+        if not 0 <= floor < 1:
+            raise ValueError("floor must be in [0, 1)")
+        if not 0 < exploration <= 1:
+            raise ValueError("exploration must be in (0, 1]")
+        if warmup < 0:
+            raise ValueError("warmup must be non-negative")
+        if learning_rate <= 0 or l2 < 0:
+            raise ValueError("learning_rate must be positive and l2 non-negative")
+        self._floor = floor
+        self._exploration = exploration
+        self._warmup = warmup
+        self._learning_rate = learning_rate
+        self._l2 = l2
+        self._embedder = embedder or HashingEmbedder(dimension=1024)
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._weights = np.zeros(self._embedder.dimension, dtype=np.float64)
+        self._bias = 0.0
+        self._examples = 0
+        self._stats = PredictorStats()
+        self._path = Path(path) if path else None
+        if self._path is not None and self._path.exists():
+            self._load()
+
+    @classmethod
+    def beside(cls, memory_path: str | Path, **kwargs: float) -> "AcceptancePredictor":
+        """Open the predictor stored next to a memory file (``<memory>.predictor``)."""
+
+        memory_path = Path(memory_path)
+        return cls(memory_path.with_name(memory_path.name + ".predictor"), **kwargs)
+
+    @property
+    def examples(self) -> int:
+        return self._examples
+
+    @property
+    def ready(self) -> bool:
+        return self._examples >= self._warmup
+
+    @property
+    def floor(self) -> float:
+        return self._floor
+
+    @property
+    def stats(self) -> PredictorStats:
+        """A snapshot of the counters."""
+
+        with self._lock:
+            return replace(self._stats)
+
+    def predict(self, texts: Sequence[str]) -> np.ndarray:
+        """Acceptance probabilities for ``texts``."""
+
+        if not texts:
+            return np.zeros(0)
+        features = self._embedder.embed(texts).astype(np.float64)
+        with self._lock:
+            return _sigmoid(features @ self._weights + self._bias)
+
+    def screen(self, texts: Sequence[str]) -> list[float | None]:
+        """Probabilities to pass to :meth:`keep` and :meth:`record`; ``None`` during warmup."""
+
+        if not self.ready:
+            return [None] * len(texts)
+        probabilities = [float(value) for value in self.predict(texts)]
+        with self._lock:
+            self._stats.screened += len(texts)
+        return probabilities
+
+    def keep(self, probability: float | None) -> bool:
+        """Whether a proposal should go to the critic (a random draw for exploration below the floor)."""
+
+        if probability is None or probability >= self._floor:
+            return True
+        with self._lock:
+            explored = self._random.random() < self._exploration
+            if explored:
+                self._stats.explored += 1
+            else:
+                self._stats.skipped += 1
+        return explored
+
+    def record(self, texts: Sequence[str], accepted: Sequence[bool], probabilities: Sequence[float | None]) -> None:
+        """Learn from critic verdicts and score the predictions that were made for them."""
+
+        if not texts:
+            return
+        with self._lock:
+            stats = self._stats
+            for probability, label in zip(probabilities, accepted):
+                if probability is None:
+                    continue
+                if probability >= self._floor:
+                    if label:
+                        stats.true_positives += 1
+                    else:
+                        stats.false_positives += 1
+                elif label:
+                    stats.false_negatives += 1 / self._exploration
+                else:
+                    stats.true_negatives += 1 / self._exploration
+        self.update(texts, accepted)
+
+    def update(self, texts: Sequence[str], accepted: Sequence[bool]) -> None:
+        """One regularised gradient step on a batch of labelled texts."""
+
+        if not texts:
+            return
+        features = self._embedder.embed(texts).astype(np.float64)
+        labels = np.asarray(accepted, dtype=np.float64)
+        with self._lock:
+            errors = _sigmoid(features @ self._weights + self._bias) - labels
+            self._weights -= self._learning_rate * (features.T @ errors / len(texts) + self._l2 * self._weights)
+            self._bias -= self._learning_rate * float(errors.mean())
+            self._examples += len(texts)
+            if self._path is not None:
+                self._save()
+
+    # ------------------------------------------------------------------
+    def _load(self) -> None:
+        assert self._path is not None
+        with np.load(self._path) as data:
+            weights = data["weights"]
+            if weights.shape != self._weights.shape:
+                raise ValueError(
+                    f"Predictor {self._path} has {weights.shape[0]} features; the embedder produces "
+                    f"{self._weights.shape[0]}"
+                )
+            self._weights = weights.astype(np.float64)
+            self._bias = float(data["bias"])
+            self._examples = int(data["examples"])
+
+    def _save(self) -> None:
+        assert self._path is not None
+        tmp_path = self._path.with_name(self._path.name + ".tmp")
+        with tmp_path.open("wb") as handle:
+            np.savez(handle, weights=self._weights, bias=self._bias, examples=self._examples)
+            handle.flush()
+            os.fsync(handle.fileno())
+        tmp_path.replace(self._path)
+
+
+def _sigmoid(values: np.ndarray) -> np.ndarray:
+    return 1.0 / (1.0 + np.exp(-np.clip(values, -30.0, 30.0)))
+
+
+__all__ = ["AcceptancePredictor", "PredictorStats"]
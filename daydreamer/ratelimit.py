@@ -0,0 +1,399 @@
+"""Client-side rate limiting, adaptive concurrency and retries for LLM backends."""
+
+from __future__ import annotations
+
+import asyncio
+import math
+import random
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, replace
+from functools import partial
+from typing import Any, Awaitable, Callable, TypeVar
+
+try:  # pragma: no cover - optional dependency
+    from anthropic import APIConnectionError as _APIConnectionError
+except ImportError:  # pragma: no cover - anthropic not installed
+    _TRANSIENT_ERRORS: tuple[type[BaseException], ...] = (ConnectionError, TimeoutError)
+else:  # pragma: no cover - anthropic installed
+    _TRANSIENT_ERRORS = (ConnectionError, TimeoutError, _APIConnectionError)
+
+_T = TypeVar("_T")
+
+# 429 is a rate limit, 529 means the API is overloaded; both ask the client to slow down.
+THROTTLE_STATUSES = frozenset({429, 529})
+RETRYABLE_STATUSES = THROTTLE_STATUSES | {408, 500, 502, 503, 504}
+
+
+def estimate_tokens(prompt: str, max_tokens: int) -> int:
+    """Rough token cost of a request (four characters per prompt token) for pre-admission."""
+
+    return math.ceil(len(prompt) / 4) + max_tokens
+
+
+# ----------------------------------------------------------------------
+# Token buckets
+# ----------------------------------------------------------------------
+class TokenBucket:
+    """Refills at ``rate_per_minute`` up to ``capacity`` (one minute's worth by default).
+
+    :meth:`reserve` always succeeds and returns how long the caller must wait
+    before proceeding, so waiting callers are served in arrival order and the
+    bucket may go negative; :meth:`adjust` corrects a reservation once the
+    actual cost is known.
+    """
+
+    def __init__(
+        self, rate_per_minute: float, *, capacity: float | None = None, clock: Callable[[], float] = time.monotonic
+    ) -> None:
+        if rate_per_minute <= 0:
+            raise ValueError("rate_per_minute must be positive")
+        self._rate = rate_per_minute / 60
+        self._capacity = capacity if capacity is not None else rate_per_minute
+        if self._capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._level = self._capacity
+        self._updated = clock()
+
+    @property
+    def capacity(self) -> float:
+        return self._capacity
+
+    def reserve(self, amount: float) -> float:
+        """Take ``amount`` and return the seconds until it is actually available."""
+
+        amount = min(amount, self._capacity)  # oversized requests wait for a full bucket
+        with self._lock:
+            self._refill()
+            self._level -= amount
+            return max(0.0, -self._level / self._rate)
+
+    def adjust(self, delta: float) -> None:
+        """Return (positive) or charge (negative) ``delta`` after the fact."""
+
+        with self._lock:
+            self._refill()
+            self._level = min(self._capacity, self._level + delta)
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self._level = min(self._capacity, self._level + (now - self._updated) * self._rate)
+        self._updated = now
+
+
+class RateLimiter:
+    """Requests-per-minute and tokens-per-minute buckets checked together."""
+
+    def __init__(
+        self,
+        *,
+        requests_per_minute: float | None = None,
+        tokens_per_minute: float | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._requests = TokenBucket(requests_per_minute, clock=clock) if requests_per_minute else None
+        self._tokens = TokenBucket(tokens_per_minute, clock=clock) if tokens_per_minute else None
+
+    def reserve(self, tokens: int) -> float:
+        """Reserve one request and ``tokens`` tokens; returns the seconds to wait."""
+
+        delay = 0.0
+        if self._requests is not None:
+            delay = max(delay, self._requests.reserve(1))
+        if self._tokens is not None:
+            delay = max(delay, self._tokens.reserve(tokens))
+        return delay
+
+    def settle(self, estimated: int, actual: int) -> None:
+        """Correct the token reservation once the response reports its usage."""
+
+        if self._tokens is not None and actual != estimated:
+            self._tokens.adjust(estimated - actual)
+
+
+# ----------------------------------------------------------------------
+# Adaptive concurrency
+# ----------------------------------------------------------------------
+class AdaptiveConcurrency:
+    """AIMD limit on in-flight requests.
+
+    Every successful call raises the limit by ``increase / limit`` (about
+    ``increase`` per round of ``limit`` calls); a throttled call multiplies it
+    by ``decrease``. Throttles from calls that started before the last
+    decrease are ignored, so one burst of 429s only backs off once. Both
+    threads (:meth:`acquire`) and coroutines (:meth:`aacquire`) may wait.
+    """
+
+    def __init__(
+        self,
+        *,
+        initial: int = 8,
+        minimum: int = 1,
+        maximum: int = 64,
+        increase: float = 1.0,
+        decrease: float = 0.5,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if not 1 <= minimum <= initial <= maximum:
+            raise ValueError("expected 1 <= minimum <= initial <= maximum")
+        if increase <= 0 or not 0 < decrease < 1:
+            raise ValueError("increase must be positive and decrease between 0 and 1")
+        self._limit = float(initial)
+        self._minimum = minimum
+        self._maximum = maximum
+        self._increase = increase
+        self._decrease = decrease
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._last_decrease = -math.inf
+        self._waiters: deque[Callable[[], None]] = deque()
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def acquire(self) -> float:
+        """Block until a slot is free; returns the start time to pass to :meth:`release`."""
+
+        while True:
+            event = threading.Event()
+            with self._lock:
+                if self._in_flight < int(self._limit):
+                    return self._admit()
+                self._waiters.append(event.set)
+            event.wait()
+
+    async def aacquire(self) -> float:
+        loop = asyncio.get_running_loop()
+        while True:
+            future = loop.create_future()
+            with self._lock:
+                if self._in_flight < int(self._limit):
+                    return self._admit()
+                self._waiters.append(partial(loop.call_soon_threadsafe, _resolve, future))
+            await future
+
+    def release(self, started: float, *, throttled: bool = False) -> None:
+        with self._lock:
+            self._in_flight -= 1
+            if throttled:
+                if started >= self._last_decrease:
+                    self._limit = max(float(self._minimum), self._limit * self._decrease)
+                    self._last_decrease = self._clock()
+            else:
+                self._limit = min(float(self._maximum), self._limit + self._increase / self._limit)
+            waiters, self._waiters = self._waiters, deque()
+        for wake in waiters:  # woken waiters re-check the limit
+            wake()
+
+    def _admit(self) -> float:
+        self._in_flight += 1
+        return self._clock()
+
+
+def _resolve(future: asyncio.Future[None]) -> None:
+    if not future.done():
+        future.set_result(None)
+
+
+# ----------------------------------------------------------------------
+# Retries
+# ----------------------------------------------------------------------
+@dataclass(slots=True)
+class RetryPolicy:
+    """Full-jitter exponential backoff that honours ``retry-after`` headers."""
+
+    max_attempts: int = 6
+    base_delay: float = 0.5
+    max_delay: float = 60.0
+
+    def __post_init__(self) -> None:
+        if self.max_attempts < 1:
+            raise ValueError("max_attempts must be >= 1")
+        if self.base_delay < 0 or self.max_delay < self.base_delay:
+            raise ValueError("expected 0 <= base_delay <= max_delay")
+
+    def delay(self, attempt: int, error: BaseException) -> float:
+        """Seconds to wait before retry number ``attempt`` (1-based) after ``error``."""
+
+        retry_after = retry_after_seconds(error)
+        if retry_after is not None:
+            return min(self.max_delay, retry_after) + random.uniform(0, self.base_delay)
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+
+
+def status_code(error: BaseException) -> int | None:
+    code = getattr(error, "status_code", None)
+    return code if isinstance(code, int) else None
+
+
+def is_retryable(error: BaseException) -> bool:
+    return status_code(error) in RETRYABLE_STATUSES or isinstance(error, _TRANSIENT_ERRORS)
+
+
+def is_throttle(error: BaseException) -> bool:
+    return status_code(error) in THROTTLE_STATUSES
+
+
+def retry_after_seconds(error: BaseException) -> float | None:
+    """The server's requested wait from ``retry-after-ms`` or ``retry-after`` headers."""
+
+    headers: Any = getattr(getattr(error, "response", None), "headers", None) or {}
+    for name, scale in (("retry-after-ms", 1000.0), ("retry-after", 1.0)):
+        value = headers.get(name)
+        if value is None:
+            continue
+        try:
+            return max(0.0, float(value) / scale)
+        except ValueError:
+            continue  # HTTP-date values are rare for this API; fall back to backoff
+    return None
+
+
+# ----------------------------------------------------------------------
+# Throttle
+# ----------------------------------------------------------------------
+@dataclass(slots=True)
+class ThrottleStats:
+    attempts: int = 0
+    retries: int = 0
+    throttled: int = 0
+    failures: int = 0
+    waited: float = 0.0  # seconds spent in rate-limit and backoff sleeps
+
+
+class Throttle:
+    """Runs calls through a :class:`RateLimiter`, :class:`AdaptiveConcurrency` and :class:`RetryPolicy`.
+
+    Each component is optional. A call first waits for its rate reservation,
+    then for a concurrency slot; retryable failures release the slot, back
+    off and try again until ``retry.max_attempts`` is exhausted.
+    """
+
+    def __init__(
+        self,
+        *,
+        limiter: RateLimiter | None = None,
+        concurrency: AdaptiveConcurrency | None = None,
+        retry: RetryPolicy | None = None,
+    ) -> None:
+        self.limiter = limiter
+        self.concurrency = concurrency
+        self.retry = retry
+        self._lock = threading.Lock()
+        self._stats = ThrottleStats()
+
+    @property
+    def stats(self) -> ThrottleStats:
+        with self._lock:
+            return replace(self._stats)
+
+    def call(self, function: Callable[[], _T], *, tokens: int = 0, usage: Callable[[_T], int] | None = None) -> _T:
+        """Run ``function`` (blocking); ``usage`` reports the actual tokens a result consumed."""
+
+        attempt = 1
+        while True:
+            self._sleep(self._reserve(tokens))
+            started = self.concurrency.acquire() if self.concurrency else 0.0
+            try:
+                result = function()
+            except Exception as error:
+                delay = self._failed(started, tokens, attempt, error)
+                self._sleep(delay)
+                attempt += 1
+                continue
+            self._succeeded(started, tokens, result, usage)
+            return result
+
+    async def acall(
+        self, function: Callable[[], Awaitable[_T]], *, tokens: int = 0, usage: Callable[[_T], int] | None = None
+    ) -> _T:
+        """Coroutine form of :meth:`call`; ``function`` returns a fresh awaitable per attempt."""
+
+        attempt = 1
+        while True:
+            await self._asleep(self._reserve(tokens))
+            started = await self.concurrency.aacquire() if self.concurrency else 0.0
+            try:
+                result = await function()
+            except Exception as error:
+                delay = self._failed(started, tokens, attempt, error)
+                await self._asleep(delay)
+                attempt += 1
+                continue
+            self._succeeded(started, tokens, result, usage)
+            return result
+
+    def settle(self, tokens: int, actual: int) -> None:
+        """Correct a call's reservation once its usage is known after it returned (e.g. streams)."""
+
+        if self.limiter:
+            self.limiter.settle(tokens, actual)
+
+    # ------------------------------------------------------------------
+    def _reserve(self, tokens: int) -> float:
+        with self._lock:
+            self._stats.attempts += 1
+        return self.limiter.reserve(tokens) if self.limiter else 0.0
+
+    def _succeeded(self, started: float, tokens: int, result: Any, usage: Callable[[Any], int] | None) -> None:
+        if self.concurrency:
+            self.concurrency.release(started)
+        if self.limiter and usage is not None:
+            self.limiter.settle(tokens, usage(result))
+
+    def _failed(self, started: float, tokens: int, attempt: int, error: Exception) -> float:
+        """Record a failure and return the backoff delay, re-raising when it is final."""
+
+        throttled = is_throttle(error)
+        if self.concurrency:
+            self.concurrency.release(started, throttled=throttled)
+        if self.limiter:
+            self.limiter.settle(tokens, 0)  # the next attempt reserves its tokens again
+        retry = self.retry is not None and attempt < self.retry.max_attempts and is_retryable(error)
+        with self._lock:
+            self._stats.throttled += throttled
+            if not retry:
+                self._stats.failures += 1
+                raise error
+            self._stats.retries += 1
+        return self.retry.delay(attempt, error)  # type: ignore[union-attr]
+
+    def _sleep(self, seconds: float) -> None:
+        if seconds > 0:
+            self._waited(seconds)
+            time.sleep(seconds)
+
+    async def _asleep(self, seconds: float) -> None:
+        if seconds > 0:
+            self._waited(seconds)
+            await asyncio.sleep(seconds)
+
+    def _waited(self, seconds: float) -> None:
+        with self._lock:
+            self._stats.waited += seconds
+
+
+__all__ = [
+    "AdaptiveConcurrency",
+    "RETRYABLE_STATUSES",
+    "RateLimiter",
+    "RetryPolicy",
+    "THROTTLE_STATUSES",
+    "Throttle",
+    "ThrottleStats",
+    "TokenBucket",
+    "estimate_tokens",
+    "is_retryable",
+    "is_throttle",
+    "retry_after_seconds",
+    "status_code",
+]
@@ -0,0 +1,203 @@
+"""Budget-driven pacing of loop iterations."""
+
+from __future__ import annotations
+
+import math
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, List, Sequence, TypeVar
+
+from .costs import IterationCost, StageTotals
+
+_T = TypeVar("_T")
+
+
+@dataclass(frozen=True, slots=True)
+class ScheduleDecision:
+    """What the scheduler chose for the next iteration and why.
+
+    ``delay`` is the number of seconds to wait before it starts. ``budget``
+    names the target that set the pace, e.g. ``"calls/minute"``, or is
+    ``None`` while none applies (before the first measurement, or while
+    only an acceptance target is set and nothing has been accepted yet).
+    When ``paused``, that budget is exhausted and ``delay`` runs to the start
+    of its next window.
+    """
+
+    batch_size: int
+    delay: float
+    budget: str | None
+    paused: bool = False
+
+    def describe(self) -> str:
+        if self.paused:
+            return f"{self.budget} budget exhausted; pausing {self.delay:.0f}s until the next window"
+        paced = "nothing limits the pace yet" if self.budget is None else f"paced by {self.budget}"
+        return f"batch size {self.batch_size}, next iteration in {self.delay:.1f}s ({paced})"
+
+
+class ScheduledIteration(List[_T]):
+    """The results of one scheduled iteration, carrying the :class:`ScheduleDecision` made after it."""
+
+    def __init__(self, results: Sequence[_T], decision: ScheduleDecision) -> None:
+        super().__init__(results)
+        self.decision = decision
+
+
+@dataclass(slots=True)
+class _Window:
+    """Usage of one budget in its current fixed window (aligned to the clock, e.g. whole hours)."""
+
+    name: str
+    limit: float
+    length: float
+    usage: Callable[[IterationCost], float]
+    start: float = 0.0
+    used: float = 0.0
+
+    def roll(self, now: float) -> None:
+        start = now - now % self.length
+        if start != self.start:
+            self.start, self.used = start, 0.0
+
+    @property
+    def end(self) -> float:
+        return self.start + self.length
+
+
+def _calls(iteration: IterationCost) -> float:
+    return sum(stage.calls for stage in iteration.stages.values())
+
+
+def _tokens(iteration: IterationCost) -> float:
+    return sum(_stage_tokens(stage) for stage in iteration.stages.values())
+
+
+def _stage_tokens(stage: StageTotals) -> int:
+    return (
+        stage.input_tokens + stage.output_tokens + stage.cache_creation_input_tokens + stage.cache_read_input_tokens
+    )
+
+
+def _cost(iteration: IterationCost) -> float:
+    return iteration.cost
+
+
+class BudgetScheduler:
+    """Paces :meth:`DaydreamingLoop.run_forever` to stay within budgets and reach an acceptance target.
+
+    Budgets are limits per fixed window aligned to the clock: LLM calls per
+    minute, tokens (input, output and cached) per hour and USD per UTC day.
+    After every iteration :meth:`observe` adds the iteration's ledger totals
+    to each window and updates moving averages of calls, tokens, cost and
+    accepted ideas per concept pair and of the iteration's duration.
+    :meth:`plan` then spreads each budget's remainder evenly over the rest of
+    its window, which gives a sustainable rate of pairs per second. The
+    ``target_accepted_per_hour`` asks for no more pairs than that target
+    needs at the observed acceptance rate. The slowest of these rates wins:
+    the batch size is the number of pairs that rate allows in one iteration's
+    duration (within ``min_batch_size`` and ``max_batch_size``), and the delay
+    fills whatever time is left. Once a budget is used up the loop pauses
+    until its next window starts.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_calls_per_minute: float | None = None,
+        max_tokens_per_hour: float | None = None,
+        max_cost_per_day: float | None = None,
+        target_accepted_per_hour: float | None = None,
+        batch_size: int = 1,
+        min_batch_size: int = 1,
+        max_batch_size: int = 64,
+        smoothing: float = 0.3,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        limits = (max_calls_per_minute, max_tokens_per_hour, max_cost_per_day, target_accepted_per_hour)
+        if all(limit is None for limit in limits):
+            raise ValueError("BudgetScheduler needs at least one budget or target")
+        if any(limit is not None and limit <= 0 for limit in limits):
+            raise ValueError("budgets and targets must be positive")
+        if not 1 <= min_batch_size <= max_batch_size:
+            raise ValueError("batch sizes must satisfy 1 <= min_batch_size <= max_batch_size")
+        if not 0 < smoothing <= 1:
+            raise ValueError("smoothing must be in (0, 1]")
+        self._windows = [
+            _Window(name, limit, length, usage)
+            for name, limit, length, usage in (
+                ("calls/minute", max_calls_per_minute, 60.0, _calls),
+                ("tokens/hour", max_tokens_per_hour, 3600.0, _tokens),
+                ("cost/day", max_cost_per_day, 86400.0, _cost),
+            )
+            if limit is not None
+        ]
+        self._target = target_accepted_per_hour
+        self._batch_size = min(max(batch_size, min_batch_size), max_batch_size)
+        self._min_batch_size = min_batch_size
+        self._max_batch_size = max_batch_size
+        self._smoothing = smoothing
+        self._clock = clock
+        self._lock = threading.Lock()
+        # Moving averages per concept pair (keyed by window name, plus "accepted") and per iteration.
+        self._per_pair: dict[str, float] = {}
+        self._duration: float | None = None
+
+    @property
+    def batch_size(self) -> int:
+        return self._batch_size
+
+    def observe(self, iteration: IterationCost, *, pairs: int, duration: float) -> None:
+        """Account for an iteration that explored ``pairs`` concept pairs in ``duration`` seconds."""
+
+        if pairs < 1:
+            return
+        now = self._clock()
+        with self._lock:
+            samples = {"accepted": iteration.accepted / pairs}
+            for window in self._windows:
+                window.roll(now)
+                used = window.usage(iteration)
+                window.used += used
+                samples[window.name] = used / pairs
+            for name, value in samples.items():
+                previous = self._per_pair.get(name)
+                self._per_pair[name] = value if previous is None else self._average(previous, value)
+            self._duration = duration if self._duration is None else self._average(self._duration, duration)
+
+    def plan(self) -> ScheduleDecision:
+        """Choose the batch size of the next iteration and how long to wait before it."""
+
+        now = self._clock()
+        with self._lock:
+            for window in self._windows:
+                window.roll(now)
+            exhausted = [window for window in self._windows if window.used >= window.limit]
+            if exhausted:
+                window = max(exhausted, key=lambda item: item.end)
+                return ScheduleDecision(self._batch_size, window.end - now, window.name, paused=True)
+            if self._duration is None:
+                return ScheduleDecision(self._batch_size, 0.0, None)
+
+            rates: dict[str, float] = {}  # sustainable concept pairs per second
+            for window in self._windows:
+                per_pair = self._per_pair.get(window.name, 0.0)
+                if per_pair > 0:
+                    rates[window.name] = (window.limit - window.used) / per_pair / max(window.end - now, 1.0)
+            accepted = self._per_pair.get("accepted", 0.0)
+            if self._target is not None and accepted > 0:
+                rates["accepted/hour"] = self._target / 3600 / accepted
+            if not rates:
+                return ScheduleDecision(self._batch_size, 0.0, None)
+            budget, rate = min(rates.items(), key=lambda item: item[1])
+            duration = max(self._duration, 1e-3)
+            batch_size = min(max(math.floor(rate * duration), self._min_batch_size), self._max_batch_size)
+            self._batch_size = batch_size
+            return ScheduleDecision(batch_size, max(batch_size / rate - duration, 0.0), budget)
+
+    def _average(self, previous: float, value: float) -> float:
+        return previous + self._smoothing * (value - previous)
+
+
+__all__ = ["BudgetScheduler", "ScheduleDecision", "ScheduledIteration"]
@@ -0,0 +1,154 @@
+"""Memory-mapped binary snapshots of a columnar memory store."""
+
+from __future__ import annotations
+
+import argparse
+import json
+import mmap
+import struct
+from pathlib import Path
+from typing import BinaryIO
+
+import numpy as np
+
+from .columnar import ColumnarState, ColumnarTimeline
+from .memory import MemoryEntry
+
+_MAGIC = b"DDSNAP01"
+# magic, version, row count, serial count, journal sequence, metadata offset, metadata length
+_HEADER = struct.Struct("<8sIQQQQQ")
+_VERSION = 1
+_ALIGN = 8
+
+
+def is_snapshot(path: str | Path) -> bool:
+    """Whether ``path`` starts with the binary snapshot magic."""
+
+    with Path(path).open("rb") as handle:
+        return handle.read(len(_MAGIC)) == _MAGIC
+
+
+def write_snapshot(handle: BinaryIO, state: ColumnarState, *, sequence: int = 0) -> None:
+    """Serialise ``state`` to ``handle``.
+
+    The file is a fixed header, one 8-byte aligned section per column (plus the
+    serial UUIDs and their sorted order), the UTF-8 text arena that the
+    ``text_offset``/``text_lengths`` columns index into, and a trailing JSON
+    table describing where each section lives.
+    """
+
+    handle.write(b"\0" * _HEADER.size)
+    position = _HEADER.size
+    sections: dict[str, list] = {}
+    arrays = dict(state.columns, serial_uuids=state.serial_uuids, sorted_serials=state.sorted_serials)
+    for name, array in arrays.items():
+        position += _pad(handle, position)
+        data = np.ascontiguousarray(array).astype(array.dtype.newbyteorder("<"), copy=False)
+        sections[name] = [position, data.dtype.str, list(data.shape)]
+        handle.write(data.tobytes())
+        position += data.nbytes
+    position += _pad(handle, position)
+    handle.write(state.arena)
+    arena = [position, len(state.arena)]
+    position += len(state.arena)
+    meta = json.dumps(
+        {
+            "sections": sections,
+            "arena": arena,
+            "kinds": state.kinds,
+            "foreign_ids": {str(serial): entry_id for serial, entry_id in state.foreign_ids.items()},
+        }
+    ).encode("utf-8")
+    handle.write(meta)
+    handle.seek(0)
+    handle.write(
+        _HEADER.pack(
+            _MAGIC,
+            _VERSION,
+            len(state.columns["created_at"]),
+            len(state.serial_uuids),
+            sequence,
+            position,
+            len(meta),
+        )
+    )
+    handle.seek(0, 2)
+
+
+def open_snapshot(path: str | Path) -> tuple[ColumnarTimeline, int]:
+    """Map a snapshot and return a timeline over it plus its journal sequence.
+
+    Only the header and section table are parsed; columns are NumPy views of a
+    copy-on-write mapping and entries are decoded when they are accessed.
+    """
+
+    with Path(path).open("rb") as handle:
+        mapped = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_COPY)
+    magic, version, _, _, sequence, meta_offset, meta_length = _HEADER.unpack_from(mapped, 0)
+    if magic != _MAGIC or version != _VERSION:
+        raise ValueError(f"{path} is not a version {_VERSION} memory snapshot")
+    meta = json.loads(mapped[meta_offset : meta_offset + meta_length])
+    arrays = {}
+    for name, (offset, dtype, shape) in meta["sections"].items():
+        count = int(np.prod(shape, dtype=np.int64))
+        arrays[name] = np.frombuffer(mapped, dtype=dtype, count=count, offset=offset).reshape(shape)
+    arena_offset, arena_length = meta["arena"]
+    state = ColumnarState(
+        columns={name: array for name, array in arrays.items() if name not in ("serial_uuids", "sorted_serials")},
+        serial_uuids=arrays["serial_uuids"],
+        sorted_serials=arrays["sorted_serials"],
+        kinds=meta["kinds"],
+        foreign_ids={int(serial): entry_id for serial, entry_id in meta["foreign_ids"].items()},
+        arena=memoryview(mapped)[arena_offset : arena_offset + arena_length],
+    )
+    return ColumnarTimeline.from_state(state), sequence
+
+
+def json_to_snapshot(source: str | Path, target: str | Path) -> int:
+    """Convert a JSON memory file to a binary snapshot; returns the entry count."""
+
+    raw = json.loads(Path(source).read_text(encoding="utf-8"))
+    sequence = 0
+    if isinstance(raw, dict):
+        sequence = int(raw.get("sequence", 0))
+        raw = raw["entries"]
+    timeline = ColumnarTimeline(MemoryEntry.from_json(item) for item in raw)
+    with Path(target).open("wb") as handle:
+        write_snapshot(handle, timeline.export_state(), sequence=sequence)
+    return len(timeline)
+
+
+def snapshot_to_json(source: str | Path, target: str | Path) -> int:
+    """Convert a binary snapshot back to the JSON memory format; returns the entry count."""
+
+    timeline, sequence = open_snapshot(source)
+    payload: object = [entry.to_json() for entry in timeline]
+    if sequence:
+        payload = {"sequence": sequence, "entries": payload}
+    Path(target).write_text(json.dumps(payload, indent=2, sort_keys=True), encoding="utf-8")
+    return len(timeline)
+
+
+def _pad(handle: BinaryIO, position: int) -> int:
+    padding = -position % _ALIGN
+    handle.write(b"\0" * padding)
+    return padding
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Convert memory files between the JSON and binary snapshot formats")
+    parser.add_argument("direction", choices=("to-binary", "to-json"))
+    parser.add_argument("source", type=Path)
+    parser.add_argument("target", type=Path)
+    args = parser.parse_args(argv)
+    convert = json_to_snapshot if args.direction == "to-binary" else snapshot_to_json
+    count = convert(args.source, args.target)
+    print(f"Wrote {count} entries to {args.target}")
+    return 0
+
+
+__all__ = ["is_snapshot", "json_to_snapshot", "open_snapshot", "snapshot_to_json", "write_snapshot"]
+
+
+if __name__ == "__main__":  # pragma: no cover - manual conversion entry point
+    raise SystemExit(main())
@@ -0,0 +1,227 @@
+"""SQLite-backed memory store for very large knowledge bases."""
+
+from __future__ import annotations
+
+import json
+import random
+import sqlite3
+import threading
+import uuid
+from pathlib import Path
+from typing import Any, Iterable, Iterator, Sequence
+
+from .dedup import NearDuplicateIndex
+from .memory import _MAX_SAMPLING_ROUNDS, MemoryEntry
+from .pairs import ExploredPairRegistry, PairCoverage
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    rowid INTEGER PRIMARY KEY,
+    id TEXT NOT NULL UNIQUE,
+    content TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    metadata TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_entries_created_at ON entries(created_at);
+CREATE INDEX IF NOT EXISTS idx_entries_kind ON entries(kind);
+"""
+
+_COLUMNS = "id, content, kind, created_at, metadata"
+
+
+class SQLiteMemoryStore:
+    """Drop-in alternative to :class:`~daydreamer.memory.MemoryStore` backed by SQLite.
+
+    Nothing is loaded eagerly: opening the database only reads the row count,
+    recency queries walk the ``created_at`` index and sampling probes random
+    rowids, so the cost of each call is independent of the store size.
+    """
+
+    def __init__(
+        self,
+        path: str | Path = ":memory:",
+        *,
+        pair_registry: ExploredPairRegistry | None = None,
+        deduplicator: NearDuplicateIndex | None = None,
+    ) -> None:
+        self._path = str(path)
+        self._pair_registry = pair_registry
+        self._deduplicator = deduplicator
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(self._path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._count = self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+        if deduplicator is not None:
+            self._sync_deduplicator()
+
+    # ------------------------------------------------------------------
+    # Basic operations
+    # ------------------------------------------------------------------
+    def __len__(self) -> int:
+        return self._count
+
+    def __iter__(self) -> Iterator[MemoryEntry]:
+        last_rowid = 0
+        while True:
+            with self._lock:
+                rows = self._conn.execute(
+                    f"SELECT rowid, {_COLUMNS} FROM entries WHERE rowid > ? ORDER BY rowid LIMIT 512",
+                    (last_rowid,),
+                ).fetchall()
+            if not rows:
+                return
+            last_rowid = rows[-1][0]
+            for row in rows:
+                yield self._to_entry(row[1:])
+
+    def add_entry(self, content: str, *, kind: str = "concept", metadata: dict[str, Any] | None = None) -> MemoryEntry:
+        entry = MemoryEntry(id=str(uuid.uuid4()), content=content, kind=kind, metadata=metadata or {})
+        self.add_entries([entry])
+        return entry
+
+    def add_entries(self, entries: Iterable[MemoryEntry]) -> None:
+        rows = [self._to_row(entry) for entry in entries]
+        with self._lock, self._conn:
+            self._conn.executemany(f"INSERT INTO entries ({_COLUMNS}) VALUES (?, ?, ?, ?, ?)", rows)
+            self._count += len(rows)
+        if self._deduplicator is not None:
+            for entry_id, content, kind, *_ in rows:
+                if kind == "idea":
+                    self._deduplicator.add(entry_id, content)
+
+    def get(self, entry_id: str) -> MemoryEntry | None:
+        with self._lock:
+            row = self._conn.execute(f"SELECT {_COLUMNS} FROM entries WHERE id = ?", (entry_id,)).fetchone()
+        return self._to_entry(row) if row else None
+
+    def get_recent(self, n: int) -> Sequence[MemoryEntry]:
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {_COLUMNS} FROM entries ORDER BY created_at DESC LIMIT ?", (max(0, n),)
+            ).fetchall()
+        return [self._to_entry(row) for row in rows]
+
+    def prune(self, max_items: int) -> None:
+        with self._lock:
+            if max_items < 0:
+                raise ValueError("max_items must be non-negative")
+            excess = self._count - max_items
+            if excess <= 0:
+                return
+            with self._conn:
+                removed = self._conn.execute(
+                    "DELETE FROM entries WHERE rowid IN "
+                    "(SELECT rowid FROM entries ORDER BY created_at ASC LIMIT ?) RETURNING id",
+                    (excess,),
+                ).fetchall()
+                self._count -= len(removed)
+            if self._deduplicator is not None:
+                self._deduplicator.remove(row[0] for row in removed)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+        if self._pair_registry is not None:
+            self._pair_registry.close()
+
+    # ------------------------------------------------------------------
+    # Sampling utilities
+    # ------------------------------------------------------------------
+    def sample_pairs(self, k: int) -> list[tuple[MemoryEntry, MemoryEntry]]:
+        """Sample up to ``k`` disjoint pairs by probing random rowids.
+
+        Gaps left by pruning make entries that follow a gap slightly more
+        likely to be drawn; in exchange each probe is a single index lookup.
+        Like :meth:`MemoryStore.sample_pairs`, explored pairs are redrawn for
+        a bounded number of rounds.
+        """
+
+        if k < 1:
+            raise ValueError("k must be >= 1")
+
+        with self._lock:
+            if self._count < 2:
+                return []
+            # Separate sub-selects let SQLite answer both bounds from the rowid b-tree.
+            low, high = self._conn.execute(
+                "SELECT (SELECT MIN(rowid) FROM entries), (SELECT MAX(rowid) FROM entries)"
+            ).fetchone()
+            pairs: list[tuple[MemoryEntry, MemoryEntry]] = []
+            used: set[int] = set()
+            # Without a registry every drawn pair is usable and one round suffices.
+            rounds = _MAX_SAMPLING_ROUNDS if self._pair_registry is not None else 1
+            for _ in range(rounds):
+                candidates = self._draw_pairs(k - len(pairs), low, high, used)
+                for (left_rowid, left), (right_rowid, right) in candidates:
+                    if self.is_explored(left, right):
+                        continue
+                    used.update((left_rowid, right_rowid))
+                    pairs.append((left, right))
+                if len(pairs) >= k or not candidates:
+                    break
+        return pairs
+
+    def _draw_pairs(
+        self, count: int, low: int, high: int, used: set[int]
+    ) -> list[tuple[tuple[int, MemoryEntry], tuple[int, MemoryEntry]]]:
+        """Draw up to ``count`` candidate pairs of (rowid, entry) outside ``used``. Lock must be held."""
+
+        wanted = min(2 * count, self._count - len(used))
+        wanted -= wanted % 2
+        chosen: dict[int, MemoryEntry] = {}
+        attempts = 0
+        while len(chosen) < wanted and attempts < wanted * 8:
+            attempts += 1
+            row = self._conn.execute(
+                f"SELECT rowid, {_COLUMNS} FROM entries WHERE rowid >= ? ORDER BY rowid LIMIT 1",
+                (random.randint(low, high),),
+            ).fetchone()
+            if row[0] not in chosen and row[0] not in used:
+                chosen[row[0]] = self._to_entry(row[1:])
+        entries = list(chosen.items())
+        return [(entries[idx], entries[idx + 1]) for idx in range(0, len(entries) - 1, 2)]
+
+    def find_near_duplicate(self, text: str) -> str | None:
+        if self._deduplicator is None:
+            return None
+        return self._deduplicator.find_duplicate(text)
+
+    def mark_explored(self, concept_a: MemoryEntry, concept_b: MemoryEntry) -> None:
+        if self._pair_registry is not None:
+            self._pair_registry.add(concept_a.id, concept_b.id)
+
+    def is_explored(self, concept_a: MemoryEntry, concept_b: MemoryEntry) -> bool:
+        return self._pair_registry is not None and (concept_a.id, concept_b.id) in self._pair_registry
+
+    def pair_coverage(self) -> PairCoverage | None:
+        if self._pair_registry is None:
+            return None
+        return self._pair_registry.coverage(self._count)
+
+    def _sync_deduplicator(self) -> None:
+        """Reconcile the persisted LSH index with the stored ideas (ids only)."""
+
+        ideas = {row[0] for row in self._conn.execute("SELECT id FROM entries WHERE kind = 'idea'")}
+        indexed = self._deduplicator.ids()
+        self._deduplicator.remove(indexed - ideas)
+        for entry_id in ideas - indexed:
+            entry = self.get(entry_id)
+            self._deduplicator.add(entry.id, entry.content)
+
+    # ------------------------------------------------------------------
+    # Row conversion helpers
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _to_row(entry: MemoryEntry) -> tuple[str, str, str, float, str]:
+        return (entry.id, entry.content, entry.kind, entry.created_at, json.dumps(entry.metadata, sort_keys=True))
+
+    @staticmethod
+    def _to_entry(row: Sequence[Any]) -> MemoryEntry:
+        entry_id, content, kind, created_at, metadata = row
+        return MemoryEntry(id=entry_id, content=content, kind=kind, created_at=created_at, metadata=json.loads(metadata))
+
+
+__all__ = ["SQLiteMemoryStore"]
@@ -0,0 +1,103 @@
+"""Time-ordered entry container backing :class:`~daydreamer.memory.MemoryStore`."""
+
+from __future__ import annotations
+
+import heapq
+from collections import Counter
+from bisect import bisect_right, insort
+from typing import TYPE_CHECKING, Iterable, Iterator
+
+if TYPE_CHECKING:  # pragma: no cover - memory imports this module
+    from .memory import MemoryEntry
+
+# Dropped slots at the front are reclaimed once they exceed this many and half the list.
+_MIN_RECLAIM = 1024
+
+
+def _created_at(entry: MemoryEntry) -> float:
+    return entry.created_at
+
+
+class Timeline:
+    """Entries kept sorted by ``created_at`` (oldest first).
+
+    The structure is append-mostly: entries that arrive in time order are
+    appended in O(1), out-of-order batches are merged into the affected tail
+    only, and the oldest entries are dropped by advancing a head offset, so
+    ``newest(n)`` costs O(n) and ``pop_oldest(m)`` costs amortised O(m). Ties
+    keep insertion order.
+    """
+
+    def __init__(self, entries: Iterable[MemoryEntry] = ()) -> None:
+        self._items: list[MemoryEntry] = sorted(entries, key=_created_at)
+        self._head = 0
+
+    def __len__(self) -> int:
+        return len(self._items) - self._head
+
+    def __iter__(self) -> Iterator[MemoryEntry]:
+        return iter(self._items[self._head :])
+
+    def __getitem__(self, index: int) -> MemoryEntry:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("timeline index out of range")
+        return self._items[self._head + index]
+
+    def kind_at(self, index: int) -> str:
+        return self[index].kind
+
+    def kind_counts(self) -> Counter[str]:
+        return Counter(entry.kind for entry in self._items[self._head :])
+
+    def append(self, entry: MemoryEntry) -> None:
+        if len(self._items) == self._head or self._items[-1].created_at <= entry.created_at:
+            self._items.append(entry)
+        else:
+            insort(self._items, entry, lo=self._head, key=_created_at)
+
+    def extend(self, entries: Iterable[MemoryEntry]) -> None:
+        batch = sorted(entries, key=_created_at)
+        if not batch:
+            return
+        if len(self._items) == self._head or self._items[-1].created_at <= batch[0].created_at:
+            self._items.extend(batch)
+            return
+        position = bisect_right(self._items, batch[0].created_at, lo=self._head, key=_created_at)
+        tail = self._items[position:]
+        del self._items[position:]
+        self._items.extend(heapq.merge(tail, batch, key=_created_at))
+
+    def newest(self, n: int) -> list[MemoryEntry]:
+        """Return up to ``n`` entries, newest first."""
+
+        if n <= 0:
+            return []
+        start = max(self._head, len(self._items) - n)
+        return self._items[start:][::-1]
+
+    def pop_oldest(self, count: int) -> list[MemoryEntry]:
+        """Remove and return the ``count`` oldest entries."""
+
+        count = max(0, min(count, len(self)))
+        dropped = self._items[self._head : self._head + count]
+        self._head += count
+        if self._head >= _MIN_RECLAIM and self._head * 2 >= len(self._items):
+            del self._items[: self._head]
+            self._head = 0
+        return dropped
+
+    def remove(self, entry_ids: set[str]) -> list[MemoryEntry]:
+        """Remove entries by id in one O(n) pass; returns the removed entries."""
+
+        kept: list[MemoryEntry] = []
+        removed: list[MemoryEntry] = []
+        for entry in self._items[self._head :]:
+            (removed if entry.id in entry_ids else kept).append(entry)
+        self._items = kept
+        self._head = 0
+        return removed
+
+
+__all__ = ["Timeline"]
@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import itertools
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from daydreamer import DaydreamConfig, DaydreamingLoop, IdeaCritic, IdeaGenerator, MemoryStore, MockLLM
+from daydreamer.batch import BatchCheckpoint, MessageBatchRunner
+
+
+def _prompt(request: dict) -> str:
+    return "".join(block["text"] for block in request["params"]["messages"][0]["content"])
+
+
+class Interrupted(Exception):
+    pass
+
+
+class FakeBatches:
+    """Stand-in for ``client.messages.batches`` that ends each batch after a few polls."""
+
+    def __init__(self, *, polls_until_done: int = 2) -> None:
+        self.polls_until_done = polls_until_done
+        self.created: list[list[dict]] = []
+        self.polls: dict[str, int] = {}
+        self.interrupt_next_poll = False
+        self._ids = itertools.count(1)
+        self._results: dict[str, list] = {}
+
+    def create(self, *, requests):
+        batch_id = f"msgbatch_{next(self._ids)}"
+        self.created.append(requests)
+        self.polls[batch_id] = 0
+        self._results[batch_id] = [self._answer(request) for request in requests]
+        return SimpleNamespace(id=batch_id, processing_status="in_progress")
+
+    def retrieve(self, batch_id):
+        if self.interrupt_next_poll:
+            self.interrupt_next_poll = False
+            raise Interrupted
+        self.polls[batch_id] += 1
+        status = "ended" if self.polls[batch_id] >= self.polls_until_done else "in_progress"
+        return SimpleNamespace(id=batch_id, processing_status=status)
+
+    def results(self, batch_id):
+        return iter(self._results[batch_id])
+
+    @staticmethod
+    def _answer(request):
+        prompt = _prompt(request)
+        if "Evaluate the following hypothesis" in prompt:
+            good = "strong" in prompt
+            text = json.dumps({"novelty": 9 if good else 2, "coherence": 8, "usefulness": 7, "justification": "ok"})
+        elif "errored" in prompt:
+            return SimpleNamespace(custom_id=request["custom_id"], result=SimpleNamespace(type="errored"))
+        else:
+            concepts = [line.split(": ", 1)[1] for line in prompt.splitlines() if line.startswith("Concept ")]
+            text = " + ".join(sorted(concepts))
+        message = SimpleNamespace(content=[SimpleNamespace(type="text", text=text)])
+        return SimpleNamespace(custom_id=request["custom_id"], result=SimpleNamespace(type="succeeded", message=message))
+
+
+def test_batched_iteration_resumes_from_checkpoint(tmp_path) -> None:
+    memory = MemoryStore()
+    for name in ("strong a", "strong b", "weak c", "weak d", "errored e", "errored f"):
+        memory.add_entry(name)
+    batches = FakeBatches()
+    runner = MessageBatchRunner(SimpleNamespace(messages=SimpleNamespace(batches=batches)), poll_interval=0)
+    checkpoint = BatchCheckpoint.beside(tmp_path / "memory.json")
+    loop = DaydreamingLoop(
+        config=DaydreamConfig(batch_size=3),
+        memory=memory,
+        generator=IdeaGenerator(MockLLM()),
+        critic=IdeaCritic(MockLLM()),
+    )
+
+    batches.interrupt_next_poll = True
+    with pytest.raises(Interrupted):
+        loop.run_batched_iteration(runner, checkpoint)
+    assert checkpoint.path.exists() and len(batches.created) == 1
+
+    results = loop.run_batched_iteration(runner, checkpoint)  # resumes polling the generator batch
+    assert len(batches.created) == 2  # generator + critic, nothing resubmitted
+    assert not checkpoint.path.exists()
+    failed = sum("errored" in _prompt(request) for request in batches.created[0])
+    proposals = [result.proposal.text for result in results]
+    assert len(proposals) == len(batches.created[1]) == 3 - failed
+    accepted = {result.proposal.text for result in results if result.accepted}
+    assert accepted == {text for text in proposals if "strong" in text}
+    assert len(memory) == 6 + len(accepted)
+
+
+def test_batched_iteration_does_not_rewrite_ideas_after_a_crash_mid_write(tmp_path, monkeypatch) -> None:
+    memory = MemoryStore()
+    for name in ("strong a", "strong b"):
+        memory.add_entry(name)
+    runner = MessageBatchRunner(SimpleNamespace(messages=SimpleNamespace(batches=FakeBatches())), poll_interval=0)
+    checkpoint = BatchCheckpoint.beside(tmp_path / "memory.json")
+    loop = DaydreamingLoop(
+        config=DaydreamConfig(batch_size=1, max_history=100),
+        memory=memory,
+        generator=IdeaGenerator(MockLLM()),
+        critic=IdeaCritic(MockLLM()),
+    )
+
+    def crash(max_items: int) -> None:
+        raise Interrupted
+
+    monkeypatch.setattr(memory, "prune", crash)
+    with pytest.raises(Interrupted):
+        loop.run_batched_iteration(runner, checkpoint)  # the idea is written, the checkpoint is not cleared
+    assert len(memory) == 3 and checkpoint.path.exists()
+    monkeypatch.undo()
+
+    results = loop.run_batched_iteration(runner, checkpoint)
+    assert [result.accepted for result in results] == [True]
+    assert len(memory) == 3
+    assert not checkpoint.path.exists()
@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import logging
+
+from daydreamer import CachingLLM, CostLedger, IdeaCritic, MockLLM
+from daydreamer.llm import LLMClient, LLMRequest, LLMResponse, TokenUsage
+
+
+class CountingLLM(LLMClient):
+    def __init__(self, model: str = "model-a") -> None:
+        self.model = model
+        self.calls = 0
+
+    @property
+    def cache_identity(self) -> dict[str, str]:
+        return {"model": self.model}
+
+    def generate(self, request: LLMRequest) -> LLMResponse:
+        self.calls += 1
+        return LLMResponse(text=f'{{"novelty": 7, "coherence": 6, "usefulness": 5, "justification": "{self.calls}"}}')
+
+
+def test_cache_tiers_survive_restart_and_respect_temperature(tmp_path) -> None:
+    path = tmp_path / "memory.json"
+    inner = CountingLLM()
+    cache = CachingLLM.beside(path, inner, capacity=1)
+    critic = IdeaCritic(cache)
+
+    first = critic.score("idea one")
+    critic.score("idea two")
+    assert critic.score("idea one") == first  # evicted from the LRU, served from disk
+    assert inner.calls == 2
+    cache.generate(LLMRequest(prompt="creative", temperature=0.9))
+    cache.generate(LLMRequest(prompt="creative", temperature=0.9))
+    assert inner.calls == 4
+    stats = cache.stats
+    assert (stats.memory_hits, stats.disk_hits, stats.misses, stats.bypassed) == (0, 1, 2, 2)
+    assert stats.hit_bytes > 0 and stats.stored_bytes > stats.hit_bytes
+    cache.close()
+
+    restarted = CachingLLM.beside(path, inner)
+    assert IdeaCritic(restarted).score("idea two").justification == "2"
+    assert inner.calls == 4
+    assert restarted.stats.disk_hits == 1
+
+    other_model = CachingLLM.beside(path, CountingLLM("model-b"))
+    IdeaCritic(other_model).score("idea two")
+    assert other_model.stats.misses == 1
+
+
+def test_cache_hits_are_free_and_not_counted_as_calls(caplog) -> None:
+    cache = CachingLLM(CountingLLM(model="claude-3-haiku-20240307"))
+    ledger = CostLedger()
+    ledger.begin_iteration()
+    request = LLMRequest(prompt="score this", temperature=0.2)
+    ledger.record("critic", cache.generate(request))
+    hit = cache.generate(request)
+
+    assert hit.cached and hit.model == "claude-3-haiku-20240307" and hit.usage == TokenUsage()
+    caplog.clear()  # the uncached response reports no model
+    with caplog.at_level(logging.WARNING):
+        ledger.record("critic", hit)
+    assert "No price" not in caplog.text
+    stage = ledger.stages["critic"]
+    assert (stage.calls, stage.cached, stage.items) == (1, 1, 2)
+    assert ledger.iterations[-1].stages["critic"].calls == 1
+
+
+def test_streams_closed_early_are_not_cached() -> None:
+    cache = CachingLLM(MockLLM())
+    request = LLMRequest(prompt="stream me", temperature=0.0)
+
+    with cache.generate_stream(request) as stream:
+        next(stream)
+    assert stream.response.stop_reason == "cancelled"
+    assert cache.stats.stored_bytes == 0
+
+    full = cache.generate_stream(request).response
+    assert cache.generate_stream(request).response.text == full.text
+    assert cache.stats.memory_hits == 1
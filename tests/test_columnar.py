@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import uuid
+
+from daydreamer import MemoryEntry, MemoryStore
+
+
+def _idea(idx: int, sources: tuple[str, str]) -> MemoryEntry:
+    return MemoryEntry(
+        id=f"idea-{idx}",
+        content=f"Idea {idx} — blends replay with markets",
+        kind="idea",
+        created_at=float(idx),
+        metadata={
+            "sources": sources,
+            "scores": {"novelty": 7.5, "coherence": 6.3, "usefulness": 5.0},
+            "justification": "Promising synthesis",
+        },
+    )
+
+
+def test_columnar_store_round_trips_entries_and_metadata(tmp_path) -> None:
+    path = tmp_path / "memory.json"
+    store = MemoryStore(persistence_path=path, storage="columnar")
+    seed = store.add_entry("Default mode network", kind="concept", metadata={"seed": True})
+    other = store.add_entry("Combinatorial innovation", kind="concept", metadata={"seed": True})
+    idea = store.add_entry(
+        "Dreams as combinatorial search",
+        kind="idea",
+        metadata={"sources": (seed.id, other.id), "scores": {"novelty": 8.1, "coherence": 6.3, "usefulness": 5.5}},
+    )
+
+    reopened = MemoryStore(persistence_path=path, storage="columnar")
+    assert [entry.id for entry in reopened] == [seed.id, other.id, idea.id]
+    stored = reopened.get_recent(1)[0]
+    assert stored.content == "Dreams as combinatorial search"
+    assert stored.metadata == {
+        "sources": (seed.id, other.id),
+        "scores": {"novelty": 8.1, "coherence": 6.3, "usefulness": 5.5},
+    }
+    assert reopened.get_recent(3)[2].metadata == {"seed": True}
+
+
+def test_columnar_store_orders_prunes_and_keeps_dangling_sources() -> None:
+    store = MemoryStore(storage="columnar")
+    store.add_entries([MemoryEntry(id="c-0", content="concept", created_at=0.0), _idea(4, ("c-0", "missing"))])
+    store.add_entries([_idea(2, ("c-0", "idea-4")), _idea(3, ("idea-2", "c-0"))])
+
+    assert [entry.id for entry in store] == ["c-0", "idea-2", "idea-3", "idea-4"]
+    store.prune(2)
+    assert [entry.id for entry in store.get_recent(5)] == ["idea-4", "idea-3"]
+    assert store.get_recent(1)[0].metadata["sources"] == ("c-0", "missing")
+    assert store.get_recent(2)[1].metadata["justification"] == "Promising synthesis"
+    assert len(store.sample_pairs(1, kind_weights={"idea": 1.0})) == 1
+
+
+def test_columnar_timeline_resolves_ids_after_lookup_rebuild() -> None:
+    from daydreamer.columnar import ColumnarTimeline
+
+    concepts = [
+        MemoryEntry(id=str(uuid.uuid4()), content=f"concept {idx}", created_at=float(idx)) for idx in range(3000)
+    ]
+    timeline = ColumnarTimeline(concepts)
+    timeline.extend([_idea(5000, (concepts[0].id, concepts[2999].id))])
+
+    assert timeline.newest(1)[0].metadata["sources"] == (concepts[0].id, concepts[2999].id)
+    removed = timeline.remove({concepts[1].id, concepts[2998].id, "unknown"})
+    assert sorted(entry.content for entry in removed) == ["concept 1", "concept 2998"]
+    assert len(timeline) == 2999
+    assert timeline[0].id == concepts[0].id
+
+
+def test_columnar_timeline_reclaims_serials_of_dropped_rows() -> None:
+    from daydreamer.columnar import ColumnarTimeline
+
+    timeline = ColumnarTimeline()
+    for idx in range(5000):
+        sources = ("outside", f"idea-{idx - 1}") if idx else ("outside", "outside")
+        timeline.append(_idea(idx, sources))
+        timeline.pop_oldest(len(timeline) - 100)
+
+    assert timeline._serial_count <= 2 * (100 + 1024)
+    assert timeline.newest(1)[0].metadata["sources"] == ("outside", "idea-4998")
+    assert timeline[0].metadata["sources"] == ("outside", "idea-4899")
+    assert [entry.id for entry in timeline.remove({"idea-4950", "idea-4999"})] == ["idea-4950", "idea-4999"]
+
+    state = timeline.export_state()
+    # The 98 live rows plus the ids they cite but no longer hold: "outside", idea-4899 and the removed idea-4950.
+    assert len(state.serial_uuids) == 101
+    ids = {entry.id for entry in timeline}
+    assert set(state.foreign_ids.values()) == ids | {"outside", "idea-4899", "idea-4950"}
+    reopened = ColumnarTimeline.from_state(state)
+    assert [entry.to_json() for entry in reopened] == [entry.to_json() for entry in timeline]
@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+import json
+
+import pytest
+
+from daydreamer import CostLedger, DaydreamConfig, DaydreamingLoop, IdeaCritic, IdeaGenerator, MemoryStore, ModelPrice
+from daydreamer.llm import LLMClient, LLMRequest, LLMResponse, TokenUsage
+
+
+class MeteredLLM(LLMClient):
+    def __init__(self) -> None:
+        self.ideas = 0
+
+    def generate(self, request: LLMRequest) -> LLMResponse:
+        if "Evaluate the following hypothesis" in request.prompt:
+            self.ideas += 1
+            good = self.ideas % 2 == 1
+            text = json.dumps({"novelty": 9 if good else 1, "coherence": 9, "usefulness": 9})
+            usage = TokenUsage(input_tokens=100, output_tokens=20, cache_read_input_tokens=1000)
+            return LLMResponse(text, usage, "end_turn", "critic-model-2", time_to_first_byte=0.2, latency=0.3)
+        usage = TokenUsage(input_tokens=200, output_tokens=400)
+        return LLMResponse("An idea", usage, "max_tokens", "generator-model-1", time_to_first_byte=1.0, latency=1.5)
+
+
+def test_ledger_tracks_stages_iterations_and_cost_per_idea() -> None:
+    memory = MemoryStore()
+    for idx in range(8):
+        memory.add_entry(f"concept {idx}")
+    prices = {"generator-model": ModelPrice(input=3.0, output=15.0), "critic-model": ModelPrice(input=1.0, output=5.0)}
+    ledger = CostLedger(prices)
+    llm = MeteredLLM()
+    config = DaydreamConfig(batch_size=2, novelty_threshold=5.0, coherence_threshold=5.0, usefulness_threshold=5.0)
+    loop = DaydreamingLoop(config=config, memory=memory, generator=IdeaGenerator(llm), critic=IdeaCritic(llm), ledger=ledger)
+
+    loop.run_iteration()
+    loop.run_iteration()
+
+    generator, critic = ledger.stages["generator"], ledger.stages["critic"]
+    assert (generator.calls, generator.input_tokens, generator.output_tokens) == (4, 800, 1600)
+    assert generator.stop_reasons == {"max_tokens": 4}
+    assert generator.mean_latency == pytest.approx(1.5) and generator.mean_time_to_first_byte == pytest.approx(1.0)
+    generator_call = (200 * 3.0 + 400 * 15.0) / 1e6
+    critic_call = (100 * 1.0 + 20 * 5.0 + 1000 * 0.1) / 1e6  # cache reads at a tenth of the input price
+    assert generator.cost == pytest.approx(4 * generator_call)
+    assert critic.cost == pytest.approx(4 * critic_call)
+    assert [iteration.accepted for iteration in ledger.iterations] == [1, 1]
+    assert ledger.iterations[0].cost == pytest.approx(2 * (generator_call + critic_call))
+    assert ledger.cost_per_accepted_idea == pytest.approx(4 * (generator_call + critic_call) / 2)
+    assert "per idea" in ledger.summary()
@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import json
+import re
+
+from daydreamer import DaydreamConfig, DaydreamingLoop, IdeaCritic, IdeaGenerator, MemoryStore
+from daydreamer.llm import LLMClient, LLMRequest, LLMResponse
+
+_AVERAGES = {"alpha": 9.0, "beta": 5.0, "gamma": 3.0, "delta": 7.0}
+
+
+def _scores(value: float, **extra) -> dict:
+    return {"novelty": value, "coherence": value, "usefulness": value, "justification": "ok", **extra}
+
+
+class RubricLLM(LLMClient):
+    """Scores ideas by their first word; batches are answered out of order, partially and truncated."""
+
+    def __init__(self, *, mangle: bool = False) -> None:
+        self.mangle = mangle
+        self.prompts: list[str] = []
+
+    def generate(self, request: LLMRequest) -> LLMResponse:
+        self.prompts.append(request.prompt)
+        hypotheses = re.findall(r'<hypothesis id="(H\d+)">\n(\w+)', request.prompt)
+        if not hypotheses:
+            idea = next(word for word in _AVERAGES if word in request.prompt.split("Hypothesis:")[-1])
+            return LLMResponse(text=json.dumps(_scores(_AVERAGES[idea])))
+        items = [_scores(_AVERAGES[word], id=hid) for hid, word in hypotheses]
+        if not self.mangle:
+            return LLMResponse(text=json.dumps(items[::-1]))
+        by_id = {item["id"]: item for item in items}
+        text = json.dumps([by_id["H3"], {**by_id["H1"], "id": "h1"}, _scores(1.0, id="H9"), _scores(0.0, id="H1")])
+        text = text[:-1] + ", " + json.dumps({**by_id["H4"], "novelty": "high"}) + ', {"id": "H2", "novelty": 5'
+        return LLMResponse(text=f"Here are the scores:\n{text}")
+
+
+class SequenceLLM(LLMClient):
+    def __init__(self, texts: list[str]) -> None:
+        self.texts = iter(texts)
+
+    def generate(self, request: LLMRequest) -> LLMResponse:
+        pairs = re.findall(r'<pair id="(P\d+)">', request.prompt)
+        if not pairs:
+            return LLMResponse(text=next(self.texts))
+        return LLMResponse(text="".join(f'<synthesis id="{pid}">{next(self.texts)}</synthesis>' for pid in pairs))
+
+
+def test_score_batch_maps_ids_and_rescores_missing_items() -> None:
+    llm = RubricLLM(mangle=True)
+    critic = IdeaCritic(llm)
+    ideas = ["alpha idea", "beta idea", "gamma idea", "delta idea"]
+
+    scores = critic.score_batch(ideas)
+    assert [score.average for score in scores] == [9.0, 5.0, 3.0, 7.0]
+    assert len(llm.prompts) == 3  # one batch, then beta (truncated) and delta (unreadable) on their own
+    assert "Evaluate each of the following hypotheses" in llm.prompts[0]
+    assert "beta idea" in llm.prompts[1] and "delta idea" in llm.prompts[2]
+    assert scores[0].response is scores[2].response
+    assert scores[1].response is not scores[0].response
+
+
+def test_parse_batch_skips_items_with_missing_or_non_numeric_scores() -> None:
+    partial = {"id": "H1", "novelty": 8, "coherence": 7, "justification": "no usefulness"}
+    text = json.dumps([partial, _scores(6.0, id="H2", usefulness=None), _scores(4.0, id="H3")])
+    critic = IdeaCritic(SequenceLLM([text, json.dumps(_scores(9.0)), json.dumps(_scores(5.0))]), stream=False)
+
+    assert list(critic.parse_batch(LLMResponse(text=text), 3)) == [2]
+    scores = critic.score_batch(["alpha idea", "beta idea", "gamma idea"])  # H1 and H2 are re-scored alone
+    assert [score.average for score in scores] == [9.0, 5.0, 4.0]
+
+
+def test_loop_scores_a_batch_with_one_critic_call() -> None:
+    memory = MemoryStore()
+    for concept in ("sleep", "compilers", "markets", "mycelium", "tides", "origami", "jazz", "glaciers"):
+        memory.add_entry(concept, kind="concept")
+    critic_llm = RubricLLM()
+    generator_llm = SequenceLLM([f"{word} idea" for word in _AVERAGES])
+    config = DaydreamConfig(batch_size=4, novelty_threshold=6.0, coherence_threshold=6.0, usefulness_threshold=6.0)
+    loop = DaydreamingLoop(
+        config=config, memory=memory, generator=IdeaGenerator(generator_llm), critic=IdeaCritic(critic_llm)
+    )
+
+    results = loop.run_iteration()
+    assert [result.accepted for result in results] == [True, False, False, True]
+    assert len(critic_llm.prompts) == 1
+    critic = loop.ledger.stages["critic"]
+    assert (critic.calls, critic.items) == (1, 4)
@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+from daydreamer import DaydreamConfig, DaydreamingLoop, IdeaCritic, IdeaGenerator, MemoryStore, NearDuplicateIndex
+
+from test_loop import FixedLLM
+
+IDEA = "Fuse sleep-inspired consolidation with online fine-tuning to enable continual self-improvement."
+
+
+def test_index_detects_restatements_and_persists(tmp_path) -> None:
+    index = NearDuplicateIndex.beside(tmp_path / "memory.json")
+    index.add("idea-1", IDEA)
+    index.add("idea-2", "Price discovery in markets mirrors attention routing in transformers.")
+
+    assert index.find_duplicate(IDEA.replace("Fuse", "Combine")) == "idea-1"
+    assert index.find_duplicate("Diffusion models as dream incubation engines.") is None
+
+    index.remove(["idea-1"])
+    reopened = NearDuplicateIndex.beside(tmp_path / "memory.json")
+    assert reopened.ids() == {"idea-2"}
+    assert reopened.find_duplicate(IDEA) is None
+
+
+def test_log_stays_bounded_while_ideas_are_evicted(tmp_path) -> None:
+    path = tmp_path / "memory.json.lsh"
+    index = NearDuplicateIndex(path)
+    for idx in range(500):
+        index.add(f"idea-{idx}", f"Idea number {idx} about sleep and replay")
+        if idx >= 5:
+            index.remove([f"idea-{idx - 5}"])
+
+    record_size = 3 + len("idea-499") + 64 * 4
+    assert path.stat().st_size < 100 * record_size  # 995 records without compaction
+    assert NearDuplicateIndex(path).ids() == {f"idea-{idx}" for idx in range(495, 500)}
+
+
+def test_loop_skips_critic_for_duplicate_proposals() -> None:
+    memory = MemoryStore(deduplicator=NearDuplicateIndex())
+    memory.add_entry("Focused gradient descent training", kind="concept")
+    memory.add_entry("Hippocampal replay during sleep", kind="concept")
+    memory.add_entry(IDEA, kind="idea")
+    llm = FixedLLM()
+    config = DaydreamConfig(novelty_threshold=5.0, coherence_threshold=5.0, usefulness_threshold=5.0)
+    loop = DaydreamingLoop(config=config, memory=memory, generator=IdeaGenerator(llm), critic=IdeaCritic(llm))
+
+    results = loop.run_iteration()
+
+    assert results[0].duplicate is True
+    assert results[0].score is None
+    assert len(llm.calls) == 1  # generator only
+    assert len(memory) == 3
@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+from daydreamer import EmbeddingIndex, HashingEmbedder, MemoryEntry, MemoryStore
+
+
+def test_hashing_embedder_is_normalised_and_similarity_aware() -> None:
+    vectors = HashingEmbedder().embed(
+        ["Hippocampal replay during sleep", "hippocampal replay in sleep", "Economic theory of innovation"]
+    )
+
+    assert vectors.shape == (3, 256)
+    assert abs(float(vectors[0] @ vectors[0]) - 1.0) < 1e-5
+    assert float(vectors[0] @ vectors[1]) > float(vectors[0] @ vectors[2])
+
+
+def test_band_sampling_avoids_near_duplicates_and_tracks_prune() -> None:
+    index = EmbeddingIndex(similarity_band=(-0.5, 0.9))
+    store = MemoryStore(embedding_index=index)
+    store.add_entry("Default mode network in neuroscience", kind="concept")
+    store.add_entry("Default mode network in neuroscience!", kind="concept")
+    store.add_entry("Latent space interpolation in diffusion models", kind="concept")
+
+    for _ in range(20):
+        for left, right in store.sample_pairs(1):
+            assert index.similarity(left, right) <= 0.9
+
+    store.prune(1)
+    assert len(index) == 1
+    assert store.sample_pairs(1) == []
+
+
+def test_unindexed_anchors_do_not_block_partners_for_the_rest() -> None:
+    index = EmbeddingIndex(similarity_band=(-1.0, 1.0))
+    store = MemoryStore(embedding_index=index)
+    entries = [store.add_entry(f"concept number {idx}", kind="concept") for idx in range(6)]
+    stranger = MemoryEntry(id="not-indexed", content="Evicted but not yet purged")
+
+    partners = index.sample_partners([entries[0], stranger, entries[1]])
+
+    assert partners[1] is None
+    assert partners[0] is not None and partners[2] is not None
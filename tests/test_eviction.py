@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+import pytest
+
+from daydreamer import LeastRecentlySampled, LowestScoreFirst, MemoryStore, OldestFirst, PinSeeds
+
+
+def _scored(store: MemoryStore, text: str, score: float):
+    scores = {"novelty": score, "coherence": score, "usefulness": score}
+    return store.add_entry(text, kind="idea", metadata={"scores": scores})
+
+
+@pytest.mark.parametrize("storage", ["objects", "columnar"])
+def test_pinned_seeds_survive_and_low_scores_go_first(tmp_path, storage) -> None:
+    path = tmp_path / "memory.json"
+    store = MemoryStore(
+        persistence_path=path,
+        journal=True,
+        storage=storage,
+        eviction_policy=PinSeeds(LowestScoreFirst()),
+    )
+    seeds = [store.add_entry(f"seed {idx}", metadata={"seed": True}) for idx in range(2)]
+    ideas = [_scored(store, f"idea {score}", score) for score in (7.0, 3.0, 9.0, 5.0)]
+
+    store.prune(4)
+    assert {entry.content for entry in store} == {"seed 0", "seed 1", "idea 7.0", "idea 9.0"}
+    assert [entry.content for entry in store.get_recent(2)] == ["idea 9.0", "idea 7.0"]
+
+    store.prune(0)  # only pinned entries are left
+    assert len(store) == 2
+    store.flush()
+
+    reopened = MemoryStore(persistence_path=path, journal=True, storage=storage)
+    assert {entry.id for entry in reopened} == {entry.id for entry in seeds}
+    assert ideas[0].id not in {entry.id for entry in reopened}
+
+
+def test_least_recently_sampled_evicts_unused_entries() -> None:
+    store = MemoryStore(eviction_policy=LeastRecentlySampled())
+    entries = [store.add_entry(f"concept {idx}") for idx in range(200)]
+    used = store.sample_pairs(10)
+    used_ids = {entry.id for pair in used for entry in pair}
+
+    store.prune(len(used_ids))
+    assert {entry.id for entry in store} == used_ids
+    assert len(store) == len(used_ids) < len(entries)
+    pairs = store.sample_pairs(5)
+    assert all(left.id in used_ids and right.id in used_ids for left, right in pairs)
+
+
+def test_kind_weighted_sampling_skips_evicted_entries() -> None:
+    store = MemoryStore(kind_weights={"concept": 3, "idea": 1}, eviction_policy=OldestFirst())
+    for idx in range(10):
+        store.add_entry(f"idea {idx}", kind="idea")
+    for idx in range(100):
+        store.add_entry(f"concept {idx}", kind="concept")
+
+    store.prune(100)
+    for _ in range(25):  # each draw may land on one of the evicted ideas
+        pairs = store.sample_pairs(4)
+        assert len(pairs) == 4
+        assert all(entry.kind == "concept" for pair in pairs for entry in pair)
@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+import re
+
+from daydreamer import IdeaGenerator, MemoryEntry
+from daydreamer.llm import LLMClient, LLMRequest, LLMResponse
+
+
+class SynthesisLLM(LLMClient):
+    """Answers multi-pair prompts out of order, skipping P2 and leaving the last synthesis unfinished."""
+
+    def __init__(self) -> None:
+        self.prompts: list[str] = []
+
+    def generate(self, request: LLMRequest) -> LLMResponse:
+        self.prompts.append(request.prompt)
+        pairs = re.findall(r'<pair id="P(\d+)">\nConcept 1: (.*)\n', request.prompt)
+        if not pairs:
+            concept_a = request.prompt.split("Concept 1: ")[1].split("\n")[0]
+            return LLMResponse(text=f"single {concept_a}")
+        *complete, (last, _) = pairs
+        parts = [f'<synthesis id="P{number}">\nmulti {concept}\n</synthesis>' for number, concept in complete]
+        parts = [part for part in reversed(parts) if 'id="P2"' not in part] + ['<synthesis id="P9">stray</synthesis>']
+        return LLMResponse(text="Here you go:\n" + "\n".join(parts) + f'\n<synthesis id="P{last}">cut of')
+
+
+def _pairs(count: int) -> list[tuple[MemoryEntry, MemoryEntry]]:
+    return [(MemoryEntry(id=f"a{i}", content=f"a{i}"), MemoryEntry(id=f"b{i}", content=f"b{i}")) for i in range(count)]
+
+
+def test_propose_many_splits_syntheses_and_falls_back_per_pair() -> None:
+    llm = SynthesisLLM()
+    generator = IdeaGenerator(llm, call_token_budget=5 * 513)
+    pairs = _pairs(7)
+    assert [len(chunk) for chunk in generator.chunk_pairs(pairs)] == [5, 2]
+
+    proposals = generator.propose_many(pairs)
+    texts = [proposal.text for proposal in proposals]
+    # First call: P2 missing and P5 unfinished; second call: P2 missing. Those are re-proposed alone.
+    assert texts == ["multi a0", "single a1", "multi a2", "multi a3", "single a4", "multi a5", "single a6"]
+    assert len(llm.prompts) == 5
+    assert "Pairs:" in llm.prompts[0] and llm.prompts[0].count("<pair id=") == 5
+    assert proposals[0].response is proposals[2].response is proposals[3].response
+    assert proposals[0].prompt == llm.prompts[0]
+
+    custom = IdeaGenerator(llm, prompt_template="Join {concept_a} and {concept_b}.")
+    assert [len(chunk) for chunk in custom.chunk_pairs(pairs)] == [1] * 7
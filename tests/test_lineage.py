@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+import pytest
+
+from daydreamer import LineageIndex, MemoryStore
+
+
+def _idea(store: MemoryStore, text: str, left, right):
+    return store.add_entry(text, kind="idea", metadata={"sources": (left.id, right.id)})
+
+
+def test_lineage_queries_follow_sources_across_pruning() -> None:
+    store = MemoryStore(lineage_index=LineageIndex())
+    seed_a = store.add_entry("seed a")
+    seed_b = store.add_entry("seed b")
+    seed_c = store.add_entry("seed c")
+    first = _idea(store, "first", seed_a, seed_b)
+    second = _idea(store, "second", first, seed_c)
+    third = _idea(store, "third", second, seed_a)
+    lineage = store.lineage
+
+    assert [lineage.depth(entry.id) for entry in (seed_a, first, second, third)] == [0, 1, 2, 3]
+    assert set(lineage.ancestors(third.id, roots_only=True)) == {seed_a.id, seed_b.id, seed_c.id}
+    assert set(lineage.descendants(seed_b.id)) == {first.id, second.id, third.id}
+    assert lineage.most_productive(1) == [(seed_a.id, 2)]
+
+    store.prune(2)  # drops the seeds and ``first``; ``second`` keeps their history alive
+    assert lineage.depth(third.id) == 3
+    assert lineage.ancestors(third.id) == [second.id]
+    assert set(lineage.ancestors(third.id, roots_only=True, include_pruned=True)) == {seed_a.id, seed_b.id, seed_c.id}
+
+    store.prune(0)
+    assert len(lineage) == 0
+    assert lineage.ancestors(third.id, include_pruned=True) == []
+
+
+def test_sample_pairs_respects_max_depth() -> None:
+    store = MemoryStore(lineage_index=LineageIndex())
+    seeds = [store.add_entry(f"seed {idx}") for idx in range(4)]
+    deep = _idea(store, "deep", _idea(store, "shallow", seeds[0], seeds[1]), seeds[2])
+
+    for _ in range(20):
+        for left, right in store.sample_pairs(2, max_depth=1):
+            assert deep.id not in (left.id, right.id)
+    with pytest.raises(ValueError):
+        MemoryStore().sample_pairs(1, max_depth=1)
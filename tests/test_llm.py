@@ -0,0 +1,161 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from types import SimpleNamespace
+
+from daydreamer import AsyncAnthropicLLM, MockLLM, batched_generate
+from daydreamer.llm import LLMClient, LLMRequest, LLMResponse
+
+
+class SlowEcho(LLMClient):
+    def generate(self, request: LLMRequest) -> LLMResponse:
+        time.sleep(0.2)
+        return LLMResponse(text=request.prompt.upper())
+
+
+class FakeAsyncMessages:
+    def __init__(self) -> None:
+        self.in_flight = 0
+        self.peak = 0
+        self.calls: list[dict] = []
+
+    async def create(self, **params):
+        self.calls.append(params)
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        await asyncio.sleep(0.05)
+        self.in_flight -= 1
+        text = params["messages"][0]["content"][::-1]
+        return SimpleNamespace(content=[SimpleNamespace(type="text", text=text)])
+
+
+def test_batched_generate_runs_requests_concurrently_in_order() -> None:
+    requests = [LLMRequest(prompt=f"prompt {idx}") for idx in range(32)]
+    client = MockLLM({request.prompt: f"answer {idx}" for idx, request in enumerate(requests)}, latency=0.5)
+
+    start = time.perf_counter()
+    responses = batched_generate(client, requests)
+    assert time.perf_counter() - start < 2.0  # sequential execution would take 16s
+    assert [response.text for response in responses] == [f"answer {idx}" for idx in range(32)]
+
+    # Blocking clients fan out over worker threads.
+    start = time.perf_counter()
+    assert [response.text for response in batched_generate(SlowEcho(), requests[:8])] == [
+        request.prompt.upper() for request in requests[:8]
+    ]
+    assert time.perf_counter() - start < 1.0
+
+
+def test_async_anthropic_llm_respects_concurrency_limit() -> None:
+    messages = FakeAsyncMessages()
+    llm = AsyncAnthropicLLM(SimpleNamespace(messages=messages), model="test-model")
+    requests = [LLMRequest(prompt=f"abc{idx}") for idx in range(10)]
+
+    responses = batched_generate(llm, requests, concurrency=3)
+    assert [response.text for response in responses] == [request.prompt[::-1] for request in requests]
+    assert messages.peak == 3
+    assert "system" not in messages.calls[0]
+    assert llm.generate(LLMRequest(prompt="xyz")).text == "zyx"
+
+
+def test_anthropic_llm_marks_static_prefix_for_prompt_caching() -> None:
+    from daydreamer import AnthropicLLM, IdeaCritic, IdeaGenerator, MemoryEntry
+
+    calls: list[dict] = []
+
+    def create(**params):
+        calls.append(params)
+        usage = SimpleNamespace(
+            input_tokens=40, output_tokens=30, cache_creation_input_tokens=None, cache_read_input_tokens=1200
+        )
+        text = '{"novelty": 7, "coherence": 7, "usefulness": 7}'
+        return SimpleNamespace(content=[SimpleNamespace(type="text", text=text)], usage=usage)
+
+    llm = AnthropicLLM(SimpleNamespace(messages=SimpleNamespace(create=create)), system_prompt="Be concise.")
+    generator = IdeaGenerator(llm)
+    proposal = generator.propose(MemoryEntry(id="a", content="sleep"), MemoryEntry(id="b", content="compilers"))
+    IdeaCritic(llm, stream=False).score("an idea")
+
+    for params, variable in zip(calls, ("sleep", "an idea")):
+        first, second = params["messages"][0]["content"]
+        assert first["cache_control"] == {"type": "ephemeral"} and variable not in first["text"]
+        assert "cache_control" not in second and second["text"].startswith(variable)
+    assert proposal.prompt == "".join(block["text"] for block in calls[0]["messages"][0]["content"])
+    usage = proposal.response.usage
+    assert (usage.input_tokens, usage.cache_read_input_tokens, usage.cache_creation_input_tokens) == (40, 1200, 0)
+    assert usage.cached_fraction == 1200 / 1240
+
+
+def test_streaming_critic_stops_once_the_score_object_closes() -> None:
+    from daydreamer import IdeaCritic
+    from daydreamer.critic import JSONObjectScanner
+
+    critic = IdeaCritic(MockLLM())
+    request = critic.build_request("an idea")
+    verdict = '{"novelty": 8, "coherence": 7, "usefulness": 6, "justification": "Bold {but} sound \\"}\\""}'
+    text = f"Here is my evaluation: {verdict}\n\n" + "Some further musings on the idea. " * 40
+    llm = MockLLM({request.prompt: text}, token_latency=0.002)
+
+    score = IdeaCritic(llm).score("an idea")
+    assert (score.novelty, score.coherence, score.usefulness) == (8.0, 7.0, 6.0)
+    assert score.justification == 'Bold {but} sound "}"'
+    assert score.response.stop_reason == "cancelled"
+    assert score.response.usage.output_tokens < len(text) / 4 / 3
+
+    full = IdeaCritic(llm, stream=False).score("an idea")
+    assert (full.novelty, full.coherence, full.usefulness) == (8.0, 7.0, 6.0)
+    assert score.response.latency < full.response.latency
+
+    scanner = JSONObjectScanner()
+    assert not any(scanner.feed(chunk) for chunk in ['{"a": "}', '{", "b": {"c"', ": 1}"])
+    assert scanner.feed("} trailing") and scanner.object == '{"a": "}{", "b": {"c": 1}}'
+
+
+def test_anthropic_llm_streams_and_closes_cancelled_streams() -> None:
+    from daydreamer import AnthropicLLM
+
+    class Events:
+        def __init__(self, chunks: list[str]) -> None:
+            self.closed = False
+            usage = SimpleNamespace(input_tokens=12, output_tokens=1)
+            self.events = [SimpleNamespace(type="message_start", message=SimpleNamespace(model="m", usage=usage))]
+            self.events += [
+                SimpleNamespace(type="content_block_delta", delta=SimpleNamespace(type="text_delta", text=chunk))
+                for chunk in chunks
+            ]
+            self.events.append(
+                SimpleNamespace(
+                    type="message_delta",
+                    delta=SimpleNamespace(stop_reason="end_turn"),
+                    usage=SimpleNamespace(output_tokens=len(chunks)),
+                )
+            )
+
+        def __iter__(self):
+            return iter(self.events)
+
+        def close(self) -> None:
+            self.closed = True
+
+    streams: list[Events] = []
+
+    def create(**params):
+        assert params["stream"] is True
+        streams.append(Events(["Hello", " there", ", friend", "!"]))
+        return streams[-1]
+
+    llm = AnthropicLLM(SimpleNamespace(messages=SimpleNamespace(create=create)))
+    stream = llm.generate_stream(LLMRequest(prompt="hi"))
+    assert list(stream) == ["Hello", " there", ", friend", "!"]
+    response = stream.response
+    assert (response.text, response.stop_reason, response.model) == ("Hello there, friend!", "end_turn", "m")
+    assert response.usage.output_tokens == 4 and streams[0].closed
+    assert response.time_to_first_byte is not None and response.latency >= response.time_to_first_byte
+
+    with llm.generate_stream(LLMRequest(prompt="hi")) as stream:
+        assert next(stream) == "Hello"
+    response = stream.response
+    assert (response.text, response.stop_reason) == ("Hello", "cancelled")
+    assert response.usage.input_tokens == 12 and response.usage.output_tokens == 2
+    assert streams[1].closed
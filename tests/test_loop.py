@@ -1,9 +1,11 @@
 from __future__ import annotations
 
 import json
+import threading
+import time
 
-from daydreamer import DaydreamConfig, DaydreamingLoop, IdeaCritic, IdeaGenerator, MemoryStore
-from daydreamer.llm import LLMClient, LLMRequest, LLMResponse
+from daydreamer import CostLedger, DaydreamConfig, DaydreamingLoop, IdeaCritic, IdeaGenerator, MemoryStore, ModelPrice
+from daydreamer.llm import LLMClient, LLMRequest, LLMResponse, TokenUsage
 
 
 class FixedLLM(LLMClient):
@@ -42,3 +44,115 @@ def test_daydream_loop_accepts_ideas() -> None:
     assert "continual self-improvement" in result.proposal.text
     assert len(memory) == 3  # the new idea has been stored
     assert memory.get_recent(1)[0].kind == "idea"
+
+
+class ScriptedCritic(LLMClient):
+    def __init__(self, model: str, averages: list[float]) -> None:
+        self.model = model
+        self.averages = averages
+        self.calls = 0
+
+    def generate(self, request: LLMRequest) -> LLMResponse:
+        value = self.averages[self.calls]
+        self.calls += 1
+        payload = {"novelty": value, "coherence": value, "usefulness": value, "justification": self.model}
+        return LLMResponse(text=json.dumps(payload), usage=TokenUsage(1000, 100), model=self.model)
+
+
+def test_cascaded_critic_escalates_only_borderline_ideas() -> None:
+    memory = MemoryStore()
+    memory.add_entry("Focused gradient descent training", kind="concept")
+    memory.add_entry("Hippocampal replay during sleep", kind="concept")
+    config = DaydreamConfig(
+        novelty_threshold=6.0, coherence_threshold=6.0, usefulness_threshold=6.0, borderline_band=1.0
+    )
+    cheap = ScriptedCritic("cheap", [9.0, 2.0, 5.5, 6.5])
+    expensive = ScriptedCritic("expensive", [8.0, 4.0])
+    ledger = CostLedger({"cheap": ModelPrice(input=1.0, output=5.0), "expensive": ModelPrice(input=10.0, output=50.0)})
+    loop = DaydreamingLoop(
+        config=config,
+        memory=memory,
+        generator=IdeaGenerator(FixedLLM()),
+        critic=IdeaCritic(cheap, escalation_client=expensive),
+        ledger=ledger,
+    )
+
+    results = [result for _ in range(4) for result in loop.run_iteration()]
+    assert [result.escalated for result in results] == [False, False, True, True]
+    assert [result.accepted for result in results] == [True, False, True, False]
+    assert [result.score.justification for result in results] == ["cheap", "cheap", "expensive", "expensive"]
+    assert results[2].score.screening.average == 5.5
+
+    cascade = ledger.cascade
+    assert (cascade.screened, cascade.escalated, cascade.escalation_rate) == (4, 2, 0.5)
+    # Screening four ideas cheaply (4 x $0.0015) and escalating two ($0.03) instead of four expensive calls ($0.06).
+    assert abs(cascade.cost - 0.036) < 1e-9 and abs(cascade.savings - 0.024) < 1e-9
+    assert ledger.iterations[2].cascade.escalated == 1 and ledger.iterations[0].cascade is None
+    assert "2 of 4 ideas escalated (50.0%)" in ledger.summary()
+
+
+class SlowLLM(FixedLLM):
+    """FixedLLM that takes ``latency`` seconds per call, or blocks critic calls until ``release`` is set."""
+
+    def __init__(self, latency: float = 0.0, release: threading.Event | None = None) -> None:
+        super().__init__()
+        self.latency = latency
+        self.release = release
+
+    def generate(self, request: LLMRequest) -> LLMResponse:
+        time.sleep(self.latency)
+        if self.release is not None and "Evaluate the following hypothesis" in request.prompt:
+            self.release.wait(5)
+        return super().generate(request)
+
+
+def _pipelined_loop(llm: LLMClient) -> tuple[DaydreamingLoop, MemoryStore]:
+    memory = MemoryStore()
+    for idx in range(10):
+        memory.add_entry(f"concept {idx}", kind="concept")
+    config = DaydreamConfig(novelty_threshold=5.0, coherence_threshold=5.0, usefulness_threshold=5.0)
+    return DaydreamingLoop(config=config, memory=memory, generator=IdeaGenerator(llm), critic=IdeaCritic(llm)), memory
+
+
+def test_pipelined_loop_overlaps_calls_and_writes_on_the_calling_thread() -> None:
+    llm = SlowLLM(latency=0.05)
+    loop, memory = _pipelined_loop(llm)
+    callers: set[str] = set()
+
+    def callback(results) -> None:
+        callers.add(threading.current_thread().name)
+        assert len(results) == 1 and results[0].accepted
+
+    start = time.perf_counter()
+    loop.run_pipelined(callback=callback, max_iterations=24, generator_workers=4, critic_workers=4)
+    elapsed = time.perf_counter() - start
+
+    assert elapsed < 24 * 2 * 0.05 / 2  # the serial loop needs 2.4 s
+    assert callers == {threading.current_thread().name}
+    assert len(memory) == 10 + 24
+    assert loop.ledger.stages["generator"].calls == loop.ledger.stages["critic"].calls == 24
+    assert loop.ledger.accepted == 24
+
+
+def test_pipelined_loop_applies_backpressure_and_drains_on_stop() -> None:
+    release, stop = threading.Event(), threading.Event()
+    llm = SlowLLM(release=release)
+    loop, memory = _pipelined_loop(llm)
+    results: list = []
+    runner = threading.Thread(
+        target=loop.run_pipelined,
+        kwargs={"callback": results.extend, "generator_workers": 2, "critic_workers": 2, "queue_size": 1, "stop": stop},
+    )
+    runner.start()
+    time.sleep(0.3)
+
+    # Two proposals with the critic, one queued for it and two held by generator workers waiting to queue theirs.
+    assert sum("Evaluate the following hypothesis" not in prompt for prompt in llm.calls) == 5
+    stop.set()
+    release.set()
+    runner.join(5)
+
+    assert not runner.is_alive()
+    proposed = sum("Evaluate the following hypothesis" not in prompt for prompt in llm.calls)
+    assert len(results) == proposed
+    assert len(memory) == 10 + proposed
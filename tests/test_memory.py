@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import json
+
+from daydreamer import ExploredPairRegistry, MemoryEntry, MemoryStore
+
+
+def test_journaled_store_replays_snapshot_and_log(tmp_path) -> None:
+    path = tmp_path / "memory.json"
+    store = MemoryStore(persistence_path=path, journal=True, compaction_threshold=1 << 30)
+    first = store.add_entry("Hippocampal replay", kind="concept")
+    store.add_entry("Gradient descent", kind="concept")
+    store.compact()
+    store.add_entry("Sleep spindles", kind="concept")
+    store.prune(2)
+
+    reopened = MemoryStore(persistence_path=path, journal=True)
+    assert sorted(entry.content for entry in reopened) == ["Gradient descent", "Sleep spindles"]
+    assert first.id not in {entry.id for entry in reopened}
+
+
+def test_journal_ignores_torn_trailing_record(tmp_path) -> None:
+    path = tmp_path / "memory.json"
+    store = MemoryStore(persistence_path=path, journal=True)
+    store.add_entry("Default mode network", kind="concept")
+    journal = tmp_path / "memory.json.journal"
+    with journal.open("a", encoding="utf-8") as handle:
+        handle.write('{"entry": {"content": "half wri')
+
+    reopened = MemoryStore(persistence_path=path, journal=True)
+    assert [entry.content for entry in reopened] == ["Default mode network"]
+    reopened.add_entry("Dream incubation", kind="concept")
+    assert len(MemoryStore(persistence_path=path, journal=True)) == 2
+
+
+def test_background_compaction_trims_journal(tmp_path) -> None:
+    path = tmp_path / "memory.json"
+    store = MemoryStore(persistence_path=path, journal=True, compaction_threshold=512)
+    for idx in range(20):
+        store.add_entry(f"concept {idx}", kind="concept")
+    store.flush()
+
+    snapshot = json.loads(path.read_text())
+    journal = (tmp_path / "memory.json.journal").read_text().splitlines()
+    assert snapshot["sequence"] > 0
+    assert all(json.loads(line)["seq"] > snapshot["sequence"] for line in journal)
+    assert len(snapshot["entries"]) + len(journal) == 20
+    assert len(MemoryStore(persistence_path=path, journal=True)) == 20
+
+
+def test_stale_compaction_does_not_replace_a_newer_snapshot(tmp_path) -> None:
+    path = tmp_path / "memory.json"
+    store = MemoryStore(persistence_path=path, journal=True, compaction_threshold=1 << 30)
+    store.add_entry("Hippocampal replay", kind="concept")
+    # What a background compactor would have captured before the explicit compaction below.
+    stale_state, stale_sequence = store._capture(), store._sequence
+    store.add_entry("Gradient descent", kind="concept")
+    store.compact()
+
+    store._compact(stale_state, stale_sequence)  # the background compactor finishing last
+
+    assert json.loads(path.read_text())["sequence"] == stale_sequence + 1
+    reopened = MemoryStore(persistence_path=path, journal=True)
+    assert sorted(entry.content for entry in reopened) == ["Gradient descent", "Hippocampal replay"]
+
+
+def test_sample_pairs_are_disjoint_and_respect_kind_weights() -> None:
+    store = MemoryStore()
+    for idx in range(50):
+        store.add_entry(f"concept {idx}", kind="concept")
+    for idx in range(50):
+        store.add_entry(f"idea {idx}", kind="idea")
+
+    pairs = store.sample_pairs(10)
+    ids = [entry.id for pair in pairs for entry in pair]
+    assert len(pairs) == 10
+    assert len(set(ids)) == 20
+
+    concepts_only = store.sample_pairs(40, kind_weights={"idea": 0.0})
+    assert len(concepts_only) == 25
+    assert {entry.kind for pair in concepts_only for entry in pair} == {"concept"}
+
+    biased = MemoryStore(kind_weights={"concept": 9.0})
+    biased.add_entries(list(store))
+    drawn = [entry.kind for _ in range(200) for pair in biased.sample_pairs(1) for entry in pair]
+    assert drawn.count("concept") > drawn.count("idea") * 3
+
+
+def test_explored_pairs_are_not_resampled_and_persist(tmp_path) -> None:
+    registry = ExploredPairRegistry.beside(tmp_path / "memory.json", capacity=1_000)
+    store = MemoryStore(pair_registry=registry)
+    a = store.add_entry("Hippocampal replay", kind="concept")
+    b = store.add_entry("Gradient descent", kind="concept")
+
+    store.mark_explored(b, a)
+    assert store.sample_pairs(1) == []
+    registry.close()
+
+    reopened = ExploredPairRegistry.beside(tmp_path / "memory.json")
+    assert (a.id, b.id) in reopened
+    coverage = reopened.coverage(2)
+    assert coverage.explored == 1 and coverage.fraction == 1.0
+
+
+def test_recency_and_prune_follow_created_at_for_out_of_order_batches() -> None:
+    store = MemoryStore()
+    store.add_entries(MemoryEntry(id=f"a{idx}", content="", created_at=float(idx)) for idx in (0, 2, 4, 6))
+    store.add_entries(MemoryEntry(id=f"b{idx}", content="", created_at=float(idx)) for idx in (5, 1, 3))
+
+    assert [entry.id for entry in store.get_recent(3)] == ["a6", "b5", "a4"]
+    store.prune(4)
+    assert [entry.id for entry in store] == ["b3", "a4", "b5", "a6"]
@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import json
+import re
+
+from daydreamer import AcceptancePredictor, DaydreamConfig, DaydreamingLoop, IdeaCritic, IdeaGenerator, MemoryStore
+from daydreamer.llm import LLMClient, LLMRequest, LLMResponse
+
+GOOD = "entangled lattice symmetry bridges {idx}"
+BAD = "boring spreadsheet chores again {idx}"
+
+
+class AlternatingLLM(LLMClient):
+    """Generates good and bad ideas in turn; the critic loves the good ones."""
+
+    def __init__(self) -> None:
+        self.generated = 0
+        self.scored = 0
+
+    def generate(self, request: LLMRequest) -> LLMResponse:
+        pairs = re.findall(r'<pair id="(P\d+)">', request.prompt)
+        if pairs:
+            return LLMResponse(text="".join(f'<synthesis id="{pid}">{self._idea()}</synthesis>' for pid in pairs))
+        hypotheses = re.findall(r'<hypothesis id="(H\d+)">\n(.*?)\n</hypothesis>', request.prompt, re.S)
+        if hypotheses:
+            self.scored += len(hypotheses)
+            return LLMResponse(text=json.dumps([{"id": hid, **self._scores(text)} for hid, text in hypotheses]))
+        if "Hypothesis:" in request.prompt:
+            self.scored += 1
+            return LLMResponse(text=json.dumps(self._scores(request.prompt.split("Hypothesis:")[1])))
+        return LLMResponse(text=self._idea())
+
+    def _idea(self) -> str:
+        self.generated += 1
+        return (GOOD if self.generated % 2 else BAD).format(idx=self.generated)
+
+    @staticmethod
+    def _scores(text: str) -> dict:
+        value = 9.0 if "lattice" in text else 2.0
+        return {"novelty": value, "coherence": value, "usefulness": value, "justification": "."}
+
+
+def test_predictor_learns_and_persists(tmp_path) -> None:
+    memory_path = tmp_path / "memory.json"
+    predictor = AcceptancePredictor.beside(memory_path, warmup=10)
+    texts = [template.format(idx=idx) for idx in range(40) for template in (GOOD, BAD)]
+    for _ in range(20):
+        predictor.update(texts, [index % 2 == 0 for index in range(len(texts))])
+    good, bad = predictor.predict([GOOD.format(idx=99), BAD.format(idx=99)])
+    assert good > 0.8 and bad < 0.2 and predictor.ready
+
+    reopened = AcceptancePredictor.beside(memory_path)
+    assert reopened.examples == 1600
+    assert list(reopened.predict([GOOD.format(idx=7)])) == list(predictor.predict([GOOD.format(idx=7)]))
+
+
+def test_loop_skips_likely_rejects_but_keeps_exploring() -> None:
+    memory = MemoryStore()
+    for idx in range(12):
+        memory.add_entry(f"concept {idx}", kind="concept")
+    llm = AlternatingLLM()
+    predictor = AcceptancePredictor(warmup=8, floor=0.3, exploration=0.25, seed=3)
+    config = DaydreamConfig(batch_size=4, max_history=None)
+    loop = DaydreamingLoop(
+        config=config, memory=memory, generator=IdeaGenerator(llm), critic=IdeaCritic(llm), predictor=predictor
+    )
+
+    results = [result for _ in range(30) for result in loop.run_iteration()]
+    skipped = [result for result in results if result.predicted_reject]
+    assert skipped and all("spreadsheet" in result.proposal.text for result in skipped)
+    assert all(result.acceptance_probability < 0.3 for result in skipped)
+    assert llm.scored == len(results) - len(skipped) < len(results)
+
+    stats = predictor.stats
+    assert stats.skipped == len(skipped) and stats.explored > 0
+    assert stats.recall == 1.0 and stats.precision > 0.8
+
+
+def test_warm_start_needs_accepted_and_rejected_ideas() -> None:
+    def loop_over(values: list[float]) -> AcceptancePredictor:
+        memory = MemoryStore()
+        for idx, value in enumerate(values):
+            scores = {"novelty": value, "coherence": value, "usefulness": value}
+            memory.add_entry(f"stored idea {idx}", kind="idea", metadata={"scores": scores})
+        predictor = AcceptancePredictor(warmup=4)
+        llm = AlternatingLLM()
+        DaydreamingLoop(
+            config=DaydreamConfig(),
+            memory=memory,
+            generator=IdeaGenerator(llm),
+            critic=IdeaCritic(llm),
+            predictor=predictor,
+        )
+        return predictor
+
+    accepted_only = loop_over([9.0] * 6)
+    assert accepted_only.examples == 0 and not accepted_only.ready
+
+    mixed = loop_over([9.0, 2.0] * 3)
+    assert mixed.examples == 6 and mixed.ready
@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from daydreamer import AnthropicLLM, AsyncAnthropicLLM, batched_generate
+from daydreamer.llm import LLMRequest
+from daydreamer.ratelimit import AdaptiveConcurrency, RateLimiter, RetryPolicy, Throttle, TokenBucket
+
+
+class FakeStatusError(Exception):
+    def __init__(self, status_code: int, headers: dict[str, str] | None = None) -> None:
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+        self.response = SimpleNamespace(headers=headers or {})
+
+
+def _message(text: str, tokens: int = 10) -> SimpleNamespace:
+    return SimpleNamespace(
+        content=[SimpleNamespace(type="text", text=text)],
+        usage=SimpleNamespace(input_tokens=tokens, output_tokens=tokens),
+    )
+
+
+class FakeAnthropic:
+    """Stand-in for ``anthropic.Anthropic``/``AsyncAnthropic`` with scripted errors and a concurrency quota."""
+
+    def __init__(self, *, errors=(), latency: float = 0.0, max_in_flight: int | None = None, asynchronous=False) -> None:
+        self.errors = list(errors)
+        self.latency = latency
+        self.max_in_flight = max_in_flight
+        self.in_flight = 0
+        self.calls = 0
+        self.messages = SimpleNamespace(create=self._acreate if asynchronous else self._create)
+
+    def _admit(self) -> None:
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        if self.max_in_flight is not None and self.in_flight >= self.max_in_flight:
+            raise FakeStatusError(529)
+        self.in_flight += 1
+
+    def _create(self, **params):
+        self._admit()
+        time.sleep(self.latency)
+        self.in_flight -= 1
+        return _message(params["messages"][0]["content"].upper())
+
+    async def _acreate(self, **params):
+        self._admit()
+        await asyncio.sleep(self.latency)
+        self.in_flight -= 1
+        return _message(params["messages"][0]["content"].upper())
+
+
+def test_retries_honour_retry_after_and_back_off() -> None:
+    fake = FakeAnthropic(errors=[FakeStatusError(429, {"retry-after-ms": "50"}), FakeStatusError(529), ConnectionError()])
+    throttle = Throttle(concurrency=AdaptiveConcurrency(initial=8), retry=RetryPolicy(base_delay=0.01))
+    llm = AnthropicLLM(fake, throttle=throttle)
+
+    start = time.perf_counter()
+    assert llm.generate(LLMRequest(prompt="hello")).text == "HELLO"
+    assert time.perf_counter() - start >= 0.05
+    stats = throttle.stats
+    assert (stats.attempts, stats.retries, stats.throttled, stats.failures) == (4, 3, 2, 0)
+    assert throttle.concurrency.limit == 2  # halved once per throttled attempt
+
+    fake.errors = [FakeStatusError(400)]
+    with pytest.raises(FakeStatusError):
+        llm.generate(LLMRequest(prompt="bad"))
+    assert fake.calls == 5
+
+
+def test_aimd_settles_at_the_server_limit() -> None:
+    fake = FakeAnthropic(latency=0.01, max_in_flight=4, asynchronous=True)
+    throttle = Throttle(concurrency=AdaptiveConcurrency(initial=16), retry=RetryPolicy(base_delay=0.005, max_attempts=20))
+    llm = AsyncAnthropicLLM(fake, throttle=throttle)
+    requests = [LLMRequest(prompt=f"p{idx}") for idx in range(80)]
+
+    responses = batched_generate(llm, requests)
+    assert [response.text for response in responses] == [request.prompt.upper() for request in requests]
+    assert throttle.stats.failures == 0
+    assert 1 <= throttle.concurrency.limit <= 8
+
+
+def test_token_buckets_pace_requests_and_tokens() -> None:
+    now = [0.0]
+    bucket = TokenBucket(60, capacity=2, clock=lambda: now[0])
+    assert [bucket.reserve(1) for _ in range(3)] == [0.0, 0.0, 1.0]
+    now[0] = 1.0
+    assert bucket.reserve(1) == 1.0
+
+    limiter = RateLimiter(requests_per_minute=600, tokens_per_minute=6000, clock=lambda: now[0])
+    assert limiter.reserve(6000) == 0.0
+    assert limiter.reserve(100) == pytest.approx(1.0)
+    limiter.settle(6000, 5900)  # the first call used fewer tokens than reserved
+    assert limiter.reserve(0) == 0.0
+
+
+def test_failed_attempts_refund_their_token_reservation() -> None:
+    limiter = RateLimiter(tokens_per_minute=1000, clock=lambda: 0.0)
+    throttle = Throttle(limiter=limiter, retry=RetryPolicy(base_delay=0.001))
+    errors = [FakeStatusError(503), FakeStatusError(503)]
+
+    def flaky() -> int:
+        if errors:
+            raise errors.pop(0)
+        return 100
+
+    assert throttle.call(flaky, tokens=300, usage=lambda used: used) == 100
+    assert throttle.stats.retries == 2
+    assert limiter.reserve(900) == 0.0  # only the successful attempt's 100 tokens were spent
@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import json
+from datetime import timedelta
+
+import pytest
+
+from daydreamer import BudgetScheduler, DaydreamConfig, DaydreamingLoop, IdeaCritic, IdeaGenerator, MemoryStore
+from daydreamer.costs import IterationCost, StageTotals
+from daydreamer.llm import LLMClient, LLMRequest, LLMResponse
+from daydreamer.scheduler import ScheduledIteration
+
+
+class AcceptingLLM(LLMClient):
+    def generate(self, request: LLMRequest) -> LLMResponse:
+        if "Evaluate" in request.prompt:
+            return LLMResponse(text=json.dumps({"novelty": 9, "coherence": 9, "usefulness": 9}))
+        return LLMResponse(text=f"Idea {abs(hash(request.prompt))}")
+
+
+class Clock:
+    def __init__(self, now: float = 0.0) -> None:
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _iteration(calls: int, tokens: int = 0, accepted: int = 0) -> IterationCost:
+    return IterationCost(stages={"critic": StageTotals(calls=calls, input_tokens=tokens)}, accepted=accepted)
+
+
+def test_scheduler_spreads_the_remaining_budget_over_the_window() -> None:
+    clock = Clock()
+    scheduler = BudgetScheduler(max_calls_per_minute=30, clock=clock)
+    assert scheduler.plan().budget is None  # nothing measured yet
+
+    scheduler.observe(_iteration(calls=2), pairs=1, duration=1.0)
+    decision = scheduler.plan()
+
+    # 28 calls left for 60 s at 2 calls per pair: 0.23 pairs/s, so one pair and then a pause.
+    assert decision.budget == "calls/minute" and not decision.paused
+    assert decision.batch_size == 1
+    assert decision.delay == pytest.approx(60 / 14 - 1)
+
+
+def test_scheduler_pauses_until_the_next_window_once_a_budget_is_spent() -> None:
+    clock = Clock(3600 * 5 + 600)
+    scheduler = BudgetScheduler(max_tokens_per_hour=1000, clock=clock)
+    scheduler.observe(_iteration(calls=1, tokens=1200), pairs=4, duration=2.0)
+
+    decision = scheduler.plan()
+    assert decision.paused and decision.budget == "tokens/hour"
+    assert decision.delay == pytest.approx(3000)
+
+    clock.now = 3600 * 6
+    assert not scheduler.plan().paused
+
+
+def test_scheduler_sizes_batches_for_the_acceptance_target() -> None:
+    scheduler = BudgetScheduler(target_accepted_per_hour=3600, max_cost_per_day=100, clock=Clock())
+    scheduler.observe(_iteration(calls=2, accepted=2), pairs=4, duration=4.0)
+
+    decision = scheduler.plan()
+    # One accepted idea per second at half the pairs accepted needs two pairs per second.
+    assert decision.budget == "accepted/hour"
+    assert (decision.batch_size, decision.delay) == (8, 0.0)
+
+
+def test_run_forever_reports_scheduler_decisions_through_the_callback() -> None:
+    memory = MemoryStore()
+    for idx in range(6):
+        memory.add_entry(f"concept {idx}", kind="concept")
+    llm = AcceptingLLM()
+    config = DaydreamConfig(novelty_threshold=5.0, coherence_threshold=5.0, usefulness_threshold=5.0)
+    loop = DaydreamingLoop(config=config, memory=memory, generator=IdeaGenerator(llm), critic=IdeaCritic(llm))
+    reports: list = []
+
+    loop.run_forever(
+        callback=reports.append, max_iterations=2, scheduler=BudgetScheduler(target_accepted_per_hour=360_000)
+    )
+
+    assert all(isinstance(report, ScheduledIteration) for report in reports)
+    assert [len(report) for report in reports] == [1, reports[0].decision.batch_size]
+    assert reports[1].decision.budget == "accepted/hour"
+
+
+def test_run_forever_sleeps_when_a_scheduled_iteration_finds_no_pairs(monkeypatch) -> None:
+    sleeps: list[float] = []
+    monkeypatch.setattr("daydreamer.loop.time.sleep", sleeps.append)
+    llm = AcceptingLLM()
+    config = DaydreamConfig(sleep_interval=timedelta(seconds=2))
+    loop = DaydreamingLoop(config=config, memory=MemoryStore(), generator=IdeaGenerator(llm), critic=IdeaCritic(llm))
+    reports: list = []
+
+    loop.run_forever(callback=reports.append, max_iterations=3, scheduler=BudgetScheduler(max_cost_per_day=5.0))
+
+    assert sleeps == [2.0, 2.0]
+    assert all(not report and report.decision.delay == 2.0 for report in reports)
@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+import multiprocessing
+
+from daydreamer import MemoryEntry, MemoryStore
+
+
+def _writer(path: str, worker: int, count: int) -> None:
+    store = MemoryStore(persistence_path=path, journal=True, shared=True, compaction_threshold=16 * 1024)
+    for idx in range(count):
+        if idx % 5 == 4:
+            store.add_entries(
+                [MemoryEntry(id=f"w{worker}-{idx}-{part}", content=f"batch {part}", created_at=idx) for part in range(2)]
+            )
+        else:
+            store.add_entry(f"worker {worker} idea {idx}", kind="idea", metadata={"worker": worker})
+
+
+def test_shared_store_sees_other_writers_incrementally(tmp_path) -> None:
+    path = tmp_path / "memory.json"
+    first = MemoryStore(persistence_path=path, journal=True, shared=True)
+    second = MemoryStore(persistence_path=path, journal=True, shared=True)
+
+    seed = first.add_entry("Default mode network")
+    second.add_entry("Combinatorial innovation")
+    first.prune(1)
+
+    assert [entry.content for entry in second.get_recent(5)] == ["Combinatorial innovation"]
+    assert seed.id not in {entry.id for entry in second}
+    second.compact()
+    first.add_entry("Dream incubation")
+    assert len(second) == 2
+    assert len(MemoryStore(persistence_path=path, journal=True)) == 2
+
+
+def test_concurrent_writer_processes_lose_no_entries(tmp_path) -> None:
+    path = str(tmp_path / "memory.json")
+    workers, per_worker = 4, 60
+    context = multiprocessing.get_context("spawn")
+    processes = [context.Process(target=_writer, args=(path, worker, per_worker)) for worker in range(workers)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join(timeout=120)
+        assert process.exitcode == 0
+
+    # Every worker writes 48 single entries and 12 two-entry batches.
+    expected = workers * (per_worker + per_worker // 5)
+    entries = list(MemoryStore(persistence_path=path, journal=True))
+    assert len(entries) == expected
+    assert len({entry.id for entry in entries}) == expected
+    assert (tmp_path / "memory.json").exists()
@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import json
+import uuid
+
+from daydreamer import MemoryEntry, MemoryStore
+from daydreamer.snapshot import is_snapshot, json_to_snapshot, snapshot_to_json
+
+
+def _populate(store: MemoryStore) -> list[str]:
+    seed = store.add_entry("Default mode network", kind="concept", metadata={"seed": True})
+    other = store.add_entry("Combinatorial innovation", kind="concept", metadata={"seed": True})
+    idea = store.add_entry(
+        "Dreams as combinatorial search — über-novel",
+        kind="idea",
+        metadata={
+            "sources": (seed.id, other.id),
+            "scores": {"novelty": 8.5, "coherence": 6.25, "usefulness": 5.5},
+            "justification": "Links replay to search",
+        },
+    )
+    return [seed.id, other.id, idea.id]
+
+
+def test_binary_snapshot_reopens_lazily_and_accepts_new_entries(tmp_path) -> None:
+    path = tmp_path / "memory.bin"
+    store = MemoryStore(persistence_path=path, storage="columnar", snapshot_format="binary")
+    ids = _populate(store)
+    assert is_snapshot(path)
+
+    reopened = MemoryStore(persistence_path=path, storage="columnar", snapshot_format="binary")
+    assert [entry.id for entry in reopened] == ids
+    assert reopened.get_recent(1)[0].metadata["justification"] == "Links replay to search"
+    assert len(reopened.sample_pairs(1)) == 1
+
+    reopened.add_entry("Hippocampal replay", kind="concept")
+    reopened.prune(3)
+    again = MemoryStore(persistence_path=path, storage="columnar", snapshot_format="binary")
+    assert [entry.content for entry in again.get_recent(3)] == [
+        "Hippocampal replay",
+        "Dreams as combinatorial search — über-novel",
+        "Combinatorial innovation",
+    ]
+    assert again.get_recent(2)[1].metadata["sources"] == (ids[0], ids[1])
+
+
+def test_converters_round_trip_journaled_json(tmp_path) -> None:
+    json_path = tmp_path / "memory.json"
+    store = MemoryStore(persistence_path=json_path, journal=True)
+    _populate(store)
+    store.compact()
+
+    binary_path = tmp_path / "memory.bin"
+    assert json_to_snapshot(json_path, binary_path) == 3
+    # A store opened with the default (object) storage reads binary snapshots too.
+    loaded = MemoryStore(persistence_path=binary_path, journal=False)
+    assert [entry.to_json() for entry in loaded] == [entry.to_json() for entry in store]
+
+    back_path = tmp_path / "back.json"
+    assert snapshot_to_json(binary_path, back_path) == 3
+    assert json.loads(back_path.read_text()) == json.loads(json_path.read_text())
+
+
+def test_tiny_binary_snapshots_grow_on_the_next_write(tmp_path) -> None:
+    for count in (0, 1):
+        path = tmp_path / f"memory-{count}.bin"
+        store = MemoryStore(persistence_path=path, storage="columnar", snapshot_format="binary")
+        for idx in range(count):
+            store.add_entry(f"concept {idx}")
+        store.flush()
+
+        reopened = MemoryStore(persistence_path=path, storage="columnar", snapshot_format="binary")
+        assert len(reopened) == count
+        reopened.add_entry("appended")
+        reopened.add_entries(MemoryEntry(id=str(uuid.uuid4()), content=f"batch {idx}") for idx in range(40))
+        assert len(reopened) == count + 41
+        assert reopened.get_recent(1)[0].content == "batch 39"
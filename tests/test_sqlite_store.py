@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import itertools
+import random
+
+from daydreamer import (
+    DaydreamConfig,
+    DaydreamingLoop,
+    ExploredPairRegistry,
+    IdeaCritic,
+    IdeaGenerator,
+    MemoryEntry,
+    MemoryStore,
+    SQLiteMemoryStore,
+)
+
+from test_loop import FixedLLM
+
+
+def test_sqlite_store_recency_prune_and_reopen(tmp_path) -> None:
+    path = tmp_path / "memory.db"
+    store = SQLiteMemoryStore(path)
+    store.add_entries(
+        MemoryEntry(id=f"id-{idx}", content=f"concept {idx}", created_at=float(idx), metadata={"seed": idx == 0})
+        for idx in range(10)
+    )
+
+    assert [entry.id for entry in store.get_recent(3)] == ["id-9", "id-8", "id-7"]
+    store.prune(4)
+    store.close()
+
+    reopened = SQLiteMemoryStore(path)
+    assert len(reopened) == 4
+    assert sorted(entry.id for entry in reopened) == ["id-6", "id-7", "id-8", "id-9"]
+    pairs = reopened.sample_pairs(2)
+    assert len(pairs) == 2
+    assert len({entry.id for pair in pairs for entry in pair}) == 4
+
+
+def test_sqlite_store_redraws_explored_pairs_like_memory_store() -> None:
+    entries = [MemoryEntry(id=f"id-{idx}", content=f"concept {idx}", created_at=float(idx)) for idx in range(4)]
+    registry = ExploredPairRegistry(capacity=100)
+    for left, right in itertools.combinations(entries, 2):
+        if {left.id, right.id} != {"id-1", "id-2"}:  # five of the six pairs are explored
+            registry.add(left.id, right.id)
+    stores = [MemoryStore(pair_registry=registry), SQLiteMemoryStore(pair_registry=registry)]
+    random.seed(7)
+
+    for store in stores:
+        store.add_entries(entries)
+        found = [store.sample_pairs(1) for _ in range(50)]
+        assert all({entry.id for pair in pairs for entry in pair} == {"id-1", "id-2"} for pairs in found if pairs)
+        # One draw finds the pair 1 time in 6; eight rounds find it about 3 times in 4.
+        assert sum(bool(pairs) for pairs in found) >= 25
+
+
+def test_loop_runs_against_sqlite_store() -> None:
+    memory = SQLiteMemoryStore()
+    memory.add_entry("Focused gradient descent training", kind="concept")
+    memory.add_entry("Hippocampal replay during sleep", kind="concept")
+    llm = FixedLLM()
+    config = DaydreamConfig(novelty_threshold=5.0, coherence_threshold=5.0, usefulness_threshold=5.0)
+    loop = DaydreamingLoop(config=config, memory=memory, generator=IdeaGenerator(llm), critic=IdeaCritic(llm))
+
+    results = loop.run_iteration()
+
+    assert results[0].accepted is True
+    assert memory.get_recent(1)[0].kind == "idea"
+    assert memory.get_recent(1)[0].metadata["sources"] == [results[0].concept_a.id, results[0].concept_b.id]